@@ -0,0 +1,232 @@
+"""
+Columnar export and vectorized statistics for processed threads.
+
+participation_a_data.json is a list of nested thread objects. For analysis,
+the per-thread scalar fields are exported as columns:
+
+    id, created_at (epoch ms), view_count, reply_count, attachment_count
+    llm, provider, homework   (dictionary-encoded: int codes + categories)
+
+to participation_a.parquet when pyarrow is installed, otherwise to
+participation_a.npz (NumPy). The stats report (LLM x homework contingency
+table, view distribution, weekly time series) works on these arrays with
+NumPy operations rather than per-thread Python loops.
+
+    python main.py export
+    python main.py stats
+"""
+
+from datetime import datetime, timezone
+from importlib.util import find_spec
+from pathlib import Path
+
+import json_codec
+import process_threads as pt
+
+# NumPy (arrays and the report) and pyarrow (Parquet output; .npz is the
+# fallback) are imported inside the functions that use them, so `stats`
+# never loads pyarrow and importing this module loads neither
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+PYARROW_AVAILABLE = find_spec('pyarrow') is not None
+
+PARQUET_FILE = Path("participation_a.parquet")
+NPZ_FILE = Path("participation_a.npz")
+
+NUMERIC_COLUMNS = ('id', 'created_at', 'view_count', 'reply_count', 'attachment_count')
+CATEGORICAL_COLUMNS = ('llm', 'provider', 'homework')
+
+MS_PER_DAY = 86_400_000
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday; weeks below start on Monday
+TOP_LLMS = 15  # Rows shown in the contingency table
+BAR_WIDTH = 40  # Characters for the busiest week
+VIEW_PERCENTILES = (0, 25, 50, 75, 90, 99, 100)
+
+
+def load_threads(data_path=pt.OUTPUT_FILE):
+    """Load ThreadRecords from participation_a_data.json."""
+    data = json_codec.load(data_path)
+    return [pt.ThreadRecord.from_dict(t) for t in data.get('threads', [])]
+
+
+def thread_columns(threads):
+    """Per-thread scalar fields as plain Python lists, one per column."""
+    return {
+        'id': [t.id for t in threads],
+        'created_at': [pt.epoch_millis(t.created_at) for t in threads],
+        'view_count': [t.view_count or 0 for t in threads],
+        'reply_count': [t.reply_count or 0 for t in threads],
+        'attachment_count': [len(t.attachments or []) for t in threads],
+        'llm': [t.llm_used for t in threads],
+        'provider': [t.provider for t in threads],
+        'homework': [t.homework for t in threads],
+    }
+
+
+def to_arrays(columns):
+    """
+    Convert thread_columns() output to NumPy arrays.
+
+    Categorical columns become <name>_codes (int32) and <name>_categories
+    (sorted unique strings), so grouping is integer arithmetic.
+    """
+    import numpy as np
+
+    arrays = {name: np.asarray(columns[name], dtype=np.int64) for name in NUMERIC_COLUMNS}
+    for name in CATEGORICAL_COLUMNS:
+        categories, codes = np.unique(np.asarray(columns[name], dtype=str), return_inverse=True)
+        arrays[f"{name}_codes"] = codes.astype(np.int32)
+        arrays[f"{name}_categories"] = categories
+    return arrays
+
+
+def export_columnar(threads, parquet_path=PARQUET_FILE, npz_path=NPZ_FILE):
+    """
+    Write the columnar export, Parquet if possible, else .npz.
+
+    Returns:
+        Path: the file written
+    """
+    columns = thread_columns(threads)
+
+    if PYARROW_AVAILABLE:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({
+            **{name: pa.array(columns[name], type=pa.int64()) for name in NUMERIC_COLUMNS},
+            **{name: pa.array(columns[name], type=pa.string()).dictionary_encode()
+               for name in CATEGORICAL_COLUMNS},
+        })
+        pq.write_table(table, parquet_path)
+        return parquet_path
+
+    if NUMPY_AVAILABLE:
+        import numpy as np
+
+        np.savez_compressed(npz_path, **to_arrays(columns))
+        return npz_path
+
+    raise RuntimeError("Columnar export needs pyarrow or numpy (pip install pyarrow)")
+
+
+def load_columnar(path):
+    """Read a Parquet or .npz export back into the to_arrays() layout."""
+    import numpy as np
+
+    path = Path(path)
+    if path.suffix == '.npz':
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    arrays = {name: table.column(name).to_numpy() for name in NUMERIC_COLUMNS}
+    for name in CATEGORICAL_COLUMNS:
+        categories, codes = np.unique(np.asarray(table.column(name).to_pylist(), dtype=str),
+                                      return_inverse=True)
+        arrays[f"{name}_codes"] = codes.astype(np.int32)
+        arrays[f"{name}_categories"] = categories
+    return arrays
+
+
+# ----------------------------------------------------------------------
+# Vectorized report
+# ----------------------------------------------------------------------
+def homework_order(categories):
+    """Indices that sort homework labels numerically (HW2 before HW10, Unknown last)."""
+    import numpy as np
+
+    numbers = np.array([
+        int(''.join(ch for ch in hw if ch.isdigit()) or 999) for hw in categories
+    ])
+    return np.argsort(numbers, kind='stable')
+
+
+def contingency_table(arrays):
+    """Counts of threads per (LLM, homework) pair as an L x H matrix."""
+    import numpy as np
+
+    n_llm = len(arrays['llm_categories'])
+    n_hw = len(arrays['homework_categories'])
+    flat = arrays['llm_codes'].astype(np.int64) * n_hw + arrays['homework_codes']
+    return np.bincount(flat, minlength=n_llm * n_hw).reshape(n_llm, n_hw)
+
+
+def group_view_stats(codes, views, n_groups):
+    """Per-group (count, mean views, max views) without a Python loop over threads."""
+    import numpy as np
+
+    counts = np.bincount(codes, minlength=n_groups)
+    totals = np.bincount(codes, weights=views, minlength=n_groups)
+    means = np.divide(totals, counts, out=np.zeros(n_groups), where=counts > 0)
+    maxima = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(maxima, codes, views)
+    return counts, means, maxima
+
+
+def weekly_counts(created_at):
+    """Return (week start dates, thread counts) for weeks with any threads."""
+    import numpy as np
+
+    valid = created_at[created_at > 0]
+    days = valid // MS_PER_DAY
+    weeks = (days + EPOCH_WEEKDAY) // 7
+    week_ids, counts = np.unique(weeks, return_counts=True)
+    starts = week_ids * 7 - EPOCH_WEEKDAY
+    dates = [datetime.fromtimestamp(int(day) * 86400, tz=timezone.utc).date() for day in starts]
+    return dates, counts
+
+
+def print_report(arrays):
+    """Print the contingency table, view distribution and weekly time series."""
+    import numpy as np
+
+    llms = arrays['llm_categories']
+    homeworks = arrays['homework_categories']
+    views = arrays['view_count']
+
+    print("\n--- LLM x Homework (top LLMs by posts) ---")
+    table = contingency_table(arrays)
+    hw_order = homework_order(homeworks)
+    llm_order = np.argsort(-table.sum(axis=1), kind='stable')[:TOP_LLMS]
+    labels = [hw.replace('Unknown HW', '?') for hw in homeworks[hw_order]]
+    print(f"  {'':<24}" + ''.join(f"{label:>5}" for label in labels) + f"{'Total':>7}")
+    for row in llm_order:
+        cells = table[row, hw_order]
+        print(f"  {llms[row][:24]:<24}" + ''.join(f"{c or '.':>5}" for c in cells) + f"{cells.sum():>7}")
+    print(f"  {'All LLMs':<24}" + ''.join(f"{c:>5}" for c in table[:, hw_order].sum(axis=0))
+          + f"{table.sum():>7}")
+
+    print("\n--- View Distribution ---")
+    percentiles = np.percentile(views, VIEW_PERCENTILES) if len(views) else np.zeros(len(VIEW_PERCENTILES))
+    print("  " + "  ".join(f"p{p}={v:.0f}" for p, v in zip(VIEW_PERCENTILES, percentiles)))
+    print(f"  mean={views.mean() if len(views) else 0:.1f}  total={views.sum()}")
+
+    providers = arrays['provider_categories']
+    counts, means, maxima = group_view_stats(arrays['provider_codes'], views, len(providers))
+    print(f"  {'Provider':<16}{'Posts':>7}{'Mean views':>12}{'Max views':>11}")
+    for i in np.argsort(-counts, kind='stable'):
+        print(f"  {providers[i]:<16}{counts[i]:>7}{means[i]:>12.1f}{maxima[i]:>11}")
+
+    print("\n--- Posts per Week ---")
+    dates, week_counts = weekly_counts(arrays['created_at'])
+    bars = np.maximum(1, np.rint(week_counts * BAR_WIDTH / max(1, week_counts.max(initial=0))).astype(int))
+    for date, count, bar in zip(dates, week_counts, bars):
+        print(f"  {date.isoformat()}  {count:>4}  {'#' * bar}")
+
+
+def main(data_path=pt.OUTPUT_FILE):
+    print("=" * 70)
+    print("Columnar Export")
+    print("=" * 70)
+    threads = load_threads(data_path)
+    try:
+        path = export_columnar(threads)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return
+    print(f"✓ Wrote {len(threads)} threads to {path}")
+    if not PYARROW_AVAILABLE:
+        print("  (install pyarrow for Parquet output)")
+    print("=" * 70)
@@ -0,0 +1,257 @@
+"""
+Attachment metadata and first-page thumbnails for the site.
+
+process_thread() only records attachment names, so judging whether a
+submission's PDF is worth opening meant downloading it. This module
+describes every file in website/attachments/ once:
+
+    {
+      "size": 2381562,                 bytes
+      "mime": "application/pdf",
+      "pages": 14,                     PDFs only
+      "thumbnail": {"src": "thumbnails/3f2a9c1b0d4e5f60.webp", "width": 240, "height": 311}
+    }
+
+generate_data_js writes the map to data.js as attachmentMeta, and the browse
+modal shows the size, page count and a small preview next to each file.
+
+Files are described in a process pool. Results are cached in
+.attachment_cache.json by content hash (with the file's size and mtime so
+unchanged files are not re-hashed), and thumbnails are named by that hash, so
+a rebuild only touches new or changed attachments. Files that could not be
+described are not cached, so they are tried again on the next build, and
+thumbnails of attachments that are gone are deleted.
+
+Optional dependencies:
+    PyMuPDF   PDF first-page thumbnails and page counts (page counts fall back
+              to reading the page tree, see scan_pdf_pages)
+    Pillow    WebP thumbnails and thumbnails of image attachments
+"""
+
+import mimetypes
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path
+
+import json_codec
+from dedup import file_digest
+
+# PyMuPDF (page counts and PDF rendering) and Pillow (WebP thumbnails and
+# image attachments) are imported in the worker functions that use them:
+# process_threads.py imports this module on every run, but only new or
+# changed attachments need them
+PYMUPDF_AVAILABLE = find_spec('pymupdf') is not None
+PILLOW_AVAILABLE = find_spec('PIL') is not None
+
+CACHE_FILE = Path(".attachment_cache.json")
+THUMBNAIL_DIR = "thumbnails"  # Next to attachments/ in the website folder
+THUMBNAIL_WIDTH = 240  # Pixels
+THUMBNAIL_HASH_LENGTH = 16
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.gif', '.webp'}
+EXTRA_MIME_TYPES = {'.md': 'text/markdown', '.ipynb': 'application/x-ipynb+json'}
+# Page tree nodes (<< /Type /Pages /Count n ... >>) and compressed object streams
+DICT_BODY = rb'(?:[^<>]|<<[^<>]*>>)*?'
+PDF_PAGES_PATTERN = re.compile(rb'<<' + DICT_BODY + rb'/Type\s*/Pages(?![a-zA-Z])' + DICT_BODY + rb'>>')
+PDF_COUNT_PATTERN = re.compile(rb'/Count\s+(\d+)')
+PDF_OBJECT_STREAM_PATTERN = re.compile(rb'/Type\s*/ObjStm' + DICT_BODY + rb'>>\s*stream\r?\n')
+CACHE_VERSION = 1  # Bump when the description format or thumbnail settings change
+
+
+def mime_type(name):
+    suffix = Path(name).suffix.lower()
+    if suffix in EXTRA_MIME_TYPES:
+        return EXTRA_MIME_TYPES[suffix]
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def page_tree_counts(data):
+    counts = []
+    for node in PDF_PAGES_PATTERN.findall(data):
+        match = PDF_COUNT_PATTERN.search(node)
+        if match:
+            counts.append(int(match.group(1)))
+    return counts
+
+
+def scan_pdf_pages(path):
+    """
+    Page count without a PDF library: the /Count of the root page tree node.
+
+    PDF 1.5+ files usually keep that node in a Flate-compressed object stream,
+    so those streams are searched when the plain text has no page tree.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    counts = page_tree_counts(data)
+    if not counts:
+        for match in PDF_OBJECT_STREAM_PATTERN.finditer(data):
+            end = data.find(b'endstream', match.end())
+            try:
+                counts += page_tree_counts(zlib.decompressobj().decompress(data[match.end():end]))
+            except zlib.error:
+                continue
+    return max(counts) if counts else None
+
+
+def save_thumbnail(image, thumbnail_path):
+    """Downscale a Pillow image to THUMBNAIL_WIDTH and save it as WebP."""
+    image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 4))
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    image.save(thumbnail_path, 'WEBP', quality=80, method=6)
+    return image.size
+
+
+def render_pdf(path, thumbnail_dir, stem):
+    """Return (page count, thumbnail) for a PDF using PyMuPDF."""
+    import pymupdf
+    with pymupdf.open(path) as document:
+        pages = document.page_count
+        if not pages:
+            return pages, None
+        page = document[0]
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(THUMBNAIL_WIDTH / page.rect.width,
+                                                       THUMBNAIL_WIDTH / page.rect.width))
+        if PILLOW_AVAILABLE:
+            from PIL import Image
+            thumbnail_path = thumbnail_dir / f"{stem}.webp"
+            image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+            width, height = save_thumbnail(image, thumbnail_path)
+        else:
+            thumbnail_path = thumbnail_dir / f"{stem}.png"
+            pixmap.save(thumbnail_path)
+            width, height = pixmap.width, pixmap.height
+    return pages, {'src': f"{THUMBNAIL_DIR}/{thumbnail_path.name}", 'width': width, 'height': height}
+
+
+def describe_attachment(job):
+    """
+    Describe one attachment and write its thumbnail (runs in a worker process).
+
+    Args:
+        job: (path, digest, thumbnail_dir)
+
+    Returns:
+        dict: size, mime and, when available, pages and thumbnail
+    """
+    path, digest, thumbnail_dir = job
+    path = Path(path)
+    info = {'size': path.stat().st_size, 'mime': mime_type(path.name)}
+    stem = digest[:THUMBNAIL_HASH_LENGTH]
+    suffix = path.suffix.lower()
+    try:
+        if suffix == '.pdf':
+            if PYMUPDF_AVAILABLE:
+                info['pages'], thumbnail = render_pdf(path, thumbnail_dir, stem)
+                if thumbnail:
+                    info['thumbnail'] = thumbnail
+            else:
+                info['pages'] = scan_pdf_pages(path)
+        elif suffix in IMAGE_SUFFIXES and PILLOW_AVAILABLE:
+            from PIL import Image
+            thumbnail_path = thumbnail_dir / f"{stem}.webp"
+            with Image.open(path) as image:
+                width, height = save_thumbnail(image, thumbnail_path)
+            info['thumbnail'] = {'src': f"{THUMBNAIL_DIR}/{thumbnail_path.name}",
+                                 'width': width, 'height': height}
+    except Exception as e:
+        # Damaged or encrypted files still get their size and type
+        info['error'] = str(e)
+    return {key: value for key, value in info.items() if value is not None}
+
+
+def load_cache(cache_file):
+    cache = json_codec.load(cache_file) if cache_file.exists() else {}
+    if cache.get('version') != CACHE_VERSION:
+        return {'version': CACHE_VERSION, 'files': {}, 'by_digest': {}}
+    return cache
+
+
+def cached_attachment_meta(cache_file=CACHE_FILE):
+    """
+    Descriptions from the last collect_attachment_meta run, without hashing
+    or rendering anything (query_server.py).
+
+    Returns:
+        dict: filename -> description
+    """
+    cache = load_cache(cache_file)
+    return {
+        name: {key: value for key, value in cache['by_digest'][entry['digest']].items() if key != 'error'}
+        for name, entry in cache['files'].items() if entry['digest'] in cache['by_digest']
+    }
+
+
+def prune_thumbnails(thumbnail_dir, digests):
+    """Delete thumbnails not named after one of digests. Returns the number deleted."""
+    stems = {digest[:THUMBNAIL_HASH_LENGTH] for digest in digests}
+    pruned = 0
+    for path in thumbnail_dir.iterdir():
+        if path.is_file() and path.stem not in stems:
+            path.unlink()
+            pruned += 1
+    return pruned
+
+
+def collect_attachment_meta(attachments_dir, cache_file=CACHE_FILE, max_workers=None):
+    """
+    Describe every file in attachments_dir, reusing cached descriptions.
+
+    Thumbnails are written to THUMBNAIL_DIR next to attachments_dir.
+
+    Returns:
+        dict: filename -> description (see module docstring)
+    """
+    attachments_dir = Path(attachments_dir)
+    if not attachments_dir.is_dir():
+        return {}
+    thumbnail_dir = attachments_dir.parent / THUMBNAIL_DIR
+    thumbnail_dir.mkdir(exist_ok=True)
+    cache = load_cache(cache_file)
+
+    digests, jobs = {}, {}
+    for path in sorted(p for p in attachments_dir.iterdir() if p.is_file()):
+        stat = path.stat()
+        signature = [stat.st_size, stat.st_mtime_ns]
+        known = cache['files'].get(path.name)
+        digest = known['digest'] if known and known['signature'] == signature else file_digest(path)
+        cache['files'][path.name] = {'signature': signature, 'digest': digest}
+        digests[path.name] = digest
+
+        described = cache['by_digest'].get(digest)
+        thumbnail = described and described.get('thumbnail')
+        if described is None or (thumbnail and not (attachments_dir.parent / thumbnail['src']).exists()):
+            jobs.setdefault(digest, (path, digest, thumbnail_dir))
+
+    described = {}
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            described = dict(zip(jobs, pool.map(describe_attachment, jobs.values())))
+    failed = 0
+    for digest, info in described.items():
+        if 'error' in info:
+            failed += 1  # Not cached, so e.g. a file still being written is described again
+        else:
+            cache['by_digest'][digest] = info
+
+    # Forget files that are gone so the cache and thumbnails do not grow forever
+    cache['files'] = {name: entry for name, entry in cache['files'].items() if name in digests}
+    live = set(digests.values())
+    cache['by_digest'] = {d: info for d, info in cache['by_digest'].items() if d in live}
+    json_codec.dump(cache, cache_file)
+    pruned = prune_thumbnails(thumbnail_dir, live)
+
+    meta = {}
+    for name, digest in digests.items():
+        info = dict(described.get(digest) or cache['by_digest'][digest])
+        info.pop('error', None)
+        meta[name] = info
+    new = sum(1 for digest in digests.values() if digest in jobs)
+    print(f"✓ Described {len(meta)} attachment(s) ({new} new, {len(meta) - new} cached)")
+    if failed:
+        print(f"⚠ {failed} attachment(s) could not be read fully; they will be retried next build")
+    if pruned:
+        print(f"✓ Removed {pruned} thumbnail(s) of deleted attachments")
+    return meta
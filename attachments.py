@@ -0,0 +1,172 @@
+"""
+Concurrent attachment downloads shared by the Ed Stem downloaders.
+
+Both ed_downloader.py and fetch_all_resources.py hand this module the list of
+files found in a thread. The files are fetched in parallel with a small
+per-thread limit, byte-level progress is reported while they stream in, and
+failures are collected per file so one bad link does not abort the rest of
+the thread.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+MAX_CONCURRENT_DOWNLOADS = 4  # Parallel downloads per thread
+CHUNK_SIZE = 64 * 1024  # Bytes read per iteration while streaming
+PROGRESS_INTERVAL = 0.5  # Seconds between progress updates
+
+
+def get_auth_headers(ed):
+    """Build request headers that reuse the EdAPI credentials, if any."""
+    headers = {}
+    if hasattr(ed, 'headers'):
+        headers = dict(ed.headers)
+    elif hasattr(ed, 'session') and hasattr(ed.session, 'headers'):
+        headers = dict(ed.session.headers)
+    elif hasattr(ed, '_token') or hasattr(ed, 'token'):
+        token = getattr(ed, '_token', None) or getattr(ed, 'token', None)
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+    return headers
+
+
+def format_bytes(num_bytes):
+    """Format a byte count for progress output."""
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class DownloadProgress:
+    """Thread-safe byte counter that prints aggregated progress for a thread."""
+
+    def __init__(self, total_files, indent="      "):
+        self.total_files = total_files
+        self.indent = indent
+        self.bytes_done = 0
+        self.bytes_expected = 0
+        self.files_done = 0
+        self._lock = threading.Lock()
+        self._last_report = 0.0
+        self._interactive = sys.stdout.isatty()
+
+    def expect(self, num_bytes):
+        with self._lock:
+            self.bytes_expected += num_bytes or 0
+
+    def advance(self, num_bytes):
+        with self._lock:
+            self.bytes_done += num_bytes
+            now = time.monotonic()
+            if self._interactive and now - self._last_report >= PROGRESS_INTERVAL:
+                self._last_report = now
+                self._write_status()
+
+    def finish_file(self, message):
+        with self._lock:
+            self.files_done += 1
+            if self._interactive:
+                sys.stdout.write("\r\033[K")
+            print(f"{self.indent}{message}")
+
+    def _write_status(self):
+        total = f" / {format_bytes(self.bytes_expected)}" if self.bytes_expected else ""
+        sys.stdout.write(
+            f"\r\033[K{self.indent}↓ {format_bytes(self.bytes_done)}{total} "
+            f"({self.files_done}/{self.total_files} files)"
+        )
+        sys.stdout.flush()
+
+
+def download_file(url, file_path, headers, progress, timeout=30, session=None):
+    """
+    Stream a single file to disk, reporting bytes to the shared progress.
+
+    The data is written to a ``.part`` file first and renamed once complete,
+    so an interrupted download never looks like a finished file. Passing a
+    requests.Session reuses its connection pool across downloads.
+
+    Returns:
+        int: Number of bytes written
+    """
+    tmp_path = file_path.with_name(file_path.name + '.part')
+    written = 0
+    try:
+        http = session or requests
+        with http.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            progress.expect(int(response.headers.get('Content-Length') or 0))
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        written += len(chunk)
+                        progress.advance(len(chunk))
+        tmp_path.replace(file_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return written
+
+
+def download_files(jobs, headers, max_workers=MAX_CONCURRENT_DOWNLOADS, timeout=30,
+                   skip_existing=False, indent="      ", session=None):
+    """
+    Download a thread's attachments concurrently.
+
+    Args:
+        jobs: List of (url, file_path) tuples; file_path is a pathlib.Path
+        headers: Request headers (see get_auth_headers)
+        max_workers: Maximum number of simultaneous downloads for this thread
+        timeout: Per-request timeout in seconds
+        skip_existing: Treat files already on disk as downloaded
+        indent: Prefix for progress lines
+        session: Optional requests.Session whose connection pool is reused
+
+    Returns:
+        tuple: (list of downloaded file names, dict of file name -> error message)
+    """
+    downloaded = []
+    errors = {}
+
+    # Two tags pointing at the same target would race on one file
+    pending = []
+    seen_paths = set()
+    for url, file_path in jobs:
+        if file_path in seen_paths:
+            continue
+        seen_paths.add(file_path)
+        if skip_existing and file_path.exists():
+            downloaded.append(file_path.name)
+            continue
+        pending.append((url, file_path))
+
+    if not pending:
+        return downloaded, errors
+
+    progress = DownloadProgress(len(pending), indent=indent)
+    workers = max(1, min(max_workers, len(pending)))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(download_file, url, file_path, headers, progress, timeout, session): file_path
+            for url, file_path in pending
+        }
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                size = future.result()
+                downloaded.append(file_path.name)
+                progress.finish_file(f"Downloaded: {file_path.name} ✓ ({size:,} bytes)")
+            except Exception as e:
+                errors[file_path.name] = str(e)
+                progress.finish_file(f"Failed: {file_path.name} ✗ ({e})")
+
+    return downloaded, errors
@@ -0,0 +1,441 @@
+"""
+Build the deployable site from website/.
+
+Copies website/ into dist/, renames the dataset, scripts, stylesheets and
+charts to content-hashed filenames (e.g. data.3f2a9c1b0d.js), rewrites the
+references in every HTML page, writes precompressed .gz/.br siblings for
+text assets, and keeps vercel.json in sync so fingerprinted files are served
+with an immutable Cache-Control header while HTML is always revalidated.
+
+Charts and other images referenced by the top-level pages get resized
+WebP/AVIF variants in dist/images/ (encoded in a process pool and cached in
+.image_cache/ by source hash), and their markup becomes <picture> elements
+with srcset/sizes, intrinsic dimensions and lazy loading.
+
+It also writes precache_manifest.js, the list of app-shell files (pages,
+scripts, stylesheets, charts, dataset) that service_worker.js precaches,
+versioned by their content hash so a new data.js invalidates the cache.
+
+Run after process_threads.py:
+    python build_site.py
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from pathlib import Path
+
+# brotli (.br output; gzip is always produced) and Pillow (WebP/AVIF image
+# variants; pages keep the PNGs without it) are imported inside the functions
+# that use them, so process_threads.py, which only needs
+# write_precache_manifest, loads neither
+BROTLI_AVAILABLE = find_spec('brotli') is not None
+PILLOW_AVAILABLE = find_spec('PIL') is not None
+
+SOURCE_DIR = Path("website")
+BUILD_DIR = Path("dist")
+VERCEL_CONFIG_FILE = Path("vercel.json")
+MANIFEST_FILE = "asset-manifest.json"  # Written into BUILD_DIR
+
+HASH_LENGTH = 10
+FINGERPRINT_PATTERNS = ["*.js", "*.css", "chart_*.png"]  # Top-level files in SOURCE_DIR
+PRECACHE_MANIFEST_FILE = "precache_manifest.js"
+SERVICE_WORKER_FILE = "service_worker.js"
+STABLE_NAMES = {SERVICE_WORKER_FILE, PRECACHE_MANIFEST_FILE}  # Must keep their URL; never fingerprinted
+PRECACHE_PATTERNS = ["*.html", "*.js", "*.css", "chart_*.png"]  # Top-level app shell
+COMPRESSIBLE_SUFFIXES = {".js", ".css", ".html", ".xml", ".json", ".svg", ".txt", ".md"}
+MIN_COMPRESS_SIZE = 1024  # Bytes; smaller files are not worth a sibling
+SKIP_NAMES = {".DS_Store"}
+
+IMAGE_DIR = "images"  # Responsive variants, written into BUILD_DIR
+IMAGE_CACHE_DIR = Path(".image_cache")  # Encoded variants keyed by source hash, width and settings
+IMAGE_WIDTHS = (480, 800, 1200, 1600)  # Plus each image's own width
+IMAGE_FORMATS = {  # Preferred first: format -> (MIME type, Pillow save options)
+    'avif': ('image/avif', {'quality': 60}),
+    'webp': ('image/webp', {'quality': 85, 'method': 6}),
+}
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg'}
+DEFAULT_IMAGE_SIZES = "(max-width: 1200px) 100vw, 1200px"  # Override per image with data-sizes
+DARK_MEDIA = "(prefers-color-scheme: dark)"
+IMAGE_MARKUP_PATTERN = re.compile(r'<picture\b[^>]*>.*?</picture>|<img\b[^>]*>', re.DOTALL)
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>')
+ATTRIBUTE_PATTERN = re.compile(r'([\w-]+)="([^"]*)"')
+
+# Matches the names produced by fingerprint(): name.<hash>.ext
+FINGERPRINTED_SOURCE = rf"/(.*\.[0-9a-f]{{{HASH_LENGTH}}}\.(?:js|css|png|webp|avif))"
+STABLE_SOURCE = r"/(service_worker\.js|precache_manifest\.js)"  # Vercel source for STABLE_NAMES
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def content_hash(path):
+    """Return the first HASH_LENGTH hex digits of a file's SHA-256."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def fingerprint(path):
+    """Return the fingerprinted filename for path (data.js -> data.<hash>.js)."""
+    return f"{path.stem}.{content_hash(path)}{path.suffix}"
+
+
+def link_or_copy(src, dst):
+    """Hard-link src to dst when possible (attachments are large), else copy."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def copy_source_tree(source_dir, build_dir):
+    """Recreate build_dir as a copy of source_dir."""
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    shutil.copytree(
+        source_dir, build_dir,
+        copy_function=link_or_copy,
+        ignore=shutil.ignore_patterns(*SKIP_NAMES),
+    )
+
+
+def fingerprint_assets(build_dir):
+    """
+    Rename fingerprintable assets in build_dir.
+
+    Returns:
+        dict: original filename -> fingerprinted filename
+    """
+    mapping = {}
+    for pattern in FINGERPRINT_PATTERNS:
+        for path in sorted(build_dir.glob(pattern)):
+            if path.name in STABLE_NAMES:
+                continue
+            hashed_name = fingerprint(path)
+            path.rename(path.with_name(hashed_name))
+            mapping[path.name] = hashed_name
+    return mapping
+
+
+def rewrite_references(build_dir, mapping):
+    """Point every HTML page at the fingerprinted asset names."""
+    if not mapping:
+        return 0
+
+    # Longest names first so e.g. chart_llm_by_hw_dark.png wins over a prefix
+    names = sorted(mapping, key=len, reverse=True)
+    pattern = re.compile(r'(?<![\w.-])(' + '|'.join(re.escape(n) for n in names) + r')(?![\w.-])')
+
+    rewritten = 0
+    for page in build_dir.rglob('*.html'):
+        text = page.read_text(encoding='utf-8')
+        new_text = pattern.sub(lambda m: mapping[m.group(1)], text)
+        if new_text != text:
+            # Pages may be hard links into website/; replace rather than edit in place
+            page.unlink()
+            page.write_text(new_text, encoding='utf-8')
+            rewritten += 1
+    return rewritten
+
+
+def image_formats():
+    """Variant formats this Pillow build can encode (AVIF needs libavif)."""
+    if not PILLOW_AVAILABLE:
+        return []
+    from PIL import Image
+    Image.init()
+    return [fmt for fmt in IMAGE_FORMATS if fmt.upper() in Image.SAVE]
+
+
+def local_image(src, build_dir):
+    """Return src if it names a convertible top-level image in build_dir."""
+    if not src or '/' in src or ':' in src or Path(src).suffix.lower() not in IMAGE_SUFFIXES:
+        return None
+    return src if (build_dir / src).is_file() else None
+
+
+def referenced_images(build_dir):
+    """Top-level images used by <img>/<picture> markup in the top-level pages."""
+    names = set()
+    for page in build_dir.glob('*.html'):
+        for img in IMG_TAG_PATTERN.findall(page.read_text(encoding='utf-8')):
+            attributes = dict(ATTRIBUTE_PATTERN.findall(img))
+            for key in ('src', 'data-theme-src-light', 'data-theme-src-dark'):
+                name = local_image(attributes.get(key), build_dir)
+                if name:
+                    names.add(name)
+    return names
+
+
+def variant_key(source_hash, width, fmt):
+    """Cache key (and filename hash) for one encoded variant."""
+    settings = f"{source_hash}:{width}:{fmt}:{sorted(IMAGE_FORMATS[fmt][1].items())}"
+    return hashlib.sha256(settings.encode()).hexdigest()[:HASH_LENGTH]
+
+
+def encode_variant(job):
+    """Resize and encode one variant into the cache (runs in a worker process)."""
+    from PIL import Image
+    source, width, fmt, cache_path = job
+    with Image.open(source) as image:
+        if width < image.width:
+            height = round(image.height * width / image.width)
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        partial = cache_path.with_name(cache_path.name + '.partial')
+        image.save(partial, fmt.upper(), **IMAGE_FORMATS[fmt][1])
+    partial.replace(cache_path)
+    return cache_path
+
+
+def build_image_variants(build_dir, names, cache_dir=IMAGE_CACHE_DIR, max_workers=None):
+    """
+    Write resized WebP/AVIF variants of top-level images into build_dir/images/.
+
+    Missing variants are encoded in parallel into cache_dir; cached ones are
+    only linked, so an unchanged chart is never re-encoded.
+
+    Returns:
+        tuple: ({name: {'width', 'height', 'srcsets': {format: srcset}}}, encoded count)
+    """
+    formats = image_formats()
+    if not formats or not names:
+        return {}, 0
+    from PIL import Image
+
+    cache_dir.mkdir(exist_ok=True)
+    (build_dir / IMAGE_DIR).mkdir(exist_ok=True)
+    variants, jobs, links = {}, [], []
+    for name in sorted(names):
+        source = build_dir / name
+        with Image.open(source) as image:
+            width, height = image.size
+        source_hash = content_hash(source)
+        widths = sorted({w for w in IMAGE_WIDTHS if w < width} | {width})
+        srcsets = {}
+        for fmt in formats:
+            entries = []
+            for w in widths:
+                key = variant_key(source_hash, w, fmt)
+                cache_path = cache_dir / f"{key}.{fmt}"
+                file_name = f"{source.stem}-{w}w.{key}.{fmt}"
+                if not cache_path.exists():
+                    jobs.append((source, w, fmt, cache_path))
+                links.append((cache_path, build_dir / IMAGE_DIR / file_name))
+                entries.append(f"{IMAGE_DIR}/{file_name} {w}w")
+            srcsets[fmt] = ", ".join(entries)
+        variants[name] = {'width': width, 'height': height, 'srcsets': srcsets}
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(encode_variant, jobs))
+    for cache_path, path in links:
+        link_or_copy(cache_path, path)
+    return variants, len(jobs)
+
+
+def add_img_attributes(img, attributes):
+    """Add attributes the <img> tag does not already set; drop data-sizes."""
+    img = re.sub(r'\s+data-sizes="[^"]*"', '', img)
+    missing = [f'{key}="{value}"' for key, value in attributes.items()
+               if not re.search(rf'\s{key}=', img)]
+    if not missing:
+        return img
+    end = len(img) - (2 if img.endswith('/>') else 1)
+    return f"{img[:end].rstrip()} {' '.join(missing)}{img[end:]}"
+
+
+def picture_markup(block, indent, variants):
+    """Rewrite one <picture> or <img> with responsive sources and lazy loading."""
+    img = IMG_TAG_PATTERN.search(block).group(0)
+    attributes = dict(ATTRIBUTE_PATTERN.findall(img))
+    if 'fetchpriority' in attributes:
+        lazy = {}  # Marked as above-the-fold
+    else:
+        lazy = {'loading': 'lazy', 'decoding': 'async'}
+
+    light = attributes.get('data-theme-src-light', attributes.get('src'))
+    dark = attributes.get('data-theme-src-dark')
+    if light not in variants:
+        return block.replace(img, add_img_attributes(img, lazy))
+
+    sizes = attributes.get('data-sizes', DEFAULT_IMAGE_SIZES)
+    sources = []
+    if dark:
+        for fmt, srcset in variants.get(dark, {}).get('srcsets', {}).items():
+            sources.append(f'<source type="{IMAGE_FORMATS[fmt][0]}" srcset="{srcset}" sizes="{sizes}" '
+                           f'media="{DARK_MEDIA}" data-theme="dark">')
+        sources.append(f'<source srcset="{dark}" media="{DARK_MEDIA}" data-theme="dark">')
+    theme = ' data-theme="light"' if dark else ''
+    for fmt, srcset in variants[light]['srcsets'].items():
+        sources.append(f'<source type="{IMAGE_FORMATS[fmt][0]}" srcset="{srcset}" sizes="{sizes}"{theme}>')
+
+    size = {'width': variants[light]['width'], 'height': variants[light]['height']}
+    img = add_img_attributes(img, {**size, **lazy})
+    lines = ["<picture>", *(f"{indent}    {line}" for line in sources + [img]), f"{indent}</picture>"]
+    return "\n".join(lines)
+
+
+def rewrite_image_markup(build_dir, variants):
+    """Emit <picture>/srcset markup and lazy loading in the top-level pages."""
+    rewritten = 0
+    for page in build_dir.glob('*.html'):
+        text = page.read_text(encoding='utf-8')
+
+        def replace(match):
+            line_start = text.rfind('\n', 0, match.start()) + 1
+            indent = re.match(r'[ \t]*', text[line_start:match.start()]).group(0)
+            return picture_markup(match.group(0), indent, variants)
+
+        new_text = IMAGE_MARKUP_PATTERN.sub(replace, text)
+        if new_text != text:
+            # Pages may be hard links into website/; replace rather than edit in place
+            page.unlink()
+            page.write_text(new_text, encoding='utf-8')
+            rewritten += 1
+    return rewritten
+
+
+def write_precache_manifest(site_dir):
+    """
+    Write precache_manifest.js listing the app shell for service_worker.js.
+
+    The version is a hash over every listed file, so regenerating data.js
+    (or any page, script or chart) gives the service worker a new cache.
+
+    Returns:
+        str: the manifest version
+    """
+    urls = sorted({
+        path.name
+        for pattern in PRECACHE_PATTERNS
+        for path in site_dir.glob(pattern)
+        if path.is_file() and path.name not in STABLE_NAMES
+    })
+
+    digest = hashlib.sha256()
+    for name in urls:
+        digest.update(name.encode())
+        digest.update(content_hash(site_dir / name).encode())
+    version = digest.hexdigest()[:HASH_LENGTH]
+
+    manifest = json.dumps({'version': version, 'urls': urls}, indent=2)
+    manifest_path = site_dir / PRECACHE_MANIFEST_FILE
+    if manifest_path.exists():
+        manifest_path.unlink()  # May be a hard link into website/
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        f.write("// Auto-generated by build_site.py - files precached by service_worker.js\n")
+        f.write(f"self.PRECACHE_MANIFEST = {manifest};\n")
+    return version
+
+
+def precompress(build_dir):
+    """Write .gz (and .br when available) siblings for text assets."""
+    if BROTLI_AVAILABLE:
+        import brotli
+    count = 0
+    for path in build_dir.rglob('*'):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_SIZE:
+            continue
+
+        # mtime=0 keeps the output byte-identical across builds
+        with open(path.with_name(path.name + '.gz'), 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if BROTLI_AVAILABLE:
+            with open(path.with_name(path.name + '.br'), 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+        count += 1
+    return count
+
+
+def write_vercel_config(config_path, build_dir):
+    """Update vercel.json so the build output is served with cache headers."""
+    config = {}
+    if config_path.exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+    config['buildCommand'] = "python3 build_site.py"
+    config['outputDirectory'] = build_dir.as_posix()
+    config['headers'] = [
+        {
+            "source": FINGERPRINTED_SOURCE,
+            "headers": [{"key": "Cache-Control", "value": IMMUTABLE}],
+        },
+        {
+            "source": "/(.*)\\.html",
+            "headers": [{"key": "Cache-Control", "value": REVALIDATE}],
+        },
+        {
+            "source": "/",
+            "headers": [{"key": "Cache-Control", "value": REVALIDATE}],
+        },
+        {
+            "source": STABLE_SOURCE,
+            "headers": [{"key": "Cache-Control", "value": REVALIDATE}],
+        },
+    ]
+
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
+        f.write('\n')
+
+
+def build(source_dir=SOURCE_DIR, build_dir=BUILD_DIR, config_path=VERCEL_CONFIG_FILE):
+    """Run the full build and return the asset mapping."""
+    print(f"Building {build_dir}/ from {source_dir}/...")
+
+    copy_source_tree(source_dir, build_dir)
+
+    variants, encoded = build_image_variants(build_dir, referenced_images(build_dir))
+    pages = rewrite_image_markup(build_dir, variants)
+    if variants:
+        count = sum(len(srcset.split(', ')) for v in variants.values() for srcset in v['srcsets'].values())
+        print(f"✓ {count} responsive variant(s) of {len(variants)} image(s) "
+              f"({encoded} encoded, {count - encoded} cached), {pages} page(s) updated")
+    elif not PILLOW_AVAILABLE:
+        print("⚠ Pillow not installed; images are served as PNG only")
+
+    mapping = fingerprint_assets(build_dir)
+    for original, hashed in mapping.items():
+        print(f"  {original} -> {hashed}")
+
+    pages = rewrite_references(build_dir, mapping)
+    print(f"✓ Rewrote asset references in {pages} page(s)")
+
+    with open(build_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, indent=2, sort_keys=True)
+
+    version = write_precache_manifest(build_dir)
+    print(f"✓ Wrote {PRECACHE_MANIFEST_FILE} (version {version})")
+
+    compressed = precompress(build_dir)
+    formats = "gzip + brotli" if BROTLI_AVAILABLE else "gzip (install brotli for .br)"
+    print(f"✓ Precompressed {compressed} file(s) with {formats}")
+
+    if config_path:
+        write_vercel_config(config_path, build_dir)
+        print(f"✓ Updated {config_path}")
+
+    return mapping
+
+
+def main():
+    print("=" * 70)
+    print("Building Fingerprinted Site")
+    print("=" * 70)
+    build()
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
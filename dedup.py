@@ -0,0 +1,216 @@
+"""
+Near-duplicate detection for reposted submissions and attachments.
+
+Threads: the title, content and text attachments (related.thread_text) are
+split into word 5-shingles and summarized as 128-value MinHash signatures.
+LSH banding (16 bands of 8 rows) puts threads with a matching band in the
+same bucket; only threads sharing a bucket are compared, so the work grows
+with the number of threads rather than the number of pairs. Candidates whose
+estimated Jaccard similarity is at least DUPLICATE_THRESHOLD are merged into
+clusters, and every thread but the newest in a cluster is marked with
+duplicate_of.
+
+Texts with fewer than MIN_SHINGLES shingles are never clustered: short posts
+("HW3 with Claude, transcript attached") look alike without being reposts.
+Only threads by the same author, or with the same attachment files, are
+merged, so two students' similar write-ups both stay visible.
+
+Attachments: files with identical bytes under different names (e.g.
+participation_a.pdf and Participation_A.pdf) map to one canonical name.
+"""
+
+import hashlib
+import random
+import zlib
+from collections import defaultdict
+from importlib.util import find_spec
+from pathlib import Path
+
+from related import thread_text, tokenize
+
+# NumPy vectorizes the signatures (pure Python otherwise); it is imported on
+# first use so importing this module stays cheap
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+SHINGLE_SIZE = 5  # Words per shingle
+MIN_SHINGLES = 10  # Shorter texts (under 14 words) are not compared
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS  # Candidate threshold ~ (1/16)^(1/8) = 0.71
+DUPLICATE_THRESHOLD = 0.8  # Estimated Jaccard similarity for a near-duplicate
+MINHASH_SEED = 182
+
+PRIME = 4294967291  # Largest prime below 2**32; (a * x + b) fits in 64 bits
+_rng = random.Random(MINHASH_SEED)
+HASH_A = [_rng.randrange(1, PRIME) for _ in range(NUM_PERMUTATIONS)]
+HASH_B = [_rng.randrange(0, PRIME) for _ in range(NUM_PERMUTATIONS)]
+
+
+def shingle_hashes(text):
+    """32-bit hashes of the word shingles of text; empty if there are fewer than MIN_SHINGLES."""
+    tokens = tokenize(text)
+    shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return []
+    return [zlib.crc32(s.encode('utf-8')) for s in shingles]
+
+
+def minhash_signature(hashes):
+    """MinHash signature (tuple of NUM_PERMUTATIONS ints), or None for empty input."""
+    if not hashes:
+        return None
+    if NUMPY_AVAILABLE:
+        import numpy as np
+
+        x = np.asarray(hashes, dtype=np.uint64)
+        a = np.asarray(HASH_A, dtype=np.uint64)[:, None]
+        b = np.asarray(HASH_B, dtype=np.uint64)[:, None]
+        return tuple(((a * x + b) % PRIME).min(axis=1).tolist())
+    return tuple(min((a * x + b) % PRIME for x in hashes) for a, b in zip(HASH_A, HASH_B))
+
+
+def estimated_jaccard(first, second):
+    return sum(1 for u, v in zip(first, second) if u == v) / NUM_PERMUTATIONS
+
+
+def lsh_candidate_pairs(signatures):
+    """Pairs of indices that share at least one LSH band bucket."""
+    buckets = defaultdict(list)
+    for index, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(LSH_BANDS):
+            key = (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            buckets[key].append(index)
+
+    pairs = set()
+    for members in buckets.values():
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pairs.add((first, second))
+    return pairs
+
+
+def _clusters(size, pairs):
+    """Connected components (union-find) with at least two members."""
+    parent = list(range(size))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for first, second in pairs:
+        root_first, root_second = find(first), find(second)
+        if root_first != root_second:
+            parent[max(root_first, root_second)] = min(root_first, root_second)
+
+    groups = defaultdict(list)
+    for i in range(size):
+        groups[find(i)].append(i)
+    return sorted(members for members in groups.values() if len(members) > 1)
+
+
+def duplicate_clusters(texts, threshold=DUPLICATE_THRESHOLD, can_merge=None):
+    """
+    Group near-duplicate texts.
+
+    Args:
+        can_merge: optional (first index, second index) -> bool; similar
+            pairs it rejects are not merged
+
+    Returns:
+        list: clusters as sorted lists of indices into texts
+    """
+    signatures = [minhash_signature(shingle_hashes(text)) for text in texts]
+    pairs = [
+        (first, second) for first, second in lsh_candidate_pairs(signatures)
+        if estimated_jaccard(signatures[first], signatures[second]) >= threshold
+        and (can_merge is None or can_merge(first, second))
+    ]
+    return _clusters(len(texts), pairs)
+
+
+def author_key(thread):
+    """Ed user id, or the display name for records without one; None if unknown."""
+    return thread.author_id if thread.author_id is not None else thread.author
+
+
+def attachment_digests(thread):
+    """Content digests of the thread's downloaded attachments (empty if none)."""
+    if not thread.folder or not thread.attachments:
+        return frozenset()
+    folder = Path(thread.folder) / "attachments"
+    return frozenset(file_digest(folder / name) for name in thread.attachments if (folder / name).is_file())
+
+
+def mark_duplicates(threads):
+    """
+    Set duplicate_of on reposts, pointing at the cluster's first thread.
+
+    threads should be sorted newest first (sort_threads), so the newest
+    version of an edited-and-reposted submission is the one kept. Similar
+    threads are only merged when they have the same author or the same
+    attachment files.
+
+    Returns:
+        list: clusters as lists of indices into threads
+    """
+    for thread in threads:
+        thread.duplicate_of = None
+    digests = {}
+
+    def can_merge(first, second):
+        author = author_key(threads[first])
+        if author is not None and author == author_key(threads[second]):
+            return True
+        for index in (first, second):
+            if index not in digests:
+                digests[index] = attachment_digests(threads[index])
+        return bool(digests[first]) and digests[first] == digests[second]
+
+    clusters = duplicate_clusters([thread_text(t) for t in threads], can_merge=can_merge)
+    for cluster in clusters:
+        canonical = threads[cluster[0]]
+        for index in cluster[1:]:
+            threads[index].duplicate_of = canonical.id
+    return clusters
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def duplicate_attachments(directory):
+    """
+    Map each byte-identical attachment to one canonical filename.
+
+    Only files that share a size are hashed.
+
+    Returns:
+        dict: duplicate filename -> canonical filename (first by name)
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return {}
+
+    by_size = defaultdict(list)
+    for path in sorted(directory.iterdir()):
+        if path.is_file():
+            by_size[path.stat().st_size].append(path)
+
+    aliases = {}
+    for paths in by_size.values():
+        if len(paths) < 2:
+            continue
+        canonical_by_digest = {}
+        for path in paths:
+            canonical = canonical_by_digest.setdefault(file_digest(path), path.name)
+            if canonical != path.name:
+                aliases[path.name] = canonical
+    return aliases
@@ -0,0 +1,123 @@
+"""
+Streaming extraction of elements from Ed Stem thread content.
+
+Ed stores a thread body as XML (<document version="2.0">...</document>).
+The downloaders only need the <file> attachments and process_threads.py
+only needs <link> targets, so instead of building a BeautifulSoup tree for
+every thread the content is fed through an lxml parser target. The target
+receives start-tag events and keeps the attributes of interesting elements;
+no tree is ever built.
+
+Content that is not well-formed XML (a stray '&' or '<' in a paragraph) is
+rescanned with the stdlib html.parser, the parser the downloaders used before:
+lxml's recovery mode silently drops every element after such an error.
+"""
+
+import re
+from html.parser import HTMLParser
+
+from lxml import etree
+
+FEED_CHUNK_SIZE = 64 * 1024  # Characters fed to the parser per call
+WRAPPER_TAG = "ed-content"  # Synthetic root so fragments still parse
+
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# Element name -> key in the result dict
+COLLECTED_TAGS = {
+    'file': 'files',
+    'link': 'links',
+    'document': 'documents',
+}
+
+
+class _ElementCollector:
+    """lxml parser target that records attributes of selected elements."""
+
+    def __init__(self):
+        self.result = {key: [] for key in COLLECTED_TAGS.values()}
+
+    def start(self, tag, attrib):
+        if '}' in tag:
+            tag = tag.rsplit('}', 1)[1]
+        key = COLLECTED_TAGS.get(tag.lower())
+        if key:
+            self.result[key].append(dict(attrib))
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self):
+        return self.result
+
+
+class _HTMLElementCollector(HTMLParser):
+    """Lenient fallback for malformed content (same result shape)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.result = {key: [] for key in COLLECTED_TAGS.values()}
+
+    def handle_starttag(self, tag, attrs):
+        key = COLLECTED_TAGS.get(tag.rsplit(':', 1)[-1])
+        if key:
+            self.result[key].append({name: value or '' for name, value in attrs})
+
+
+def _extract_with_html_parser(text):
+    collector = _HTMLElementCollector()
+    collector.feed(text)
+    collector.close()
+    return collector.result
+
+
+def extract_elements(content):
+    """
+    Pull <file>, <link> and <document> elements out of Ed XML content in one pass.
+
+    Args:
+        content: Thread content string (Ed XML); other types are str()-ed
+
+    Returns:
+        dict: {'files': [...], 'links': [...], 'documents': [...]}, each a list
+              of attribute dicts in document order
+    """
+    collector = _ElementCollector()
+    if not content:
+        return collector.close()
+
+    text = XML_DECLARATION.sub('', str(content), count=1)
+    # Strict parsing: in feed mode a recovering parser leaves error_log empty,
+    # so a syntax error is the only reliable sign that elements were lost
+    parser = etree.XMLParser(
+        target=collector,
+        resolve_entities='internal',
+        no_network=True,
+        huge_tree=True,
+    )
+
+    try:
+        parser.feed(f"<{WRAPPER_TAG}>")
+        for start in range(0, len(text), FEED_CHUNK_SIZE):
+            parser.feed(text[start:start + FEED_CHUNK_SIZE])
+        parser.feed(f"</{WRAPPER_TAG}>")
+        return parser.close()
+    except etree.XMLSyntaxError:
+        return _extract_with_html_parser(text)
+
+
+def extract_files(content):
+    """Return [{'url': ..., 'filename': ...}] for each <file> with a URL."""
+    return [
+        {'url': attrs.get('url', ''), 'filename': attrs.get('filename', '')}
+        for attrs in extract_elements(content)['files']
+        if attrs.get('url')
+    ]
+
+
+def extract_link_hrefs(content):
+    """Return the href of each <link> element, in document order."""
+    return [attrs['href'] for attrs in extract_elements(content)['links'] if attrs.get('href')]
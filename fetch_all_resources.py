@@ -6,15 +6,23 @@ Downloads lecture notes, homework questions, solutions, discussions, etc.
 import os
 import json
 import re
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from edapi import EdAPI
 from dotenv import load_dotenv
 
+from attachments import download_files, get_auth_headers
+from ed_content import extract_files
+import json_codec
+from profiling import profiled, setup_from_argv, stage
+from retry_queue import record_downloads, retry_queue
+
 load_dotenv()
 
 COURSE_ID = 84647
 OUTPUT_DIR = Path("course_resources")
+THREAD_INDEX_FILE = OUTPUT_DIR / "thread_index.json"  # Persisted thread number -> id map
+MAX_CONCURRENT_FETCHES = 8  # Parallel get_thread calls
 
 # Thread NUMBERS (not IDs) extracted from the summary post
 RESOURCES = {
@@ -80,8 +88,9 @@ def get_all_thread_numbers():
     return sorted(all_nums)
 
 
+@profiled("pagination")
 def fetch_all_threads_with_numbers(ed, course_id):
-    """Fetch all threads and build number-to-id mapping."""
+    """Fetch all threads and build number-to-id mapping (slow; index fallback only)."""
     print("Building thread number -> ID mapping...")
 
     all_threads = []
@@ -125,25 +134,111 @@ def fetch_all_threads_with_numbers(ed, course_id):
     return number_to_thread
 
 
+def load_thread_index(path, course_id):
+    """Load the persisted thread number -> id index for a course."""
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"  ⚠ Could not read {path}: {e}")
+        return {}
+    if data.get('course_id') != course_id:
+        return {}
+    return {int(num): thread_id for num, thread_id in data.get('threads', {}).items()}
+
+
+def save_thread_index(path, course_id, index):
+    """Persist the thread number -> id index (numbers never change ids)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'course_id': course_id,
+            'threads': {str(num): index[num] for num in sorted(index)},
+        }, f, indent=2)
+
+
+def resolve_missing_numbers(ed, course_id, numbers, index):
+    """
+    Look up thread ids for numbers missing from the index.
+
+    Each number is resolved directly with get_course_thread, which also
+    returns the full thread, so those threads need no second request. If
+    that endpoint fails, the course-wide listing is used as a fallback.
+
+    Returns:
+        dict: thread number -> full thread data for the threads fetched here
+    """
+    fetched = {}
+    if not numbers:
+        return fetched
+
+    print(f"Resolving {len(numbers)} thread number(s) missing from the index...")
+
+    def fetch(num):
+        try:
+            with stage("get_thread"):
+                return num, ed.get_course_thread(course_id, num), None
+        except Exception as e:
+            return num, None, e
+
+    unresolved = []
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+        for num, thread_data, error in executor.map(fetch, numbers):
+            if thread_data and thread_data.get('id'):
+                index[num] = thread_data['id']
+                fetched[num] = thread_data
+            else:
+                unresolved.append(num)
+
+    if unresolved:
+        number_to_thread = fetch_all_threads_with_numbers(ed, course_id)
+        for num in unresolved:
+            if num in number_to_thread:
+                index[num] = number_to_thread[num].get('id')
+
+    print(f"✓ Index now covers {len(index)} thread number(s)\n")
+    return fetched
+
+
+def fetch_threads(ed, number_to_id):
+    """
+    Fetch full thread data for several threads concurrently.
+
+    Returns:
+        dict: thread number -> thread data, or the exception raised for it
+    """
+    def fetch(item):
+        num, thread_id = item
+        try:
+            with stage("get_thread"):
+                return num, ed.get_thread(thread_id)
+        except Exception as e:
+            return num, e
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES) as executor:
+        return dict(executor.map(fetch, number_to_id.items()))
+
+
+@profiled("attachment_download")
 def download_attachments(thread_data, folder, ed):
-    """Download all attachments from a thread."""
+    """
+    Download all attachments from a thread concurrently.
+
+    Returns:
+        tuple: (list of downloaded file names, dict of file name -> error message)
+    """
     content = thread_data.get('content', '')
-    downloaded = []
+    jobs = []
 
     if not content:
-        return downloaded
+        return [], {}
 
     try:
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(str(content), 'html.parser')
-        file_tags = soup.find_all('file')
-
-        for file_tag in file_tags:
-            file_url = file_tag.get('url', '')
-            file_name = file_tag.get('filename', '')
-
-            if not file_url:
-                continue
+        for file_tag in extract_files(content):
+            file_url = file_tag['url']
+            file_name = file_tag['filename']
 
             if not file_name:
                 file_name = os.path.basename(file_url) or 'attachment'
@@ -152,32 +247,55 @@ def download_attachments(thread_data, folder, ed):
             if not safe_name:
                 safe_name = 'attachment'
 
-            file_path = folder / safe_name
-
-            if file_path.exists():
-                downloaded.append(safe_name)
-                continue
-
-            try:
-                headers = {}
-                if hasattr(ed, '_token') or hasattr(ed, 'token'):
-                    token = getattr(ed, '_token', None) or getattr(ed, 'token', None)
-                    if token:
-                        headers['Authorization'] = f'Bearer {token}'
-
-                response = requests.get(file_url, headers=headers, stream=True, timeout=60)
-                if response.status_code == 200:
-                    with open(file_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    downloaded.append(safe_name)
-                    print(f"        Downloaded: {safe_name}")
-            except Exception as e:
-                print(f"        Error: {e}")
+            jobs.append((file_url, folder / safe_name))
     except Exception as e:
         print(f"      Parse error: {e}")
-
-    return downloaded
+        return [], {}
+
+    downloaded, errors = download_files(jobs, get_auth_headers(ed), timeout=60,
+                                        skip_existing=True, indent="        ",
+                                        session=getattr(ed, 'session', None))
+    record_downloads(jobs, downloaded, errors, thread_number=thread_data.get('number'))
+    return downloaded, errors
+
+
+def save_resource_thread(thread_data, item_dir, thread_num, ed, results):
+    """Save a resource thread's JSON and attachments, updating results."""
+    thread_file = item_dir / f"thread_{thread_num}.json"
+    json_codec.dump(thread_data, thread_file)
+
+    title = thread_data.get('title', 'No title')[:40]
+    print(f"✓ {title}")
+
+    # Download attachments
+    attachments, errors = download_attachments(thread_data, item_dir, ed)
+    if attachments:
+        results["attachments"].extend(attachments)
+    for file_name, error in errors.items():
+        results["attachment_errors"].append({
+            "thread": thread_num, "file": file_name, "error": error
+        })
+    results["fetched"].append(thread_num)
+
+
+def retry_resource_thread(ed, payload):
+    """Fetch and save one queued resource thread (python main.py resume)."""
+    thread_num = payload['number']
+    item_dir = OUTPUT_DIR / payload['category'] / payload['item']
+    item_dir.mkdir(parents=True, exist_ok=True)
+    results = {"fetched": [], "failed": [], "attachments": [], "attachment_errors": []}
+    try:
+        with stage("get_thread"):
+            thread_data = ed.get_course_thread(COURSE_ID, thread_num)
+        if not thread_data:
+            raise ValueError("No data")
+        print(f"    #{thread_num}...", end=" ")
+        save_resource_thread(thread_data, item_dir, thread_num, ed, results)
+        retry_queue.record_success('resource_thread', thread_num)
+    except Exception as e:
+        print(f"    ✗ #{thread_num}: {e}")
+        retry_queue.record_failure('resource_thread', thread_num, payload, e)
+    return results
 
 
 def main():
@@ -193,24 +311,33 @@ def main():
         print(f"✗ Authentication failed: {e}")
         return
 
-    # Build number -> thread mapping
-    number_to_thread = fetch_all_threads_with_numbers(ed, COURSE_ID)
-
     # Get required numbers
     required_numbers = get_all_thread_numbers()
     print(f"Thread numbers to fetch: {len(required_numbers)}")
 
-    # Check which are available
-    available = [n for n in required_numbers if n in number_to_thread]
-    missing = [n for n in required_numbers if n not in number_to_thread]
-    print(f"Available: {len(available)}, Missing: {len(missing)}")
+    # Map numbers to ids from the persisted index, resolving only new numbers
+    thread_index = load_thread_index(THREAD_INDEX_FILE, COURSE_ID)
+    unknown = [n for n in required_numbers if n not in thread_index]
+    print(f"Indexed: {len(required_numbers) - len(unknown)}, To resolve: {len(unknown)}")
+    prefetched = resolve_missing_numbers(ed, COURSE_ID, unknown, thread_index)
+    if unknown:
+        save_thread_index(THREAD_INDEX_FILE, COURSE_ID, thread_index)
+
+    missing = [n for n in required_numbers if n not in thread_index]
     if missing:
         print(f"Missing numbers: {missing[:20]}{'...' if len(missing) > 20 else ''}\n")
 
+    # Fetch the remaining threads concurrently
+    to_fetch = {n: thread_index[n] for n in required_numbers
+                if n in thread_index and n not in prefetched}
+    print(f"Fetching {len(to_fetch)} thread(s)...")
+    thread_results = fetch_threads(ed, to_fetch)
+    thread_results.update(prefetched)
+
     # Create output directories
     OUTPUT_DIR.mkdir(exist_ok=True)
 
-    results = {"fetched": [], "failed": [], "attachments": []}
+    results = {"fetched": [], "failed": [], "attachments": [], "attachment_errors": []}
 
     # Fetch each category
     for category_name, category_items in RESOURCES.items():
@@ -232,40 +359,32 @@ def main():
 
                 print(f"    #{thread_num}{suffix}...", end=" ")
 
-                if thread_num not in number_to_thread:
+                # Failures are queued for `python main.py resume`
+                retry_payload = {'category': category_name, 'item': item_name, 'number': thread_num}
+
+                if thread_num not in thread_results:
                     print("✗ Not found in course")
                     results["failed"].append(thread_num)
+                    retry_queue.record_failure('resource_thread', thread_num, retry_payload, "Not found in course")
                     continue
 
-                thread_basic = number_to_thread[thread_num]
-                thread_id = thread_basic.get('id')
-
                 try:
-                    # Fetch full thread data
-                    thread_data = ed.get_thread(thread_id)
+                    thread_data = thread_results[thread_num]
+                    if isinstance(thread_data, Exception):
+                        raise thread_data
 
                     if thread_data:
-                        # Save thread data
-                        thread_file = item_dir / f"thread_{thread_num}.json"
-                        with open(thread_file, 'w', encoding='utf-8') as f:
-                            json.dump(thread_data, f, indent=2, ensure_ascii=False, default=str)
-
-                        # Download attachments
-                        attachments = download_attachments(thread_data, item_dir, ed)
-
-                        title = thread_data.get('title', 'No title')[:40]
-                        print(f"✓ {title}")
-                        if attachments:
-                            results["attachments"].extend(attachments)
-
-                        results["fetched"].append(thread_num)
+                        save_resource_thread(thread_data, item_dir, thread_num, ed, results)
+                        retry_queue.record_success('resource_thread', thread_num)
                     else:
                         print("✗ No data")
                         results["failed"].append(thread_num)
+                        retry_queue.record_failure('resource_thread', thread_num, retry_payload, "No data")
 
                 except Exception as e:
                     print(f"✗ Error: {e}")
                     results["failed"].append(thread_num)
+                    retry_queue.record_failure('resource_thread', thread_num, retry_payload, e)
 
     # Summary
     print("\n" + "=" * 70)
@@ -274,16 +393,24 @@ def main():
     print(f"Threads fetched: {len(results['fetched'])}")
     print(f"Threads failed: {len(results['failed'])}")
     print(f"Attachments downloaded: {len(results['attachments'])}")
+    print(f"Attachments failed: {len(results['attachment_errors'])}")
     print(f"Output directory: {OUTPUT_DIR.absolute()}")
 
     if results["failed"]:
         print(f"\nFailed: {results['failed']}")
+    for failure in results["attachment_errors"]:
+        print(f"  ✗ #{failure['thread']} {failure['file']}: {failure['error']}")
 
     summary_file = OUTPUT_DIR / "download_summary.json"
     with open(summary_file, 'w') as f:
         json.dump(results, f, indent=2)
     print(f"\nSummary: {summary_file}")
+    queued = retry_queue.counts().get('failed', 0)
+    if queued:
+        print(f"⚠ {queued} item(s) queued for retry; run `python main.py resume`")
 
 
 if __name__ == "__main__":
+    setup_from_argv("fetch_all_resources")
+    json_codec.setup_from_argv()
     main()
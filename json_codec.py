@@ -0,0 +1,121 @@
+"""
+JSON codec for thread files and generated artifacts.
+
+Every full_thread_data.json, participation_a_data.json, the pipeline cache
+and website/data.js goes through here. orjson is used when installed (several
+times faster than the json module for both loads and dumps) with a stdlib
+fallback that produces the same data. Large input files are memory-mapped so
+orjson parses them without copying them into a bytes object first.
+
+Output is compact by default; pretty (indent=2) output is written only on
+request:
+    python main.py --pretty-json process
+    python process_threads.py --pretty-json
+    PRETTY_JSON=1 python main.py pipeline
+"""
+
+import json
+import mmap
+import os
+import sys
+from datetime import date, datetime, time
+from pathlib import Path
+
+# Try to import orjson for faster encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+MMAP_THRESHOLD = 256 * 1024  # Files at least this large are memory-mapped (orjson only)
+PRETTY_FLAG = "--pretty-json"
+PRETTY = os.environ.get("PRETTY_JSON", "") not in ("", "0")  # Indent written files by default
+
+
+def loads(data):
+    """Decode JSON from str or bytes."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects lone surrogate escapes that the json module accepts
+            pass
+    return json.loads(data)
+
+
+def load(path):
+    """Decode a JSON file, memory-mapping large files when orjson is available."""
+    with open(path, 'rb') as f:
+        if ORJSON_AVAILABLE and os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    try:
+                        return orjson.loads(view)
+                    except orjson.JSONDecodeError:
+                        return json.loads(bytes(view))
+        return loads(f.read())
+
+
+def encode_default(obj):
+    """
+    JSON value for a type the encoders do not handle natively.
+
+    Dates and times use isoformat(), the RFC 3339 text orjson writes for
+    them, so the json fallback produces the same bytes; anything else is
+    written with str().
+    """
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumpb(obj, pretty=None, sort_keys=False):
+    """
+    Encode obj as UTF-8 JSON bytes.
+
+    Non-ASCII text is written as-is (ensure_ascii=False), non-string dict keys
+    are converted to strings, dates and times are written in RFC 3339 format
+    and other unknown types with str() (see encode_default).
+
+    Args:
+        pretty: indent with 2 spaces; defaults to PRETTY
+        sort_keys: sort object keys
+    """
+    pretty = PRETTY if pretty is None else pretty
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=encode_default, option=option)
+        except orjson.JSONEncodeError:
+            # Lone surrogates or integers beyond 64 bits; the json module handles both
+            pass
+    return json.dumps(obj, ensure_ascii=False, default=encode_default, sort_keys=sort_keys,
+                      indent=2 if pretty else None,
+                      separators=None if pretty else (',', ':')).encode('utf-8', 'backslashreplace')
+
+
+def dumps(obj, pretty=None, sort_keys=False):
+    """Encode obj as a JSON string (see dumpb)."""
+    return dumpb(obj, pretty=pretty, sort_keys=sort_keys).decode('utf-8')
+
+
+def dump(obj, path, pretty=None, sort_keys=False):
+    """Write obj to a JSON file (see dumpb)."""
+    with open(Path(path), 'wb') as f:
+        f.write(dumpb(obj, pretty=pretty, sort_keys=sort_keys))
+
+
+def setup_from_argv(argv=None):
+    """Enable pretty output if --pretty-json was passed."""
+    global PRETTY
+    argv = sys.argv if argv is None else argv
+    if PRETTY_FLAG not in argv:
+        return False
+    argv.remove(PRETTY_FLAG)
+    PRETTY = True
+    return True
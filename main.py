@@ -1,6 +1,211 @@
-def main():
-    print("Hello from extracredit!")
+"""
+Command-line entry point for the ExtraCredit pipeline.
+
+    python main.py sync               Download Special Participation A threads from Ed
+    python main.py fetch-resources    Download lecture/homework/discussion resources
+    python main.py process            Process downloaded threads into the site data
+    python main.py build              Build the fingerprinted site in dist/
+    python main.py stats              Print statistics from participation_a_data.json
+    python main.py export             Write the columnar export (Parquet or .npz)
+    python main.py watch              Poll Ed and rebuild the site as threads change
+    python main.py sync-courses       Ingest every course in courses.json concurrently
+    python main.py pipeline           Re-run only the stages whose inputs changed
+    python main.py serve              Serve a local JSON query API for the browse page
+    python main.py resume             Retry only the failed downloads (retry_queue.py)
+
+Add --profile before the subcommand to write per-stage profiles (see
+profiling.py), and --pretty-json to indent the JSON files it writes (compact
+by default, see json_codec.py). Every subcommand imports its modules only when
+it runs, so quick commands like process and stats never load edapi, requests
+or dotenv.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+def cmd_sync(args):
+    import ed_downloader as downloader
+    downloader.main()
+
+
+def cmd_fetch_resources(args):
+    import fetch_all_resources
+    fetch_all_resources.main()
+
+
+def cmd_process(args):
+    import process_threads
+    process_threads.main()
+
+
+def cmd_build(args):
+    import build_site
+    build_site.main()
+
+
+def cmd_stats(args):
+    import analytics
+    import process_threads
+
+    try:
+        threads = analytics.load_threads(args.data)
+    except FileNotFoundError:
+        print(f"✗ {args.data} not found; run `python main.py process` first")
+        return 1
+
+    print(f"{len(threads)} Special Participation A threads in {args.data}")
+    process_threads.print_summary(threads)
+
+    if analytics.NUMPY_AVAILABLE:
+        analytics.print_report(analytics.to_arrays(analytics.thread_columns(threads)))
+    else:
+        print("\n⚠ Install numpy for the LLM x homework table, view distribution and time series")
+    return 0
+
+
+def cmd_export(args):
+    import analytics
+
+    if not Path(args.data).exists():
+        print(f"✗ {args.data} not found; run `python main.py process` first")
+        return 1
+    analytics.main(args.data)
+    return 0
+
+
+def cmd_watch(args):
+    from watch import run_watch
+    run_watch(
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+        build=args.build,
+        once=args.once,
+    )
+
+
+def cmd_sync_courses(args):
+    import multi_course
+    multi_course.main(config_path=Path(args.config), max_workers=args.workers, api_rate=args.rate)
+
+
+def cmd_pipeline(args):
+    import pipeline
+    pipeline.main(until=args.until, fetch=args.fetch, force=args.force)
+
+
+def cmd_serve(args):
+    import query_server
+    return query_server.run_server(host=args.host, port=args.port, data_path=args.data)
+
+
+def cmd_resume(args):
+    import retry_queue
+    if args.list:
+        retry_queue.print_queue()
+        return 0
+    return 1 if retry_queue.resume(ignore_backoff=args.now) else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Special Participation A site tools")
+    parser.add_argument("--profile", action="store_true",
+                        help="write per-stage cProfile/tracemalloc reports to profiles/")
+    parser.add_argument("--pretty-json", action="store_true",
+                        help="indent written JSON files and data.js (compact by default)")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    subparsers.add_parser("sync", help="download matching threads from Ed (ed_downloader.py)") \
+        .set_defaults(func=cmd_sync)
+    subparsers.add_parser("fetch-resources", help="download course resources (fetch_all_resources.py)") \
+        .set_defaults(func=cmd_fetch_resources)
+    subparsers.add_parser("process", help="process downloaded threads into the site data") \
+        .set_defaults(func=cmd_process)
+    subparsers.add_parser("build", help="build the fingerprinted site in dist/") \
+        .set_defaults(func=cmd_build)
+
+    stats_parser = subparsers.add_parser("stats", help="print statistics for the processed dataset")
+    stats_parser.add_argument("--data", default="participation_a_data.json",
+                              help="processed dataset (default: participation_a_data.json)")
+    stats_parser.set_defaults(func=cmd_stats)
+
+    export_parser = subparsers.add_parser("export", help="write per-thread columns to Parquet (or .npz)")
+    export_parser.add_argument("--data", default="participation_a_data.json",
+                               help="processed dataset (default: participation_a_data.json)")
+    export_parser.set_defaults(func=cmd_export)
+
+    watch_parser = subparsers.add_parser("watch", help="poll Ed and rebuild changed threads")
+    watch_parser.add_argument("--min-interval", type=float, default=60,
+                              help="seconds between polls while threads are changing (default: 60)")
+    watch_parser.add_argument("--max-interval", type=float, default=900,
+                              help="longest wait between polls when quiet (default: 900)")
+    watch_parser.add_argument("--build", action="store_true",
+                              help="also run build_site.py after each rebuild")
+    watch_parser.add_argument("--once", action="store_true",
+                              help="poll a single time and exit")
+    watch_parser.set_defaults(func=cmd_watch)
+
+    courses_parser = subparsers.add_parser("sync-courses",
+                                           help="ingest several courses through one worker pool")
+    courses_parser.add_argument("--config", default="courses.json",
+                                help="JSON list of course configs (default: courses.json)")
+    courses_parser.add_argument("--workers", type=int, default=8,
+                                help="shared worker pool size (default: 8)")
+    courses_parser.add_argument("--rate", type=float, default=5.0,
+                                help="Ed API requests per second across all courses (default: 5)")
+    courses_parser.set_defaults(func=cmd_sync_courses)
+
+    pipeline_parser = subparsers.add_parser("pipeline",
+                                            help="run download/extract/dataset/site/build, skipping unchanged stages")
+    pipeline_parser.add_argument("--fetch", action="store_true",
+                                 help="download from Ed before processing")
+    pipeline_parser.add_argument("--force", action="store_true",
+                                 help="re-run every stage even if its inputs are unchanged")
+    pipeline_parser.add_argument("--until", choices=["download", "extract", "dataset", "site", "build"],
+                                 help="stop after this stage")
+    pipeline_parser.set_defaults(func=cmd_pipeline)
+
+    serve_parser = subparsers.add_parser("serve", help="serve indexed, paginated queries as JSON (local only)")
+    serve_parser.add_argument("--host", default="127.0.0.1",
+                              help="address to bind (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765,
+                              help="port to listen on (default: 8765)")
+    serve_parser.add_argument("--data", default="participation_a_data.json",
+                              help="processed dataset (default: participation_a_data.json)")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    resume_parser = subparsers.add_parser("resume", help="retry failed thread and attachment downloads")
+    resume_parser.add_argument("--now", action="store_true",
+                               help="ignore backoff and retry every failed item")
+    resume_parser.add_argument("--list", action="store_true",
+                               help="show the queue without retrying")
+    resume_parser.set_defaults(func=cmd_resume)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+
+    if args.profile:
+        import atexit
+        from profiling import profiler, PROFILE_DIR
+        profiler.enable()
+        atexit.register(profiler.write_reports, args.command.replace('-', '_'))
+        print(f"Profiling enabled; reports will be written to {PROFILE_DIR}/")
+
+    if args.pretty_json:
+        import json_codec
+        json_codec.PRETTY = True
+
+    return args.func(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
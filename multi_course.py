@@ -0,0 +1,220 @@
+"""
+Multi-course ingestion for Special Participation A threads.
+
+Downloads several Ed Stem course offerings concurrently. All courses share
+one bounded worker pool and one rate limiter for Ed API calls, so they do
+not fight over the same API quota the way separate ed_downloader.py runs
+would. Each thread's attachments are fetched one at a time inside its pool
+task, so the pool size bounds every request, attachment GETs included.
+Each course is written to its own tree and the processed threads are merged
+into the site dataset:
+
+    multi_course_output/<name>/downloaded_threads/...
+    multi_course_output/<name>/participation_a_data.json
+    participation_a_data.json, website/data.js   (merged, every thread tagged with its course)
+
+Courses are listed in courses.json:
+    [
+      {"name": "fa25", "course_id": 84647,
+       "category_filter": "Curiosity", "title_filter": "Special Participation A"}
+    ]
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import process_threads
+import ed_downloader as downloader
+
+COURSES_FILE = Path("courses.json")
+MULTI_OUTPUT_DIR = Path("multi_course_output")
+MAX_WORKERS = 8  # Shared across every course
+API_RATE = 5.0  # Ed API requests per second, across all courses
+API_BURST = 10  # Requests allowed back to back before throttling
+
+# EdAPI methods that count against the API quota
+RATE_LIMITED_METHODS = {'list_threads', 'get_thread', 'get_course_thread', 'get_user_info'}
+
+
+class RateLimiter:
+    """Thread-safe token bucket."""
+
+    def __init__(self, rate=API_RATE, burst=API_BURST):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedEdAPI:
+    """Wraps an EdAPI instance so quota-consuming calls go through a RateLimiter."""
+
+    def __init__(self, ed, limiter):
+        self._ed = ed
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._ed, name)
+        if name not in RATE_LIMITED_METHODS or not callable(attr):
+            return attr
+
+        def limited(*args, **kwargs):
+            self._limiter.acquire()
+            return attr(*args, **kwargs)
+        return limited
+
+
+def load_course_configs(path=COURSES_FILE):
+    """
+    Load course configs, defaulting to the single course configured in ed_downloader.py.
+
+    Returns:
+        list: dicts with name, course_id, category_filter, title_filter
+    """
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            raw_configs = json.load(f)
+    else:
+        print(f"⚠ {path} not found; using COURSE_ID from ed_downloader.py")
+        raw_configs = [{'course_id': downloader.COURSE_ID}]
+
+    configs = []
+    for raw in raw_configs:
+        configs.append({
+            'name': str(raw.get('name') or raw['course_id']),
+            'course_id': raw['course_id'],
+            'category_filter': raw.get('category_filter', downloader.CATEGORY_FILTER),
+            'title_filter': raw.get('title_filter', downloader.TITLE_FILTER),
+        })
+    return configs
+
+
+def course_download_dir(config, output_dir=MULTI_OUTPUT_DIR):
+    return output_dir / config['name'] / "downloaded_threads"
+
+
+def list_course_threads(ed, config):
+    """List and filter one course's threads (runs inside the shared pool)."""
+    all_threads = downloader.fetch_all_threads(ed, config['course_id'])
+    return downloader.filter_threads(
+        all_threads,
+        category_filter=config['category_filter'],
+        title_filter=config['title_filter'],
+    )
+
+
+def ingest_courses(ed, configs, output_dir=MULTI_OUTPUT_DIR, max_workers=MAX_WORKERS):
+    """
+    Download every matching thread of every course through one worker pool.
+
+    Returns:
+        dict: course name -> list of download stats
+    """
+    stats_by_course = {config['name']: [] for config in configs}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        listings = {pool.submit(list_course_threads, ed, config): config for config in configs}
+        downloads = {}
+
+        # Queue downloads as soon as each course's listing arrives
+        for future in as_completed(listings):
+            config = listings[future]
+            try:
+                threads = future.result()
+            except Exception as e:
+                print(f"✗ [{config['name']}] Could not list threads: {e}")
+                continue
+
+            download_dir = course_download_dir(config, output_dir)
+            download_dir.mkdir(parents=True, exist_ok=True)
+            print(f"[{config['name']}] Queued {len(threads)} thread(s)")
+            for thread in threads:
+                # No nested attachment pool: MAX_WORKERS is the only concurrency
+                task = pool.submit(downloader.download_thread, thread, config['course_id'], download_dir, ed,
+                                   attachment_workers=1)
+                downloads[task] = config
+
+        for future in as_completed(downloads):
+            config = downloads[future]
+            try:
+                stats_by_course[config['name']].append(future.result())
+            except Exception as e:
+                print(f"✗ [{config['name']}] Download failed: {e}")
+
+    return stats_by_course
+
+
+def merge_courses(configs, output_dir=MULTI_OUTPUT_DIR):
+    """Process each course tree, save it, and write the merged site dataset."""
+    merged = []
+    for config in configs:
+        download_dir = course_download_dir(config, output_dir)
+        if not download_dir.exists():
+            continue
+
+        print(f"\n[{config['name']}] Processing {download_dir}")
+        threads = process_threads.collect_threads(download_dir, lazy_text=True)
+        for thread in threads:
+            thread.course = config['name']
+            thread.course_id = config['course_id']
+        with process_threads.text_loaded(threads):
+            process_threads.save_output_data(threads, output_dir / config['name'] / "participation_a_data.json")
+        merged.extend(threads)
+
+    process_threads.sort_threads(merged)
+    with process_threads.text_loaded(merged):
+        process_threads.mark_duplicates(merged)
+        process_threads.write_outputs(merged)
+    return merged
+
+
+def main(config_path=COURSES_FILE, max_workers=MAX_WORKERS, api_rate=API_RATE):
+    print("=" * 70)
+    print("Multi-Course Ed Stem Ingestion")
+    print("=" * 70)
+
+    configs = load_course_configs(config_path)
+    print(f"Courses: {', '.join(c['name'] for c in configs)}\n")
+
+    from edapi import EdAPI
+    ed = EdAPI()
+    try:
+        ed.login()
+        print("✓ Successfully authenticated with Ed API\n")
+    except Exception as e:
+        print(f"✗ Authentication failed: {e}")
+        return
+
+    limited_ed = RateLimitedEdAPI(ed, RateLimiter(rate=api_rate))
+    stats_by_course = ingest_courses(limited_ed, configs, max_workers=max_workers)
+    merged = merge_courses(configs)
+
+    print("\n" + "=" * 70)
+    print("INGESTION COMPLETE")
+    print("=" * 70)
+    for name, stats in stats_by_course.items():
+        attachments = sum(s['files_downloaded'] for s in stats)
+        print(f"  {name}: {len(stats)} thread(s), {attachments} attachment(s)")
+    print(f"Merged dataset: {len(merged)} thread(s)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Make-like runner for the fetch -> process -> build workflow.
+
+The pipeline is a chain of stages, each with content-hashed inputs and
+outputs recorded in .pipeline/state.json:
+
+    download   Ed Stem -> downloaded_threads/            (only with --fetch)
+    extract    downloaded_threads/ -> .pipeline/records.json
+    dataset    records -> participation_a_data.json
+    site       participation_a_data.json -> website/data.js, thread pages, sitemap
+    build      website/ -> dist/                         (build_site.py)
+
+A stage's input hash covers its input files plus the source of the code it
+runs (functions and tables such as LLM_NORMALIZATION); dataset and site also
+cover the .txt/.md attachments that related threads and dedup read. A stage
+is skipped when that hash and the hash of its outputs both match the last
+run, so editing the normalization table re-runs extract and everything after
+it, while a template change only re-runs site and build. extract also caches
+each thread's record by the hash of its full_thread_data.json, so new
+downloads only cost the new threads.
+
+Usage:
+    python main.py pipeline [--fetch] [--force] [--until STAGE]
+"""
+
+import hashlib
+import inspect
+import json
+from pathlib import Path
+
+import attachment_meta
+import build_site
+import dedup
+import ed_content
+import json_codec
+import process_threads as pt
+import related
+import resource_index
+
+PIPELINE_DIR = Path(".pipeline")
+STATE_FILE = PIPELINE_DIR / "state.json"
+RECORDS_FILE = PIPELINE_DIR / "records.json"
+
+THREAD_DATA_FILE = "full_thread_data.json"
+
+
+# ----------------------------------------------------------------------
+# Hashing
+# ----------------------------------------------------------------------
+def hash_file(path, digest):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+
+def hash_paths(paths):
+    """Hash files and directory trees (relative names and contents)."""
+    digest = hashlib.sha256()
+    for root in paths:
+        root = Path(root)
+        digest.update(str(root).encode())
+        if root.is_file():
+            hash_file(root, digest)
+        elif root.is_dir():
+            for path in sorted(p for p in root.rglob('*') if p.is_file()):
+                digest.update(str(path.relative_to(root)).encode())
+                hash_file(path, digest)
+        else:
+            digest.update(b'<missing>')
+    return digest.hexdigest()
+
+
+def code_text(obj):
+    """Source of functions/classes/modules; repr of data tables (recursing into dicts)."""
+    if inspect.isfunction(obj) or inspect.isclass(obj) or inspect.ismodule(obj):
+        return inspect.getsource(obj)
+    if isinstance(obj, dict):
+        return repr([(key, code_text(value)) for key, value in obj.items()])
+    return repr(obj)
+
+
+def hash_code(objects):
+    """Hash the code and tables a stage depends on."""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(code_text(obj).encode())
+    return digest.hexdigest()
+
+
+def thread_folder_hash(folder):
+    """Hash exactly what process_thread() reads: the JSON and attachment names."""
+    digest = hashlib.sha256()
+    data_path = folder / THREAD_DATA_FILE
+    if data_path.exists():
+        hash_file(data_path, digest)
+    attachments = folder / "attachments"
+    if attachments.exists():
+        for name in sorted(p.name for p in attachments.iterdir()):
+            digest.update(name.encode())
+    return digest.hexdigest()
+
+
+def attachment_text_hash(download_dir):
+    """Hash the plain-text attachments related.thread_text() reads (related threads, dedup)."""
+    digest = hashlib.sha256()
+    if download_dir.exists():
+        for path in sorted(download_dir.glob('*/attachments/*')):
+            if path.suffix.lower() in related.ATTACHMENT_TEXT_SUFFIXES and path.is_file():
+                digest.update(str(path.relative_to(download_dir)).encode())
+                hash_file(path, digest)
+    return digest.hexdigest()
+
+
+def thread_folder_hashes(download_dir):
+    if not download_dir.exists():
+        return {}
+    return {
+        folder.name: thread_folder_hash(folder)
+        for folder in sorted(download_dir.iterdir()) if folder.is_dir()
+    }
+
+
+# Code each stage runs; editing any of these invalidates the stage
+EXTRACT_CODE = [
+    pt.LLM_NORMALIZATION, pt.normalize_llm_name, pt.LLM_PATTERNS, pt.HOMEWORK_PATTERNS,
+    pt.PARTICIPATION_TYPE_PATTERN, pt.LINK_PATTERNS, pt.GITHUB_PROFILE_PATTERN,
+    pt.LINKEDIN_PROFILE_PATTERN, pt.WEBSITE_PATTERNS, pt.FEATURE_KEYWORDS, pt.dedupe_links,
+    pt.KEYWORD_FOLD, pt.pattern_keywords, pt.compile_anchored, pt.keyword_positions,
+    pt.join_positions, pt._starts, pt.first_match, pt.all_matches,
+    pt.extract_features, pt.is_participation_a, pt.process_thread,
+    pt.ThreadRecord, ed_content,
+]
+DATASET_CODE = [
+    pt.ThreadRecord, pt.sort_threads, dedup, related, pt.group_threads, pt.build_output_data,
+    pt.save_output_data, json_codec,
+]
+SITE_CODE = [
+    pt.ThreadRecord, pt.LLM_PROVIDERS, pt.get_provider, pt.generate_data_js, pt.format_display_date,
+    pt.SORT_ORDERS, pt.COLLATION_FOLD, pt.ACCENT_ORDER, pt.PUNCTUATION_ORDER, pt.collation_key,
+    pt.epoch_millis, pt.build_sort_orders, related, dedup.duplicate_attachments,
+    resource_index, pt.SNIPPET_LENGTH, pt.LINK_END, pt.content_snippet, pt.content_lines,
+    pt.WEB_URL_SCHEMES, pt.is_web_url,
+    pt.format_content_html, pt.render_thread_page, pt.generate_thread_pages, pt.SITE_URL,
+    build_site.write_precache_manifest, json_codec, attachment_meta,
+]
+BUILD_CODE = [build_site]  # Includes the image variant settings
+
+# Website folders generate_data_js reads (attachment aliases, homework resources)
+SITE_DATA_DIRS = [
+    pt.WEBSITE_DATA_FILE.parent / "attachments",
+    *(pt.WEBSITE_DATA_FILE.parent / "resources" / category for category in resource_index.HOMEWORK_CATEGORIES),
+]
+
+
+# ----------------------------------------------------------------------
+# Stages
+# ----------------------------------------------------------------------
+def load_json(path, default):
+    if not path.exists():
+        return default
+    try:
+        return json_codec.load(path)
+    except Exception as e:
+        print(f"⚠ Could not read {path}: {e}")
+        return default
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    json_codec.dump(data, path, pretty=False)
+
+
+def run_download(context):
+    import ed_downloader as downloader
+    downloader.main()
+
+
+def attachment_text_input(context):
+    if 'attachment_text_hash' not in context:
+        context['attachment_text_hash'] = attachment_text_hash(pt.DOWNLOAD_DIR)
+    return context['attachment_text_hash']
+
+
+def extract_inputs(context):
+    context['folder_hashes'] = thread_folder_hashes(pt.DOWNLOAD_DIR)
+    return [hash_code(EXTRACT_CODE), context['folder_hashes']]
+
+
+def run_extract(context):
+    """Re-process only folders whose content or the extraction code changed."""
+    code_hash = hash_code(EXTRACT_CODE)
+    cache = load_json(RECORDS_FILE, {})
+    cached = cache.get('threads', {}) if cache.get('code') == code_hash else {}
+
+    threads = {}
+    reused = 0
+    for name, folder_hash in context['folder_hashes'].items():
+        entry = cached.get(name)
+        if entry and entry['hash'] == folder_hash:
+            reused += 1
+        else:
+            record = pt.process_thread(pt.DOWNLOAD_DIR / name)
+            entry = {'hash': folder_hash, 'record': record.to_dict() if record else None}
+        threads[name] = entry
+
+    write_json(RECORDS_FILE, {'code': code_hash, 'threads': threads})
+    print(f"  Processed {len(threads) - reused} thread folder(s), reused {reused} cached record(s)")
+
+
+def run_dataset(context):
+    records = load_json(RECORDS_FILE, {}).get('threads', {})
+    threads = [
+        pt.ThreadRecord.from_dict(entry['record'])
+        for _, entry in sorted(records.items()) if entry['record']
+    ]
+    pt.sort_threads(threads)
+    clusters = pt.mark_duplicates(threads)
+    print(f"  {len(threads)} Special Participation A threads, {len(clusters)} near-duplicate cluster(s)")
+    pt.save_output_data(threads, pt.OUTPUT_FILE)
+
+
+def run_site(context):
+    data = load_json(Path(pt.OUTPUT_FILE), {})
+    threads = [pt.ThreadRecord.from_dict(t) for t in data.get('threads', [])]
+    pt.generate_data_js(threads, pt.WEBSITE_DATA_FILE)
+    pt.generate_thread_pages(threads, pt.THREAD_PAGES_DIR, pt.SITEMAP_FILE)
+
+
+def run_build(context):
+    build_site.build()
+
+
+STAGES = [
+    {
+        'name': 'download',
+        'inputs': None,  # Remote; runs only when requested with --fetch
+        'outputs': [pt.DOWNLOAD_DIR],
+        'run': run_download,
+    },
+    {
+        'name': 'extract',
+        'inputs': extract_inputs,
+        'outputs': [RECORDS_FILE],
+        'run': run_extract,
+    },
+    {
+        'name': 'dataset',
+        'inputs': lambda context: [
+            hash_code(DATASET_CODE), hash_paths([RECORDS_FILE]), attachment_text_input(context),
+        ],
+        'outputs': [Path(pt.OUTPUT_FILE)],
+        'run': run_dataset,
+    },
+    {
+        'name': 'site',
+        'inputs': lambda context: [
+            hash_code(SITE_CODE), hash_paths([pt.OUTPUT_FILE] + SITE_DATA_DIRS),
+            attachment_text_input(context),
+        ],
+        'outputs': [
+            pt.WEBSITE_DATA_FILE, pt.WEBSITE_DATA_FILE.parent / build_site.PRECACHE_MANIFEST_FILE,
+            pt.THREAD_PAGES_DIR, pt.SITEMAP_FILE,
+            pt.WEBSITE_DATA_FILE.parent / attachment_meta.THUMBNAIL_DIR,
+        ],
+        'run': run_site,
+    },
+    {
+        'name': 'build',
+        'inputs': lambda context: [hash_code(BUILD_CODE), hash_paths([build_site.SOURCE_DIR])],
+        'outputs': [build_site.BUILD_DIR],
+        'run': run_build,
+    },
+]
+STAGE_NAMES = [stage['name'] for stage in STAGES]
+
+
+def run_pipeline(until=None, fetch=False, force=False):
+    """
+    Run the stages in order, skipping those whose inputs are unchanged.
+
+    Args:
+        until: Last stage to run (default: all)
+        fetch: Also download from Ed first
+        force: Re-run every stage regardless of hashes
+
+    Returns:
+        list: Names of the stages that ran
+    """
+    state = load_json(STATE_FILE, {})
+    context = {}
+    ran = []
+
+    last = STAGE_NAMES.index(until) if until else len(STAGES) - 1
+    for stage in STAGES[:last + 1]:
+        name = stage['name']
+
+        if stage['inputs'] is None:
+            if not fetch:
+                continue
+            input_hash = None
+        else:
+            input_hash = hashlib.sha256(
+                json.dumps(stage['inputs'](context), sort_keys=True).encode()
+            ).hexdigest()
+
+        previous = state.get(name, {})
+        up_to_date = (
+            not force
+            and input_hash is not None
+            and previous.get('inputs') == input_hash
+            and previous.get('outputs') == hash_paths(stage['outputs'])
+        )
+        if up_to_date:
+            print(f"✓ {name}: up to date")
+            continue
+
+        print(f"↻ {name}: running")
+        stage['run'](context)
+        ran.append(name)
+        state[name] = {'inputs': input_hash, 'outputs': hash_paths(stage['outputs'])}
+        write_json(STATE_FILE, state)
+
+    return ran
+
+
+def main(until=None, fetch=False, force=False):
+    print("=" * 70)
+    print("Pipeline")
+    print("=" * 70)
+    ran = run_pipeline(until=until, fetch=fetch, force=force)
+    print(f"\n{len(ran)} stage(s) ran: {', '.join(ran) if ran else 'none'}")
+    print("=" * 70)
@@ -5,15 +5,32 @@ Blue Team Enhanced Version - with data normalization and link extraction.
 """
 
 import os
-import json
+import sys
 import re
+import html
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from urllib.parse import quote, urlsplit
+
+from attachment_meta import collect_attachment_meta
+from build_site import write_precache_manifest
+from dedup import duplicate_attachments, mark_duplicates
+from ed_content import extract_link_hrefs
+import json_codec
+from profiling import profiled, setup_from_argv
+from related import related_threads
+from resource_index import build_homework_index
 
 # Directory containing downloaded threads
 DOWNLOAD_DIR = Path("downloaded_threads")
 OUTPUT_FILE = "participation_a_data.json"
 WEBSITE_DATA_FILE = Path("website/data.js")
+THREAD_PAGES_DIR = Path("website/threads")  # Static per-thread pages
+SITEMAP_FILE = Path("website/sitemap.xml")
+SITE_URL = os.environ.get("SITE_URL", "").rstrip("/")  # Absolute site root for the sitemap
 
 # Canonical LLM name mappings for consistency
 # NOTE: Order matters! More specific patterns should come first.
@@ -280,72 +297,104 @@ def normalize_llm_name(raw_name):
     # Capitalize first letter of each word if no match found
     return ' '.join(word.capitalize() for word in raw_name.strip().split())
 
+# Patterns are tried in order; the first pattern that matches anywhere wins
+# (more specific first). Matched case-insensitively.
+LLM_PATTERNS = [
+    # Claude with version - most specific first
+    r'Claude\s*\(?\s*(?:Sonnet|Opus|Haiku)\s*[\d.]+\s*\)?',
+    r'Claude\s+(?:Sonnet|Opus|Haiku)\s*[\d.]+',
+    r'Claude\s*[\d.]+\s*(?:Sonnet|Opus|Haiku)',
+    r'Claude\s+AI',
+    r'Claude(?:\s|$)',
+
+    # Kimi variants
+    r'Kimi\s*K2',
+    r'Kimi\s*K\d+',
+    r'Kimi(?:\s|$)',
+
+    # Llama variants
+    r'Llama\s*\d+\s*(?:Maverick|Scout)?',
+    r'Llama\s*\d+',
+
+    # GPT/ChatGPT o-series (reasoning models) - before general GPT patterns
+    r'ChatGPT[-\s]*[oO]\d*',
+    r'GPT[-\s]*[oO]\d+',
+    r'GPT[-\s]*[oO](?:\s|$)',
+
+    # GPT-OSS (open source variant)
+    r'gpt[-\s]*oss[-\s]*\d+b?',
+    r'GPT[-\s]*OSS[-\s]*\d+b?',
+
+    # GPT/ChatGPT with version and mode - capture all variants
+    r'(?:Chat)?GPT[-\s]*\d+(?:\.\d+)?\s*[-–]?\s*(?:Pro|Auto|Regular|\(Regular\)|Thinking|Extended(?:\s*Thinking)?)',
+    r'(?:Chat)?GPT[-\s]*\d+(?:\.\d+)?\s*\([^)]+\)',  # ChatGPT-5 (Regular) format
+    r'(?:Chat)?GPT[-\s]*\d+(?:\.\d+)?[oO]?',
+    r'ChatGPT\.?(?:\s|$)',
+
+    # Gemini with various formats
+    r'Gemini\s*\(?\s*(?:Thinking\s*(?:with\s*)?)?(?:Pro|Flash|Fast)\s*\d*\s*\)?(?:\s*\(?\s*Thinking\s*\)?)?',
+    r'Gemini[-\s]*Pro\s*\d+(?:\s*\(?\s*Thinking\s*\)?)?',
+    r'Gemini\s*[\d.]+\s*(?:Pro|Flash|Ultra)?',
+    r'Gemini\s*(?:Pro|Flash|Fast|Ultra)',
+    r'Gemini(?:\s|$)',
+
+    # DeepSeek with version
+    r'DeepSeek[-\s]*v?[\d.]+',
+    r'Deepseek[-\s]*v?[\d.]+',
+    r'DeepSeek(?:\s|$)',
+    r'Deepseek(?:\s|$)',
+
+    # Gemma with size
+    r'Gemma\s*[\d.]*\s*(?:\([^)]+\))?',
+
+    # Other models
+    r'Grok\s*[\d.]*',
+    r'Mistral(?:\s*AI)?',
+    r'NotebookLM',
+    r'Notebook\s*LM',
+    r'Qwen[\d.]*(?:-Max)?',
+    r'Cursor',
+    r'Windsurf',
+    r'Perplexity(?:\s*Pro)?',
+    r'Copilot',
+]
+
+HOMEWORK_PATTERNS = [
+    r'HW\s*0*(\d+)',      # HW01, HW1, HW 1 -> normalized
+    r'Homework\s*0*(\d+)',
+    r'HWK\s*0*(\d+)',
+]
+
+PARTICIPATION_TYPE_PATTERN = r'[Pp]articipation\s*([A-Ea-e])'
+
+# External links (chat shares, drive links, etc.), all matches of each in order
+LINK_PATTERNS = [
+    r'https?://claude\.ai/share/[a-zA-Z0-9-]+',
+    r'https?://chat\.deepseek\.com/share/[a-zA-Z0-9]+',
+    r'https?://grok\.com/share/[a-zA-Z0-9_-]+',
+    r'https?://chat\.mistral\.ai/chat/[a-zA-Z0-9-]+',
+    r'https?://chatgpt\.com/share/[a-zA-Z0-9-]+',
+    r'https?://drive\.google\.com/[^\s<>"]+',
+    r'https?://github\.com/[^\s<>"]+',
+    r'https?://linkedin\.com/in/[^\s<>"]+',
+    r'https?://www\.linkedin\.com/in/[^\s<>"]+',
+]
+
+# Student profiles; GitHub and LinkedIn are case-sensitive, websites are not
+GITHUB_PROFILE_PATTERN = r'https?://github\.com/([a-zA-Z0-9_-]+)(?:/|$)'
+LINKEDIN_PROFILE_PATTERN = r'https?://(?:www\.)?linkedin\.com/in/([a-zA-Z0-9_-]+)'
+WEBSITE_PATTERNS = [
+    r'(https?://[a-zA-Z0-9_-]+\.github\.io[^\s<>"]*)',
+    r'(https?://[a-zA-Z0-9_-]+\.vercel\.app[^\s<>"]*)',
+    r'(https?://[a-zA-Z0-9_-]+\.netlify\.app[^\s<>"]*)',
+]
+
+@profiled("extract_llm_name")
 def extract_llm_name(title, content):
     """Extract LLM name from title or content."""
-    # More specific patterns (order matters - more specific first)
-    llm_patterns = [
-        # Claude with version - most specific first
-        r'Claude\s*\(?\s*(?:Sonnet|Opus|Haiku)\s*[\d.]+\s*\)?',
-        r'Claude\s+(?:Sonnet|Opus|Haiku)\s*[\d.]+',
-        r'Claude\s*[\d.]+\s*(?:Sonnet|Opus|Haiku)',
-        r'Claude\s+AI',
-        r'Claude(?:\s|$)',
-
-        # Kimi variants
-        r'Kimi\s*K2',
-        r'Kimi\s*K\d+',
-        r'Kimi(?:\s|$)',
-
-        # Llama variants
-        r'Llama\s*\d+\s*(?:Maverick|Scout)?',
-        r'Llama\s*\d+',
-
-        # GPT/ChatGPT o-series (reasoning models) - before general GPT patterns
-        r'ChatGPT[-\s]*[oO]\d*',
-        r'GPT[-\s]*[oO]\d+',
-        r'GPT[-\s]*[oO](?:\s|$)',
-
-        # GPT-OSS (open source variant)
-        r'gpt[-\s]*oss[-\s]*\d+b?',
-        r'GPT[-\s]*OSS[-\s]*\d+b?',
-
-        # GPT/ChatGPT with version and mode - capture all variants
-        r'(?:Chat)?GPT[-\s]*\d+(?:\.\d+)?\s*[-–]?\s*(?:Pro|Auto|Regular|\(Regular\)|Thinking|Extended(?:\s*Thinking)?)',
-        r'(?:Chat)?GPT[-\s]*\d+(?:\.\d+)?\s*\([^)]+\)',  # ChatGPT-5 (Regular) format
-        r'(?:Chat)?GPT[-\s]*\d+(?:\.\d+)?[oO]?',
-        r'ChatGPT\.?(?:\s|$)',
-
-        # Gemini with various formats
-        r'Gemini\s*\(?\s*(?:Thinking\s*(?:with\s*)?)?(?:Pro|Flash|Fast)\s*\d*\s*\)?(?:\s*\(?\s*Thinking\s*\)?)?',
-        r'Gemini[-\s]*Pro\s*\d+(?:\s*\(?\s*Thinking\s*\)?)?',
-        r'Gemini\s*[\d.]+\s*(?:Pro|Flash|Ultra)?',
-        r'Gemini\s*(?:Pro|Flash|Fast|Ultra)',
-        r'Gemini(?:\s|$)',
-
-        # DeepSeek with version
-        r'DeepSeek[-\s]*v?[\d.]+',
-        r'Deepseek[-\s]*v?[\d.]+',
-        r'DeepSeek(?:\s|$)',
-        r'Deepseek(?:\s|$)',
-
-        # Gemma with size
-        r'Gemma\s*[\d.]*\s*(?:\([^)]+\))?',
-
-        # Other models
-        r'Grok\s*[\d.]*',
-        r'Mistral(?:\s*AI)?',
-        r'NotebookLM',
-        r'Notebook\s*LM',
-        r'Qwen[\d.]*(?:-Max)?',
-        r'Cursor',
-        r'Windsurf',
-        r'Perplexity(?:\s*Pro)?',
-        r'Copilot',
-    ]
-
     text = title + " " + (content or "")
 
-    for pattern in llm_patterns:
+    for pattern in LLM_PATTERNS:
         match = re.search(pattern, text, re.IGNORECASE)
         if match:
             raw_name = match.group(0).strip()
@@ -353,17 +402,12 @@ def extract_llm_name(title, content):
 
     return "Unknown LLM"
 
+@profiled("extract_homework")
 def extract_homework(title, content):
     """Extract homework number from title or content."""
-    hw_patterns = [
-        r'HW\s*0*(\d+)',      # HW01, HW1, HW 1 -> normalized
-        r'Homework\s*0*(\d+)',
-        r'HWK\s*0*(\d+)',
-    ]
-
     text = title + " " + (content or "")
 
-    for pattern in hw_patterns:
+    for pattern in HOMEWORK_PATTERNS:
         match = re.search(pattern, text, re.IGNORECASE)
         if match:
             # Remove leading zeros and format consistently
@@ -372,13 +416,27 @@ def extract_homework(title, content):
 
     return "Unknown HW"
 
+@profiled("extract_participation_type")
 def extract_participation_type(title):
     """Extract participation type (A, B, C, D, E) from title."""
-    match = re.search(r'[Pp]articipation\s*([A-Ea-e])', title)
+    match = re.search(PARTICIPATION_TYPE_PATTERN, title)
     if match:
         return match.group(1).upper()
     return "Unknown"
 
+def dedupe_links(links):
+    """Strip trailing slashes and drop repeats, preserving order."""
+    seen = set()
+    unique_links = []
+    for link in links:
+        # Clean up link
+        link = link.rstrip('/')
+        if link not in seen:
+            seen.add(link)
+            unique_links.append(link)
+    return unique_links
+
+@profiled("extract_links")
 def extract_links(raw_content, content):
     """Extract external links from content (chat shares, drive links, etc.)."""
     links = []
@@ -386,61 +444,33 @@ def extract_links(raw_content, content):
     # Combine both content sources
     text = (raw_content or "") + " " + (content or "")
 
-    # Patterns for various link types
-    link_patterns = [
-        r'https?://claude\.ai/share/[a-zA-Z0-9-]+',
-        r'https?://chat\.deepseek\.com/share/[a-zA-Z0-9]+',
-        r'https?://grok\.com/share/[a-zA-Z0-9_-]+',
-        r'https?://chat\.mistral\.ai/chat/[a-zA-Z0-9-]+',
-        r'https?://chatgpt\.com/share/[a-zA-Z0-9-]+',
-        r'https?://drive\.google\.com/[^\s<>"]+',
-        r'https?://github\.com/[^\s<>"]+',
-        r'https?://linkedin\.com/in/[^\s<>"]+',
-        r'https?://www\.linkedin\.com/in/[^\s<>"]+',
-    ]
-
-    for pattern in link_patterns:
+    for pattern in LINK_PATTERNS:
         matches = re.findall(pattern, text, re.IGNORECASE)
         links.extend(matches)
 
     # Also extract from XML link tags
-    xml_links = re.findall(r'<link href="([^"]+)"', text)
-    links.extend(xml_links)
-
-    # Deduplicate while preserving order
-    seen = set()
-    unique_links = []
-    for link in links:
-        # Clean up link
-        link = link.rstrip('/')
-        if link not in seen:
-            seen.add(link)
-            unique_links.append(link)
+    links.extend(extract_link_hrefs(raw_content))
 
-    return unique_links
+    return dedupe_links(links)
 
+@profiled("extract_student_profiles")
 def extract_student_profiles(raw_content, content, author):
     """Extract student profile links (GitHub, LinkedIn, personal website)."""
     profiles = {}
     text = (raw_content or "") + " " + (content or "")
 
     # GitHub profile
-    github_match = re.search(r'https?://github\.com/([a-zA-Z0-9_-]+)(?:/|$)', text)
+    github_match = re.search(GITHUB_PROFILE_PATTERN, text)
     if github_match:
         profiles['github'] = f"https://github.com/{github_match.group(1)}"
 
     # LinkedIn profile
-    linkedin_match = re.search(r'https?://(?:www\.)?linkedin\.com/in/([a-zA-Z0-9_-]+)', text)
+    linkedin_match = re.search(LINKEDIN_PROFILE_PATTERN, text)
     if linkedin_match:
         profiles['linkedin'] = f"https://linkedin.com/in/{linkedin_match.group(1)}"
 
     # Personal website (common patterns)
-    website_patterns = [
-        r'(https?://[a-zA-Z0-9_-]+\.github\.io[^\s<>"]*)',
-        r'(https?://[a-zA-Z0-9_-]+\.vercel\.app[^\s<>"]*)',
-        r'(https?://[a-zA-Z0-9_-]+\.netlify\.app[^\s<>"]*)',
-    ]
-    for pattern in website_patterns:
+    for pattern in WEBSITE_PATTERNS:
         match = re.search(pattern, text, re.IGNORECASE)
         if match:
             profiles['website'] = match.group(1).rstrip('/')
@@ -448,6 +478,185 @@ def extract_student_profiles(raw_content, content, author):
 
     return profiles if profiles else None
 
+# ----------------------------------------------------------------------
+# Single-pass feature extraction
+# ----------------------------------------------------------------------
+# Every pattern above starts with one of these words (case-insensitive).
+# extract_features finds all keyword positions once per text, then tries
+# each pattern only at the positions of its own keyword. Since a pattern can
+# only match where its keyword starts, trying those positions left to right
+# gives exactly re.search / re.findall over the whole text.
+FEATURE_KEYWORDS = (
+    'claude', 'kimi', 'llama', 'chatgpt', 'gpt', 'gemini', 'gemma', 'deepseek', 'grok',
+    'mistral', 'notebook', 'qwen', 'cursor', 'windsurf', 'perplexity', 'copilot',
+    'homework', 'hw', 'http',
+)
+# Case folding that keeps string positions: ASCII letters, plus the non-ASCII
+# characters re.IGNORECASE matches to an ASCII letter (İ ı ſ and the Kelvin sign)
+KEYWORD_FOLD = str.maketrans({
+    **{c: c.lower() for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'},
+    '\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k',
+})
+
+def pattern_keywords(pattern):
+    """
+    Keywords a pattern's match can start with, or None if unknown.
+
+    Handles a leading optional word ("(?:Chat)?GPT" -> chatgpt, gpt) and a
+    leading capture group; anything else unknown is searched the slow way.
+    """
+    optional = re.match(r'\(\?:([A-Za-z]+)\)\?', pattern)
+    if optional:
+        rest = pattern[optional.end():]
+        with_word = pattern_keywords(optional.group(1) + rest)
+        without_word = pattern_keywords(rest)
+        if with_word is None or without_word is None:
+            return None
+        return with_word + without_word
+
+    if pattern.startswith('(') and not pattern.startswith('(?'):
+        pattern = pattern[1:]
+    literal = re.match(r'[A-Za-z]+', pattern)
+    if not literal:
+        return None
+    word = literal.group(0)
+    if pattern[literal.end():literal.end() + 1] in ('?', '*', '{'):
+        word = word[:-1]  # Last letter is optional
+    word = word.lower()
+    matches = tuple(i for i, keyword in enumerate(FEATURE_KEYWORDS) if word.startswith(keyword))
+    return matches or None
+
+def compile_anchored(patterns, flags=re.IGNORECASE):
+    return [(re.compile(pattern, flags), pattern_keywords(pattern)) for pattern in patterns]
+
+ANCHORED_LLM_PATTERNS = compile_anchored(LLM_PATTERNS)
+ANCHORED_HOMEWORK_PATTERNS = compile_anchored(HOMEWORK_PATTERNS)
+ANCHORED_LINK_PATTERNS = compile_anchored(LINK_PATTERNS)
+ANCHORED_GITHUB_PATTERN = compile_anchored([GITHUB_PROFILE_PATTERN], 0)
+ANCHORED_LINKEDIN_PATTERN = compile_anchored([LINKEDIN_PROFILE_PATTERN], 0)
+ANCHORED_WEBSITE_PATTERNS = compile_anchored(WEBSITE_PATTERNS)
+COMPILED_PARTICIPATION_TYPE_PATTERN = re.compile(PARTICIPATION_TYPE_PATTERN)
+
+def keyword_positions(text):
+    """Start positions of each keyword in text, by keyword index."""
+    folded = text.translate(KEYWORD_FOLD)
+    positions = {}
+    for index, keyword in enumerate(FEATURE_KEYWORDS):
+        start = folded.find(keyword)
+        if start == -1:
+            continue
+        found = positions[index] = []
+        while start != -1:
+            found.append(start)
+            start = folded.find(keyword, start + 1)
+    return positions
+
+def join_positions(first, first_length, second):
+    """keyword_positions of first + " " + second, from those of the parts."""
+    offset = first_length + 1
+    return {
+        index: first.get(index, []) + [p + offset for p in second.get(index, [])]
+        for index in first.keys() | second.keys()
+    }
+
+def _starts(keywords, positions):
+    if len(keywords) == 1:
+        return positions.get(keywords[0], ())
+    return sorted(p for index in keywords for p in positions.get(index, ()))
+
+def first_match(anchored_patterns, text, positions):
+    """Match of the first pattern that matches anywhere (like re.search in order)."""
+    for pattern, keywords in anchored_patterns:
+        if keywords is None:
+            match = pattern.search(text)
+            if match:
+                return match
+            continue
+        for start in _starts(keywords, positions):
+            match = pattern.match(text, start)
+            if match:
+                return match
+    return None
+
+def all_matches(anchored_patterns, text, positions):
+    """re.findall results of each pattern in turn."""
+    results = []
+    for pattern, keywords in anchored_patterns:
+        if keywords is None:
+            results.extend(pattern.findall(text))
+            continue
+        end = 0
+        for start in _starts(keywords, positions):
+            if start < end:
+                continue  # Inside the previous match; findall does not overlap
+            match = pattern.match(text, start)
+            if match:
+                if pattern.groups == 0:
+                    results.append(match.group(0))
+                elif pattern.groups == 1:
+                    results.append(match.group(1))
+                else:
+                    results.append(match.groups())
+                end = match.end()
+    return results
+
+@profiled("extract_features")
+def extract_features(title, content, raw_content, author):
+    """
+    LLM, homework, participation type, links and profiles in one pass.
+
+    Same results as extract_llm_name, extract_homework,
+    extract_participation_type, extract_links and extract_student_profiles,
+    but the title, content and raw content are each scanned once.
+
+    Returns:
+        dict with keys llm_used, homework, participation_type, links, profiles
+    """
+    content = content or ""
+    raw_content = raw_content or ""
+    title_positions = keyword_positions(title)
+    content_positions = keyword_positions(content)
+    raw_positions = keyword_positions(raw_content)
+
+    # title + " " + content: LLM and homework
+    text = title + " " + content
+    positions = join_positions(title_positions, len(title), content_positions)
+
+    match = first_match(ANCHORED_LLM_PATTERNS, text, positions)
+    llm_used = normalize_llm_name(match.group(0).strip()) if match else "Unknown LLM"
+
+    match = first_match(ANCHORED_HOMEWORK_PATTERNS, text, positions)
+    homework = f"HW{int(match.group(1))}" if match else "Unknown HW"
+
+    match = COMPILED_PARTICIPATION_TYPE_PATTERN.search(title)
+    participation_type = match.group(1).upper() if match else "Unknown"
+
+    # raw_content + " " + content: links and profiles
+    text = raw_content + " " + content
+    positions = join_positions(raw_positions, len(raw_content), content_positions)
+
+    links = all_matches(ANCHORED_LINK_PATTERNS, text, positions)
+    links.extend(extract_link_hrefs(raw_content))
+
+    profiles = {}
+    match = first_match(ANCHORED_GITHUB_PATTERN, text, positions)
+    if match:
+        profiles['github'] = f"https://github.com/{match.group(1)}"
+    match = first_match(ANCHORED_LINKEDIN_PATTERN, text, positions)
+    if match:
+        profiles['linkedin'] = f"https://linkedin.com/in/{match.group(1)}"
+    match = first_match(ANCHORED_WEBSITE_PATTERNS, text, positions)
+    if match:
+        profiles['website'] = match.group(1).rstrip('/')
+
+    return {
+        'llm_used': llm_used,
+        'homework': homework,
+        'participation_type': participation_type,
+        'links': dedupe_links(links),
+        'profiles': profiles or None,
+    }
+
 def is_participation_a(title):
     """Check if this is a Special Participation A post."""
     # Must have "Participation A" in title (not B, C, D, E)
@@ -458,16 +667,152 @@ def is_participation_a(title):
         return True
     return False
 
-def process_thread(thread_folder):
-    """Process a single thread folder and extract information."""
+# Thread fields in participation_a_data.json order; optional ones are omitted when unset
+RECORD_FIELDS = (
+    'id', 'title', 'author', 'author_id', 'llm_used', 'homework', 'participation_type',
+    'content', 'raw_content', 'created_at', 'view_count', 'reply_count', 'folder',
+    'links', 'profiles', 'attachments', 'has_pdf', 'course', 'course_id', 'duplicate_of',
+)
+OPTIONAL_RECORD_FIELDS = {'links', 'profiles', 'course', 'course_id', 'duplicate_of'}
+INTERNED_FIELDS = ('author', 'llm_used', 'homework', 'participation_type')
+
+_UNLOADED = object()  # Marks content/raw_content left on disk
+
+class ThreadRecord:
+    """One processed Special Participation A thread.
+
+    Slotted instead of a dict, with the categorical strings (author, LLM,
+    homework, participation type) interned so repeated values share one
+    object. With lazy text the content/raw_content fields are dropped after
+    extraction and re-read from the thread folder when accessed.
+    """
+
+    __slots__ = (
+        'id', 'title', 'author', 'author_id', 'llm_used', 'homework', 'participation_type',
+        'created_at', 'view_count', 'reply_count', 'folder', 'links', 'profiles',
+        'attachments', 'has_pdf', 'course', 'course_id', 'duplicate_of',
+        '_content', '_raw_content',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.view_count = 0
+        self.reply_count = 0
+        self.attachments = []
+        self.has_pdf = False
+        for name, value in fields.items():
+            setattr(self, name, value)
+        for name in INTERNED_FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, str):
+                setattr(self, name, sys.intern(value))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a participation_a_data.json thread object."""
+        return cls(**{key: value for key, value in data.items() if key in RECORD_FIELDS})
+
+    def _read_text(self):
+        """Return (content, raw_content) from the thread folder."""
+        try:
+            data = json_codec.load(Path(self.folder) / "full_thread_data.json")
+            return data.get('document', ''), data.get('content', '')
+        except Exception as e:
+            print(f"Error reading text for thread {self.id}: {e}")
+            return '', ''
+
+    @property
+    def content(self):
+        if self._content is _UNLOADED:
+            return self._read_text()[0]
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+
+    @property
+    def raw_content(self):
+        if self._raw_content is _UNLOADED:
+            return self._read_text()[1]
+        return self._raw_content
+
+    @raw_content.setter
+    def raw_content(self, value):
+        self._raw_content = value
+
+    @property
+    def provider(self):
+        return get_provider(self.llm_used)
+
+    def unload_text(self):
+        """Drop content/raw_content from memory; they are re-read on access."""
+        if self.folder:
+            self._content = _UNLOADED
+            self._raw_content = _UNLOADED
+
+    def load_text(self):
+        """Read unloaded content/raw_content back in one read. Returns True if it read."""
+        if self._content is not _UNLOADED and self._raw_content is not _UNLOADED:
+            return False
+        content, raw_content = self._read_text()
+        if self._content is _UNLOADED:
+            self._content = content
+        if self._raw_content is _UNLOADED:
+            self._raw_content = raw_content
+        return True
+
+    def to_dict(self):
+        """Return the participation_a_data.json thread object."""
+        data = {}
+        if self._content is _UNLOADED or self._raw_content is _UNLOADED:
+            content, raw_content = self._read_text()
+        else:
+            content, raw_content = self._content, self._raw_content
+        for name in RECORD_FIELDS:
+            if name == 'content':
+                value = content
+            elif name == 'raw_content':
+                value = raw_content
+            else:
+                value = getattr(self, name)
+            if value is None and name in OPTIONAL_RECORD_FIELDS:
+                continue
+            data[name] = value
+        return data
+
+@contextmanager
+def text_loaded(threads):
+    """
+    Keep lazy records' text in memory for one rebuild.
+
+    Every content/raw_content access on a lazy record re-reads its JSON, and
+    dedup, related threads, the dataset and the site pages each read the text,
+    so a rebuild loads it once up front and drops it again afterwards.
+    """
+    loaded = [thread for thread in threads if thread.load_text()]
+    try:
+        yield threads
+    finally:
+        for thread in loaded:
+            thread.unload_text()
+
+@profiled("process_thread")
+def process_thread(thread_folder, lazy_text=False):
+    """Process a single thread folder and extract information.
+
+    Returns a ThreadRecord, or None if the folder is not a Special
+    Participation A thread. With lazy_text the record does not keep the
+    thread content in memory.
+    """
     full_data_path = thread_folder / "full_thread_data.json"
 
     if not full_data_path.exists():
         return None
 
     try:
-        with open(full_data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = json_codec.load(full_data_path)
     except Exception as e:
         print(f"Error reading {full_data_path}: {e}")
         return None
@@ -483,76 +828,206 @@ def process_thread(thread_folder):
     user = data.get('user', {})
     author = user.get('name', 'Anonymous')
 
-    # Extract information
-    thread_info = {
-        'id': data.get('id'),
-        'title': title,
-        'author': author,
-        'author_id': user.get('id'),
-        'llm_used': extract_llm_name(title, document),
-        'homework': extract_homework(title, document),
-        'participation_type': extract_participation_type(title),
-        'content': document,  # Plain text content
-        'raw_content': content,  # XML content
-        'created_at': data.get('created_at'),
-        'view_count': data.get('view_count', 0),
-        'reply_count': data.get('reply_count', 0),
-        'folder': str(thread_folder),
-    }
-
-    # Extract external links (chat shares, etc.)
-    links = extract_links(content, document)
-    if links:
-        thread_info['links'] = links
-
-    # Extract student profile links
-    profiles = extract_student_profiles(content, document, author)
-    if profiles:
-        thread_info['profiles'] = profiles
+    # Extract information (LLM, homework, links, profiles) in one pass
+    features = extract_features(title, document, content, author)
+    record = ThreadRecord(
+        id=data.get('id'),
+        title=title,
+        author=author,
+        author_id=user.get('id'),
+        llm_used=features['llm_used'],
+        homework=features['homework'],
+        participation_type=features['participation_type'],
+        content=document,  # Plain text content
+        raw_content=content,  # XML content
+        created_at=data.get('created_at'),
+        view_count=data.get('view_count', 0),
+        reply_count=data.get('reply_count', 0),
+        folder=str(thread_folder),
+        links=features['links'] or None,  # External links (chat shares, etc.)
+        profiles=features['profiles'],  # Student profile links
+    )
 
     # Check for attachments
     attachments_folder = thread_folder / "attachments"
     if attachments_folder.exists():
         attachments = list(attachments_folder.glob('*'))
-        thread_info['attachments'] = [f.name for f in attachments]
-        thread_info['has_pdf'] = any(f.suffix.lower() == '.pdf' for f in attachments)
-    else:
-        thread_info['attachments'] = []
-        thread_info['has_pdf'] = False
+        record.attachments = [f.name for f in attachments]
+        record.has_pdf = any(f.suffix.lower() == '.pdf' for f in attachments)
+
+    if lazy_text:
+        record.unload_text()
+
+    return record
+
+# Letters NFKD does not decompose: localeCompare sorts them as a base letter
+# plus a mark (ø like o with a stroke) and ligatures as their letters (æ
+# after ae and every accented ae)
+COLLATION_FOLD = str.maketrans({
+    'ø': 'o\u0338', 'Ø': 'O\u0338', 'ł': 'l\u0338', 'Ł': 'L\u0338',
+    'đ': 'd\u0338', 'Đ': 'D\u0338', 'ð': 'd\u0335', 'Ð': 'D\u0335', 'ħ': 'h\u0338', 'Ħ': 'H\u0338',
+    'æ': 'a\u0335e', 'Æ': 'A\u0335E', 'œ': 'o\u0335e', 'Œ': 'O\u0335E', 'ß': 's\u0335s',
+})
+# Accent order of the Unicode collation algorithm (acute < grave < ... < macron);
+# other combining marks sort after these
+ACCENT_ORDER = '\u0301\u0300\u0306\u0302\u030c\u030a\u0308\u030b\u0303\u0307\u0338\u0327\u0328\u0304'
+# ASCII punctuation in collation order; it all sorts before digits and letters
+PUNCTUATION_ORDER = ' _-,;:!?.\'"()[]{}@*/\\&#%`^+<=>|~$'
+
+def collation_key(text):
+    """
+    Sort key equivalent to String.prototype.localeCompare for names.
+
+    Like the Unicode collation algorithm, strings are compared on their
+    letters ignoring accents and case (punctuation before digits before
+    letters), then on accents, then on case (lowercase first), and finally
+    on the original string so distinct names never tie.
+    """
+    letters, accents, cases = [], [], []
+    for char in unicodedata.normalize('NFKD', text.translate(COLLATION_FOLD)):
+        if unicodedata.combining(char):
+            rank = ACCENT_ORDER.find(char)
+            accents.append(chr(2 + rank) if rank >= 0 else chr(2 + len(ACCENT_ORDER) + ord(char)))
+            continue
+        if char.isalnum():
+            letters.append(char.casefold())
+        else:
+            rank = PUNCTUATION_ORDER.find(char)
+            letters.append('\0' + (chr(1 + rank) if rank >= 0 else char))
+        accents.append('\1')
+        cases.append('\2' if char.isupper() else '\1')
+    return ''.join(letters), ''.join(accents), ''.join(cases), text
+
+# Browse page sort options (the <select> values in browse.html) -> key over
+# data.js thread objects. The name orders use collation_key so they match the
+# localeCompare comparators in browse_query.js. Python's sort is stable like
+# Array.prototype.sort, so ties keep dataset order as the comparators do.
+SORT_ORDERS = {
+    'date-desc': lambda t: -t['created_ts'],
+    'date-asc': lambda t: t['created_ts'],
+    'views-desc': lambda t: -t['view_count'],
+    'author-asc': lambda t: collation_key(t['author']),
+    'llm-asc': lambda t: collation_key(t['llm_used']),
+}
+
+def epoch_millis(date_str):
+    """Milliseconds since the epoch for an ISO timestamp, 0 if missing or invalid."""
+    try:
+        return int(datetime.fromisoformat(str(date_str)).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return 0
+
+def build_sort_orders(website_threads):
+    """Thread indices in display order for every browse sort option."""
+    indices = range(len(website_threads))
+    return {
+        name: sorted(indices, key=lambda i: key(website_threads[i]))
+        for name, key in SORT_ORDERS.items()
+    }
+
+SNIPPET_LENGTH = 150  # Content characters shown on submission cards
+
+# A known link ends here: optional trailing slash, then a non-URL character
+LINK_END = r'(?=/?(?:[^\w/-]|$))'
+
+WEB_URL_SCHEMES = ('http', 'https')  # Only these links become anchors
+
+def is_web_url(link):
+    """True for http(s) links; javascript:, data: and the like are shown as text."""
+    return urlsplit(link.strip()).scheme.lower() in WEB_URL_SCHEMES
+
+def content_snippet(content, length=SNIPPET_LENGTH):
+    """Plain-text card excerpt: the first `length` characters of content."""
+    content = content or ''
+    return content[:length] + '...' if len(content) > length else content
 
-    return thread_info
+def content_lines(content):
+    """Non-blank lines of content, stripped: the paragraphs of content_html."""
+    return [line for line in (line.strip() for line in (content or '').split('\n')) if line]
 
+def format_content_html(content, links=None):
+    """
+    Escaped <p> paragraphs of content (one per non-blank line), with
+    occurrences of the thread's extracted http(s) links turned into anchors
+    (other links stay text, see is_web_url).
+    """
+    esc = html.escape
+    link_pattern = None
+    links = [link for link in links or () if is_web_url(link)]
+    if links:
+        alternatives = '|'.join(re.escape(link) for link in sorted(links, key=len, reverse=True))
+        link_pattern = re.compile(f'(?:{alternatives}){LINK_END}')
+
+    paragraphs = []
+    for line in content_lines(content):
+        if link_pattern is None:
+            paragraphs.append(f"<p>{esc(line)}</p>")
+            continue
+        parts, last = [], 0
+        for match in link_pattern.finditer(line):
+            link = esc(match.group(0))
+            parts.append(esc(line[last:match.start()]))
+            parts.append(f'<a href="{link}" target="_blank" rel="noopener noreferrer">{link}</a>')
+            last = match.end()
+        parts.append(esc(line[last:]))
+        paragraphs.append(f"<p>{''.join(parts)}</p>")
+    return ''.join(paragraphs)
+
+@profiled("generate_data_js")
 def generate_data_js(threads, output_path):
     """Generate the website data.js file with clean data."""
+    # Byte-identical attachments saved under different names link to one file
+    attachment_aliases = duplicate_attachments(Path(output_path).parent / "attachments")
+
     # Prepare threads for website (exclude raw_content to save space)
     website_threads = []
     for t in threads:
-        llm_name = t['llm_used']
-        provider = get_provider(llm_name)
         thread_data = {
-            'id': t['id'],
-            'title': t['title'],
-            'author': t['author'],
-            'llm_used': llm_name,
-            'provider': provider,
-            'homework': t['homework'],
-            'content': t['content'],
-            'created_at': t['created_at'],
-            'view_count': t['view_count'],
-            'attachments': t.get('attachments', []),
-            'has_pdf': t.get('has_pdf', False),
+            'id': t.id,
+            'title': t.title,
+            'author': t.author,
+            'llm_used': t.llm_used,
+            'provider': t.provider,
+            'homework': t.homework,
+            # Modal body; browse_query.js derives the search text from it
+            'content_html': format_content_html(t.content, t.links),
+            'snippet_html': html.escape(content_snippet(t.content)),
+            'created_at': t.created_at,
+            'created_ts': epoch_millis(t.created_at),
+            'view_count': t.view_count,
+            'attachments': list(dict.fromkeys(attachment_aliases.get(a, a) for a in t.attachments)),
+            'has_pdf': t.has_pdf,
         }
-        if 'links' in t:
-            thread_data['links'] = t['links']
-        if 'profiles' in t:
-            thread_data['profiles'] = t['profiles']
+        if t.links is not None:
+            thread_data['links'] = t.links
+        if t.profiles is not None:
+            thread_data['profiles'] = t.profiles
+        if t.duplicate_of is not None:
+            thread_data['duplicate_of'] = t.duplicate_of
         website_threads.append(thread_data)
 
+    # Size, type, page count and thumbnail of each linked attachment
+    attachment_meta = collect_attachment_meta(Path(output_path).parent / "attachments")
+    linked = {name for thread_data in website_threads for name in thread_data['attachments']}
+    attachment_meta = {name: info for name, info in attachment_meta.items() if name in linked}
+
     js_content = f"""// Special Participation A Data
 // Auto-generated by process_threads.py - Blue Team Enhanced Version
 // Generated: {__import__('datetime').datetime.now().isoformat()}
 
-const participationData = {json.dumps({'total_count': len(website_threads), 'threads': website_threads}, indent=2, ensure_ascii=False)};
+const participationData = {json_codec.dumps({'total_count': len(website_threads), 'threads': website_threads})};
+
+// Thread indices in display order for each browse sort option
+const sortOrders = {json_codec.dumps(build_sort_orders(website_threads), pretty=False)};
+
+// Indices of the most similar threads for each thread (TF-IDF, see related.py)
+const relatedThreads = {json_codec.dumps(related_threads(threads), pretty=False)};
+
+// Course resources (solutions, code, Ed threads) per normalized homework, see resource_index.py
+const homeworkResources = {json_codec.dumps(build_homework_index(Path(output_path).parent / "resources"), pretty=False)};
+
+// Size, MIME type, PDF page count and thumbnail per attachment file, see attachment_meta.py
+const attachmentMeta = {json_codec.dumps(attachment_meta, pretty=False)};
 
 // Extract unique LLMs (sorted alphabetically)
 const uniqueLLMs = [...new Set(participationData.threads.map(t => t.llm_used))].sort();
@@ -578,6 +1053,10 @@ window.participationData = participationData;
 window.uniqueLLMs = uniqueLLMs;
 window.uniqueHWs = uniqueHWs;
 window.uniqueProviders = uniqueProviders;
+window.sortOrders = sortOrders;
+window.relatedThreads = relatedThreads;
+window.homeworkResources = homeworkResources;
+window.attachmentMeta = attachmentMeta;
 """
 
     with open(output_path, 'w', encoding='utf-8') as f:
@@ -585,81 +1064,275 @@ window.uniqueProviders = uniqueProviders;
 
     print(f"Generated {output_path}")
 
-def main():
-    """Main function to process all threads."""
-    print("=" * 70)
-    print("Processing Special Participation A Threads (Blue Team Enhanced)")
-    print("=" * 70)
+    # New data means a new service worker cache
+    version = write_precache_manifest(Path(output_path).parent)
+    print(f"Updated precache manifest (version {version})")
+
+def format_display_date(date_str):
+    """Format an ISO timestamp like the browse page does (e.g. "Dec 11, 2025")."""
+    try:
+        date = datetime.fromisoformat(str(date_str))
+        return f"{date.strftime('%b')} {date.day}, {date.year}"
+    except (TypeError, ValueError):
+        return ''
+
+def render_thread_page(t):
+    """Render a lightweight static HTML page for one submission."""
+    esc = html.escape
+    provider = t.provider
+    content = t.content or ''
+
+    # Same HTML the browse modal shows (content_html in data.js)
+    body_html = format_content_html(content, t.links)
+
+    footer_html = ''
+    if t.attachments:
+        items = ''.join(
+            f'<li><a href="../attachments/{quote(att)}" target="_blank" rel="noopener">{esc(att)}</a></li>'
+            for att in t.attachments
+        )
+        footer_html += f'<div class="modal-attachments"><strong>Attachments:</strong><ul>{items}</ul></div>'
+    if t.links:
+        items = ''.join(
+            f'<li><a href="{esc(link)}" target="_blank" rel="noopener noreferrer">{esc(link)}</a></li>'
+            if is_web_url(link) else f'<li>{esc(link)}</li>'
+            for link in t.links
+        )
+        footer_html += f'<div class="modal-links"><strong>External Links:</strong><ul>{items}</ul></div>'
+
+    description = ' '.join(content.split())[:160]
+    canonical = f'<link rel="canonical" href="{esc(SITE_URL)}/threads/{t.id}.html">' if SITE_URL else ''
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description" content="{esc(description)}">
+    <title>{esc(t.title)} | CS 182/282A Special Participation A</title>
+    {canonical}
+    <script>
+        (function() {{
+            try {{
+                const theme = localStorage.getItem('extraCreditTheme');
+                if (theme === 'light' || theme === 'dark') {{
+                    document.documentElement.dataset.theme = theme;
+                }}
+            }} catch {{
+                // ignore
+            }}
+        }})();
+    </script>
+    <link rel="stylesheet" href="../styles.css">
+</head>
+<body>
+    <a class="skip-link" href="#main">Skip to main content</a>
+    <div class="page-container">
+        <header class="site-header">
+            <div class="header-content">
+                <div class="header-left">
+                    <span class="header-badge">CS 182/282A</span>
+                    <span class="site-title">Special Participation A</span>
+                </div>
+                <nav class="header-nav">
+                    <a href="../index.html" class="nav-link">Home</a>
+                    <a href="../browse.html" class="nav-link active">Browse</a>
+                    <a href="../syllabus.html" class="nav-link">Syllabus</a>
+                    <a href="../insights.html" class="nav-link">Insights</a>
+                    <button type="button" class="theme-toggle" data-theme-toggle aria-pressed="false">
+                        <span class="theme-toggle-dot" aria-hidden="true"></span>
+                        <span data-theme-toggle-text>Light</span>
+                    </button>
+                </nav>
+            </div>
+        </header>
+
+        <main class="main-content" id="main">
+            <article>
+                <h1 class="page-title">{esc(t.title)}</h1>
+                <div class="modal-meta">
+                    <span class="tag tag-provider">{esc(provider)}</span>
+                    <span class="tag tag-llm">{esc(t.llm_used)}</span>
+                    <span class="tag tag-hw">{esc(t.homework)}</span>
+                    <span class="modal-author">by {esc(t.author)}</span>
+                    <span class="modal-date">{esc(format_display_date(t.created_at))}</span>
+                    <span class="modal-views">{t.view_count} views</span>
+                </div>
+                <div class="modal-body">{body_html}</div>
+                <div class="modal-footer">{footer_html}</div>
+                <p><a href="../browse.html?thread={t.id}">Open in the submission browser &rarr;</a></p>
+            </article>
+        </main>
+
+        <footer class="site-footer">
+            <p>CS 182/282A Deep Learning &middot; UC Berkeley &middot; Fall 2025</p>
+        </footer>
+    </div>
+
+    <script src="../theme.js" defer></script>
+    <script src="../offline.js" defer></script>
+</body>
+</html>
+"""
+
+@profiled("generate_thread_pages")
+def generate_thread_pages(threads, output_dir, sitemap_path):
+    """Write one static HTML page per submission plus a sitemap.
+
+    Shared links and crawlers get a fully rendered page without loading
+    data.js or running the browse app.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Remove pages for threads that are no longer in the dataset
+    current = {f"{t.id}.html" for t in threads}
+    for stale in output_dir.glob('*.html'):
+        if stale.name not in current:
+            stale.unlink()
+
+    for t in threads:
+        page_path = output_dir / f"{t.id}.html"
+        with open(page_path, 'w', encoding='utf-8') as f:
+            f.write(render_thread_page(t))
+
+    # Sitemap: the top-level pages plus every thread page. <loc> must be an
+    # absolute URL, so without SITE_URL there is no sitemap (and no stale one)
+    if not SITE_URL:
+        if sitemap_path.exists():
+            sitemap_path.unlink()
+        print("  ⚠ SITE_URL is not set; skipped the sitemap")
+        print(f"Generated {len(threads)} thread pages in {output_dir}")
+        return
+    urls = [f"{SITE_URL}/{page}" for page in ('index.html', 'browse.html', 'syllabus.html', 'insights.html')]
+    lastmods = {}
+    for t in threads:
+        url = f"{SITE_URL}/{output_dir.name}/{t.id}.html"
+        urls.append(url)
+        lastmods[url] = str(t.created_at or '')[:10]
 
+    entries = []
+    for url in urls:
+        lastmod = f"<lastmod>{lastmods[url]}</lastmod>" if lastmods.get(url) else ''
+        entries.append(f"  <url><loc>{html.escape(url)}</loc>{lastmod}</url>")
+
+    with open(sitemap_path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        f.write('\n'.join(entries))
+        f.write('\n</urlset>\n')
+
+    print(f"Generated {len(threads)} thread pages in {output_dir} and {sitemap_path}")
+
+def group_threads(threads):
+    """Group thread ids by LLM, homework and author."""
+    by_llm = defaultdict(list)
+    by_hw = defaultdict(list)
+    by_author = defaultdict(list)
+    for thread in threads:
+        by_llm[thread.llm_used].append(thread.id)
+        by_hw[thread.homework].append(thread.id)
+        by_author[thread.author].append(thread.id)
+    return by_llm, by_hw, by_author
+
+def build_output_data(participation_a_threads):
+    """Build the participation_a_data.json structure."""
+    by_llm, by_hw, by_author = group_threads(participation_a_threads)
+    return {
+        'total_count': len(participation_a_threads),
+        'threads': [t.to_dict() for t in participation_a_threads],
+        'by_llm': dict(by_llm),
+        'by_homework': dict(by_hw),
+        'authors': list(by_author.keys()),
+    }
+
+def save_output_data(participation_a_threads, output_file=OUTPUT_FILE):
+    """Save the processed threads and their groupings as JSON."""
+    json_codec.dump(build_output_data(participation_a_threads), output_file)
+
+    print(f"\nData saved to {output_file}")
+
+def write_outputs(participation_a_threads):
+    """Write participation_a_data.json, website/data.js and the static pages."""
+    with text_loaded(participation_a_threads):
+        # Save to JSON
+        save_output_data(participation_a_threads, OUTPUT_FILE)
+
+        # Generate website data.js
+        generate_data_js(participation_a_threads, WEBSITE_DATA_FILE)
+
+        # Pre-render static pages for deep links and crawlers
+        generate_thread_pages(participation_a_threads, THREAD_PAGES_DIR, SITEMAP_FILE)
+
+def sort_threads(threads):
+    """Sort processed threads by created_at, newest first (in place)."""
+    threads.sort(key=lambda x: x.created_at or '', reverse=True)
+    return threads
+
+def collect_threads(download_dir, lazy_text=False):
+    """Process every thread folder in download_dir, newest first."""
     participation_a_threads = []
 
     # Get all thread folders
-    thread_folders = [f for f in DOWNLOAD_DIR.iterdir() if f.is_dir()]
+    thread_folders = [f for f in download_dir.iterdir() if f.is_dir()]
     print(f"Found {len(thread_folders)} downloaded thread folders")
 
     # Process each thread
     for folder in sorted(thread_folders):
-        thread_info = process_thread(folder)
-        if thread_info:
-            participation_a_threads.append(thread_info)
+        record = process_thread(folder, lazy_text=lazy_text)
+        if record:
+            participation_a_threads.append(record)
 
     # Sort by created_at (newest first)
-    participation_a_threads.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+    return sort_threads(participation_a_threads)
 
-    print(f"\nFound {len(participation_a_threads)} Special Participation A threads")
-
-    # Group by LLM
-    by_llm = defaultdict(list)
-    for thread in participation_a_threads:
-        by_llm[thread['llm_used']].append(thread)
+def print_summary(participation_a_threads):
+    """Print LLM, homework, author and metadata statistics."""
+    by_llm, by_hw, by_author = group_threads(participation_a_threads)
 
     print("\n--- LLMs Used (Normalized) ---")
-    for llm, threads in sorted(by_llm.items(), key=lambda x: -len(x[1])):
-        print(f"  {llm}: {len(threads)} posts")
-
-    # Group by homework
-    by_hw = defaultdict(list)
-    for thread in participation_a_threads:
-        by_hw[thread['homework']].append(thread)
+    for llm, ids in sorted(by_llm.items(), key=lambda x: -len(x[1])):
+        print(f"  {llm}: {len(ids)} posts")
 
     print("\n--- Homework Distribution ---")
-    for hw, threads in sorted(by_hw.items(), key=lambda x: int(x[0].replace('HW', '').replace('Unknown ', '999'))):
-        print(f"  {hw}: {len(threads)} posts")
-
-    # Group by author
-    by_author = defaultdict(list)
-    for thread in participation_a_threads:
-        by_author[thread['author']].append(thread)
+    for hw, ids in sorted(by_hw.items(), key=lambda x: int(x[0].replace('HW', '').replace('Unknown ', '999'))):
+        print(f"  {hw}: {len(ids)} posts")
 
     print(f"\n--- Unique Authors: {len(by_author)} ---")
 
     # Count threads with links and profiles
-    with_links = sum(1 for t in participation_a_threads if t.get('links'))
-    with_profiles = sum(1 for t in participation_a_threads if t.get('profiles'))
+    with_links = sum(1 for t in participation_a_threads if t.links)
+    with_profiles = sum(1 for t in participation_a_threads if t.profiles)
     print(f"\n--- Additional Metadata ---")
     print(f"  Threads with external links: {with_links}")
     print(f"  Threads with student profiles: {with_profiles}")
 
-    # Save to JSON
-    output_data = {
-        'total_count': len(participation_a_threads),
-        'threads': participation_a_threads,
-        'by_llm': {llm: [t['id'] for t in threads] for llm, threads in by_llm.items()},
-        'by_homework': {hw: [t['id'] for t in threads] for hw, threads in by_hw.items()},
-        'authors': list(by_author.keys()),
-    }
+    reposts = sum(1 for t in participation_a_threads if t.duplicate_of is not None)
+    canonical = len({t.duplicate_of for t in participation_a_threads if t.duplicate_of is not None})
+    print(f"  Near-duplicate reposts: {reposts} (of {canonical} submission(s))")
+    print(f"  Unique submissions: {len(participation_a_threads) - reposts}")
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+def main():
+    """Main function to process all threads."""
+    print("=" * 70)
+    print("Processing Special Participation A Threads (Blue Team Enhanced)")
+    print("=" * 70)
+
+    # Eager text: every record is written out right after extraction, so lazy
+    # records would only add a second read of each thread's JSON
+    participation_a_threads = collect_threads(DOWNLOAD_DIR)
+    mark_duplicates(participation_a_threads)
+
+    print(f"\nFound {len(participation_a_threads)} Special Participation A threads")
 
-    print(f"\nData saved to {OUTPUT_FILE}")
+    print_summary(participation_a_threads)
 
-    # Generate website data.js
-    generate_data_js(participation_a_threads, WEBSITE_DATA_FILE)
+    write_outputs(participation_a_threads)
 
     print("=" * 70)
 
     return participation_a_threads
 
 if __name__ == "__main__":
+    setup_from_argv("process_threads")
+    json_codec.setup_from_argv()
     main()
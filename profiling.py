@@ -0,0 +1,293 @@
+"""
+Per-stage profiling for the downloader and processing scripts.
+
+Every script accepts --profile. When it is given, each pipeline stage
+(pagination, get_thread, attachment download, process_thread, the extract_*
+functions, generate_data_js, ...) is timed, profiled with cProfile and
+tracked with tracemalloc, and the results are written to profiles/:
+
+    <script>_<timestamp>.speedscope.json  stage timeline per thread plus a
+                                          per-stage function profile; open at
+                                          https://www.speedscope.app
+    <script>_<timestamp>_<stage>.pstats   raw cProfile stats (pstats/snakeviz)
+    <script>_<timestamp>.memory.json      tracemalloc peak and top allocations
+
+Without --profile the stage wrappers cost one attribute check per call.
+cProfile stats are exclusive (a nested stage pauses its parent's profiler);
+tracemalloc figures are process-wide, so stages running concurrently in
+worker threads see each other's allocations.
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_FLAG = "--profile"
+PROFILE_DIR = Path("profiles")
+TOP_ALLOCATIONS = 10  # Allocation sites kept per stage
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class _StageStats:
+    """Accumulated measurements for one stage name."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.peak_memory = 0
+        self.net_memory = 0
+        self.top_allocations = None  # From the first invocation
+        self.profile = cProfile.Profile()
+
+
+class StageProfiler:
+    """Collects per-stage timing, cProfile stats and tracemalloc peaks."""
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self.events = []  # (thread name, 'O'/'C', stage name, seconds since start)
+        self.start_time = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self):
+        self.enabled = True
+        self.start_time = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+
+    def _get_stats(self, name):
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = _StageStats(name)
+            return self.stages[name]
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record_event(self, kind, name):
+        at = time.perf_counter() - self.start_time
+        with self._lock:
+            self.events.append((threading.current_thread().name, kind, name, at))
+
+    @contextmanager
+    def stage(self, name):
+        """Measure the enclosed block as one invocation of stage `name`."""
+        if not self.enabled:
+            yield
+            return
+
+        stats = self._get_stats(name)
+        stack = self._stack()
+
+        # cProfile stats are exclusive: pause the enclosing stage's profiler
+        parent = stack[-1] if stack else None
+        if parent is not None and parent['profiling']:
+            parent['stats'].profile.disable()
+
+        first_call = stats.top_allocations is None and stats.calls == 0
+        snapshot = tracemalloc.take_snapshot() if first_call else None
+        current, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent['peak'] = max(parent['peak'], peak)
+        tracemalloc.reset_peak()
+
+        frame = {'stats': stats, 'peak': 0, 'profiling': False}
+        stack.append(frame)
+        self._record_event('O', name)
+        try:
+            stats.profile.enable()
+            frame['profiling'] = True
+        except ValueError:
+            # Another profiler is active on this interpreter (Python 3.12+)
+            pass
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if frame['profiling']:
+                stats.profile.disable()
+            self._record_event('C', name)
+            stack.pop()
+
+            end_current, end_peak = tracemalloc.get_traced_memory()
+            stage_peak = max(frame['peak'], end_peak) - current
+            with self._lock:
+                stats.calls += 1
+                stats.wall_time += elapsed
+                stats.peak_memory = max(stats.peak_memory, stage_peak)
+                stats.net_memory += end_current - current
+            if snapshot is not None:
+                diff = tracemalloc.take_snapshot().compare_to(snapshot, 'lineno')
+                stats.top_allocations = [
+                    {'location': str(d.traceback[0]), 'size_diff': d.size_diff, 'count_diff': d.count_diff}
+                    for d in diff[:TOP_ALLOCATIONS]
+                ]
+
+            if parent is not None:
+                parent['peak'] = max(parent['peak'], current + stage_peak)
+                if parent['profiling']:
+                    try:
+                        parent['stats'].profile.enable()
+                    except ValueError:
+                        parent['profiling'] = False
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+    def _speedscope(self, script_name):
+        frames = []
+        frame_index = {}
+
+        def frame_for(name, file=None, line=None):
+            key = (name, file, line)
+            if key not in frame_index:
+                frame = {'name': name}
+                if file:
+                    frame['file'] = file
+                if line:
+                    frame['line'] = line
+                frame_index[key] = len(frames)
+                frames.append(frame)
+            return frame_index[key]
+
+        profiles = []
+        end_value = max((e[3] for e in self.events), default=0.0) * 1000
+
+        # Stage timeline, one evented profile per thread
+        by_thread = {}
+        for thread_name, kind, name, at in self.events:
+            by_thread.setdefault(thread_name, []).append(
+                {'type': kind, 'frame': frame_for(name), 'at': at * 1000}
+            )
+        for thread_name, events in by_thread.items():
+            profiles.append({
+                'type': 'evented',
+                'name': f"stages ({thread_name})",
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': end_value,
+                'events': events,
+            })
+
+        # Function self-time within each stage, from cProfile
+        for stats in self.stages.values():
+            try:
+                raw = pstats.Stats(stats.profile).stats
+            except TypeError:
+                continue  # Never enabled
+            samples, weights = [], []
+            stage_frame = frame_for(stats.name)
+            for (file, line, func), (_, _, tottime, _, _) in raw.items():
+                if tottime <= 0:
+                    continue
+                samples.append([stage_frame, frame_for(func, file, line)])
+                weights.append(tottime)
+            if samples:
+                profiles.append({
+                    'type': 'sampled',
+                    'name': f"functions: {stats.name}",
+                    'unit': 'seconds',
+                    'startValue': 0,
+                    'endValue': sum(weights),
+                    'samples': samples,
+                    'weights': weights,
+                })
+
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': script_name,
+            'exporter': 'profiling.py',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': profiles,
+        }
+
+    def write_reports(self, script_name, output_dir=PROFILE_DIR):
+        """Write speedscope, pstats and memory reports and print a summary."""
+        if not self.enabled or not self.stages:
+            return
+        output_dir.mkdir(parents=True, exist_ok=True)
+        prefix = output_dir / f"{script_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        speedscope_path = prefix.with_name(prefix.name + ".speedscope.json")
+        with open(speedscope_path, 'w', encoding='utf-8') as f:
+            json.dump(self._speedscope(script_name), f)
+
+        memory = {}
+        for name, stats in self.stages.items():
+            memory[name] = {
+                'calls': stats.calls,
+                'wall_time_s': round(stats.wall_time, 6),
+                'peak_bytes': stats.peak_memory,
+                'net_bytes': stats.net_memory,
+                'top_allocations_first_call': stats.top_allocations or [],
+            }
+            try:
+                stats.profile.dump_stats(str(prefix.with_name(f"{prefix.name}_{name}.pstats")))
+            except TypeError:
+                pass
+        _, overall_peak = tracemalloc.get_traced_memory()
+        memory_path = prefix.with_name(prefix.name + ".memory.json")
+        with open(memory_path, 'w', encoding='utf-8') as f:
+            json.dump({'process_peak_bytes': overall_peak, 'stages': memory}, f, indent=2)
+
+        print("\n" + "=" * 70)
+        print("PROFILE SUMMARY")
+        print("=" * 70)
+        print(f"{'Stage':<28}{'Calls':>8}{'Total s':>12}{'Mean ms':>12}{'Peak MB':>10}")
+        for stats in sorted(self.stages.values(), key=lambda s: -s.wall_time):
+            mean_ms = stats.wall_time / stats.calls * 1000 if stats.calls else 0
+            print(f"{stats.name:<28}{stats.calls:>8}{stats.wall_time:>12.3f}"
+                  f"{mean_ms:>12.2f}{stats.peak_memory / 1e6:>10.2f}")
+        print(f"\nSpeedscope: {speedscope_path}")
+        print(f"Memory:     {memory_path}")
+        print("=" * 70)
+
+
+profiler = StageProfiler()
+
+
+def stage(name):
+    """Context manager: `with stage("pagination"): ...`"""
+    return profiler.stage(name)
+
+
+def profiled(name):
+    """Decorator that runs every call of the function as stage `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def setup_from_argv(script_name, argv=None):
+    """Enable profiling if --profile was passed; reports are written at exit."""
+    argv = sys.argv if argv is None else argv
+    if PROFILE_FLAG not in argv:
+        return False
+    argv.remove(PROFILE_FLAG)
+    profiler.enable()
+    atexit.register(profiler.write_reports, script_name)
+    print(f"Profiling enabled; reports will be written to {PROFILE_DIR}/")
+    return True
@@ -0,0 +1,374 @@
+"""
+Local JSON query API over participation_a_data.json.
+
+data.js ships every thread to the browser, which stops scaling once several
+semesters are ingested. This server keeps the dataset in memory behind
+per-field indexes and answers the browse page's queries instead:
+
+    GET /api/threads?search=&provider=&llm=&hw=&author=&sort=date-desc&page=1&per_page=12
+        {"total", "page", "per_page", "threads": [card fields], "facets": {...}}
+    GET /api/threads/<id>
+        one thread with content_html, links and attachments, plus what the
+        browse modal links to: attachment_meta, resources, related, versions
+    GET /api/facets
+        provider / llm / homework counts over the whole dataset
+
+Filters are exact matches served from inverted indexes. Search has the
+browse page's semantics (browse_query.js): the whole query, lowercased, must
+be a substring of the thread's title, author, LLM, homework, content or
+provider. The word index only narrows the candidates: every word of the
+query lies inside some word of a matching thread, and the survivors are
+checked against their lowercased text. Results are ordered with the
+precomputed browse sort orders, and encoded responses are kept in an LRU
+cache (with an ETag) until participation_a_data.json changes on disk.
+
+Runs entirely locally (binds 127.0.0.1 by default):
+    python main.py serve --port 8765
+"""
+
+import hashlib
+import html
+import os
+import re
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock
+from urllib.parse import parse_qs, urlsplit
+
+import json_codec
+import process_threads as pt
+from attachment_meta import cached_attachment_meta
+from dedup import duplicate_attachments
+from related import related_threads
+from resource_index import build_homework_index
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_PER_PAGE = 12  # Same as browse.js
+MAX_PER_PAGE = 100
+CACHE_SIZE = 256  # Encoded responses kept per dataset version
+WORD_CACHE_SIZE = 1024  # Query words whose matching threads are kept
+
+FILTER_FIELDS = {  # Query parameter -> indexed field
+    'provider': 'provider',
+    'llm': 'llm_used',
+    'hw': 'homework',
+    'author': 'author',
+}
+FACET_FIELDS = {'provider': 'provider', 'llm': 'llm_used', 'homework': 'homework'}
+SEARCH_FIELDS = ('title', 'author', 'llm_used', 'homework', 'content', 'provider')  # browse_query.js order
+FIELD_SEPARATOR = '\0'  # Keeps a match from spanning two fields, as in browse_query.js
+WORD_PATTERN = re.compile(r'\w+')
+
+# Fields of each result card (createSubmissionCard in browse.js)
+CARD_FIELDS = ('id', 'title', 'author', 'llm_used', 'provider', 'homework', 'created_at', 'view_count')
+
+
+class QueryError(ValueError):
+    """Bad query parameters (HTTP 400)."""
+
+
+class ThreadIndex:
+    """In-memory indexes over one version of participation_a_data.json."""
+
+    def __init__(self, data_path=pt.OUTPUT_FILE, site_dir=pt.WEBSITE_DATA_FILE.parent):
+        self.data_path = data_path
+        self.site_dir = Path(site_dir)
+        self.version = self.file_version(data_path)
+        data = json_codec.load(data_path)
+        self.threads = [pt.ThreadRecord.from_dict(t) for t in data.get('threads', [])]
+        self.positions = {t.id: i for i, t in enumerate(self.threads)}
+
+        # Reposts are collapsed into their newest version, as on the browse page
+        self.visible = frozenset(i for i, t in enumerate(self.threads) if t.duplicate_of is None)
+
+        self.by_field = {field: defaultdict(set) for field in FILTER_FIELDS.values()}
+        self.haystacks = [self.search_text(t) for t in self.threads]
+        self.postings = defaultdict(set)
+        for i, t in enumerate(self.threads):
+            for field, index in self.by_field.items():
+                index[getattr(t, field)].add(i)
+            for word in WORD_PATTERN.findall(self.haystacks[i]):
+                self.postings[word].add(i)
+        self.vocabulary = sorted(self.postings)
+        self.lock = Lock()
+        self.word_matches = OrderedDict()  # Query word -> matching positions (LRU)
+        self.site = None  # Modal data, loaded on the first thread request
+
+        sort_keys = [{
+            'created_ts': pt.epoch_millis(t.created_at),
+            'view_count': t.view_count or 0,
+            'author': t.author or '',
+            'llm_used': t.llm_used or '',
+        } for t in self.threads]
+        self.sort_orders = pt.build_sort_orders(sort_keys)
+        self.ranks = {}
+        for name, order in self.sort_orders.items():
+            rank = [0] * len(order)
+            for position, i in enumerate(order):
+                rank[i] = position
+            self.ranks[name] = rank
+
+        self.cards = [self.card(t) for t in self.threads]
+
+    @staticmethod
+    def file_version(path):
+        stat = os.stat(path)
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    @staticmethod
+    def search_text(t):
+        """Lowercased search text, as browse_query.js builds it from data.js."""
+        values = {'content': '\n'.join(pt.content_lines(t.content)), 'provider': t.provider or ''}
+        return FIELD_SEPARATOR.join(
+            values[field] if field in values else getattr(t, field) or '' for field in SEARCH_FIELDS
+        ).lower()
+
+    @staticmethod
+    def card(t):
+        card = {name: getattr(t, name) for name in CARD_FIELDS}
+        card['snippet_html'] = html.escape(pt.content_snippet(t.content))
+        return card
+
+    def search_matches(self, word):
+        """Positions of threads with an indexed word containing `word`."""
+        with self.lock:
+            if word in self.word_matches:
+                self.word_matches.move_to_end(word)
+                return self.word_matches[word]
+        matches = set()
+        for term in self.vocabulary:
+            if word in term:
+                matches |= self.postings[term]
+        matches = frozenset(matches)
+        with self.lock:
+            self.word_matches[word] = matches
+            if len(self.word_matches) > WORD_CACHE_SIZE:
+                self.word_matches.popitem(last=False)
+        return matches
+
+    def matching(self, filters):
+        """Positions matching every filter and containing the search phrase."""
+        candidates = [self.visible]
+        for param, field in FILTER_FIELDS.items():
+            value = filters.get(param)
+            if value and value != 'all':
+                candidates.append(self.by_field[field].get(value, set()))
+        search = filters.get('search', '').lower()
+        for word in set(WORD_PATTERN.findall(search)):
+            candidates.append(self.search_matches(word))
+        candidates.sort(key=len)
+        matches = set(candidates[0]).intersection(*candidates[1:])
+        if search:
+            matches = {i for i in matches if search in self.haystacks[i]}
+        return matches
+
+    def facets(self, positions):
+        return {
+            name: dict(Counter(getattr(self.threads[i], field) for i in positions).most_common())
+            for name, field in FACET_FIELDS.items()
+        }
+
+    def query(self, params):
+        """Answer /api/threads: one page of cards plus facet counts."""
+        sort = params.get('sort', 'date-desc')
+        if sort not in self.sort_orders:
+            raise QueryError(f"unknown sort {sort!r}; expected one of {', '.join(self.sort_orders)}")
+        try:
+            page = int(params.get('page', 1))
+            per_page = int(params.get('per_page', DEFAULT_PER_PAGE))
+        except ValueError:
+            raise QueryError("page and per_page must be integers")
+        if page < 1 or not 1 <= per_page <= MAX_PER_PAGE:
+            raise QueryError(f"page must be >= 1 and per_page between 1 and {MAX_PER_PAGE}")
+
+        matches = self.matching(params)
+        if len(matches) * 8 < len(self.threads):
+            ordered = sorted(matches, key=self.ranks[sort].__getitem__)
+        else:
+            ordered = [i for i in self.sort_orders[sort] if i in matches]
+
+        start = (page - 1) * per_page
+        return {
+            'total': len(ordered),
+            'page': page,
+            'per_page': per_page,
+            'threads': [self.cards[i] for i in ordered[start:start + per_page]],
+            'facets': self.facets(ordered),
+        }
+
+    def site_data(self):
+        """What generate_data_js adds to data.js for the modal, computed once."""
+        with self.lock:
+            if self.site is None:
+                self.site = {
+                    'aliases': duplicate_attachments(self.site_dir / "attachments"),
+                    'attachment_meta': cached_attachment_meta(),
+                    'resources': build_homework_index(self.site_dir / "resources"),
+                    'related': related_threads(self.threads),
+                }
+            return self.site
+
+    def thread(self, thread_id):
+        """Answer /api/threads/<id>, or None if unknown."""
+        i = self.positions.get(thread_id)
+        if i is None:
+            return None
+        t = self.threads[i]
+        site = self.site_data()
+        data = {key: value for key, value in t.to_dict().items()
+                if key not in ('content', 'raw_content', 'folder')}
+        data['provider'] = t.provider
+        data['content_html'] = pt.format_content_html(t.content, t.links)
+        data['attachments'] = list(dict.fromkeys(site['aliases'].get(a, a) for a in t.attachments))
+        data['attachment_meta'] = {
+            name: site['attachment_meta'][name] for name in data['attachments'] if name in site['attachment_meta']
+        }
+        data['resources'] = site['resources'].get(t.homework)
+        data['related'] = [
+            {name: getattr(self.threads[j], name) for name in ('id', 'title', 'llm_used', 'homework')}
+            for j in site['related'][i]
+        ]
+        # Reposts collapsed into this thread, or the version it was collapsed into and its siblings
+        data['versions'] = [
+            {'id': other.id, 'title': other.title, 'author': other.author, 'created_at': other.created_at}
+            for other in self.threads
+            if other.id != t.id and (
+                other.duplicate_of == t.id
+                or (t.duplicate_of is not None and t.duplicate_of in (other.id, other.duplicate_of))
+            )
+        ]
+        return data
+
+
+class QueryService:
+    """Reloads the index when the data file changes and caches encoded responses."""
+
+    def __init__(self, data_path=pt.OUTPUT_FILE, cache_size=CACHE_SIZE):
+        self.data_path = data_path
+        self.cache_size = cache_size
+        self.lock = Lock()
+        self.index = ThreadIndex(data_path)
+        self.cache = OrderedDict()
+
+    def current_index(self):
+        with self.lock:
+            if ThreadIndex.file_version(self.data_path) != self.index.version:
+                self.index = ThreadIndex(self.data_path)
+                self.cache.clear()
+                print(f"↻ Reloaded {len(self.index.threads)} threads from {self.data_path}")
+            return self.index
+
+    def respond(self, path, params):
+        """
+        Encoded JSON for a request.
+
+        Returns:
+            tuple: (status, body bytes, etag or None)
+        """
+        index = self.current_index()
+        key = (path, tuple(sorted(params.items())))
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        try:
+            status, payload = 200, self.route(index, path, params)
+        except QueryError as e:
+            status, payload = 400, {'error': str(e)}
+        if payload is None:
+            status, payload = 404, {'error': f"not found: {path}"}
+
+        body = json_codec.dumpb(payload, pretty=False)
+        etag = f'"{index.version}-{hashlib.sha1(body).hexdigest()[:12]}"' if status == 200 else None
+        response = (status, body, etag)
+        if status == 200:
+            with self.lock:
+                self.cache[key] = response
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return response
+
+    @staticmethod
+    def route(index, path, params):
+        parts = [part for part in path.split('/') if part]
+        if parts == ['api', 'threads']:
+            return index.query(params)
+        if parts == ['api', 'facets']:
+            return {'total': len(index.visible), 'facets': index.facets(index.visible)}
+        if len(parts) == 3 and parts[:2] == ['api', 'threads']:
+            if not parts[2].isdigit():
+                raise QueryError(f"thread id must be numeric, not {parts[2]!r}")
+            return index.thread(int(parts[2]))
+        return None
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    server_version = "ParticipationQuery/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        status, body, etag = self.server.service.respond(url.path, params)
+
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_cors_headers()
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_cors_headers()
+        self.end_headers()
+
+    def send_cors_headers(self):
+        # The site is usually served from another local port (python -m http.server)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Headers', 'If-None-Match')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+
+    def log_message(self, format, *args):
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] {self.address_string()} {format % args}")
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, data_path=pt.OUTPUT_FILE):
+    print("=" * 70)
+    print("Local Query API")
+    print("=" * 70)
+    try:
+        service = QueryService(data_path)
+    except FileNotFoundError:
+        print(f"✗ {data_path} not found; run `python main.py process` first")
+        return 1
+
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.service = service
+    print(f"✓ Indexed {len(service.index.threads)} threads "
+          f"({len(service.index.vocabulary)} search words) from {data_path}")
+    print(f"  Serving http://{host}:{server.server_port}/api/threads (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped query API.")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,174 @@
+"""
+Related submissions from TF-IDF similarity.
+
+Each thread's title, content and any plain-text attachments become a
+sublinear TF-IDF vector (L2-normalized), and the most similar threads by
+cosine similarity are precomputed for the site. The browse modal then links
+to comparable evaluations with no work in the browser.
+
+With SciPy the similarities come from batched sparse matrix products
+(X[batch] @ X.T). Without it an inverted index is used, so each thread is
+only scored against threads that share at least one term. SciPy is imported
+on the first call (see _load_backend), not when the module is imported, so
+commands that never compute related threads do not pay for it.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from profiling import profiled
+
+RELATED_COUNT = 5  # Neighbours kept per thread
+MIN_SIMILARITY = 0.05  # Cosine similarity below this is not "related"
+BATCH_SIZE = 256  # Rows per sparse product; bounds the dense block to BATCH_SIZE x N
+
+ATTACHMENT_TEXT_SUFFIXES = {'.txt', '.md'}
+MAX_ATTACHMENT_CHARS = 200_000  # Per attachment
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.+-][a-z0-9]+)*")  # Keeps "gpt-5.1", "hw7"
+STOP_WORDS = frozenset("""
+a an and are as at be but by can did do does for from had has have he her his how i if in
+into is it its me my no not of on or our she so than that the their them then there these
+they this to was we were what when which who will with would you your
+""".split())
+
+
+def tokenize(text):
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def attachment_text(thread):
+    """Text of plain-text attachments in the thread folder, if any."""
+    if not thread.folder or not thread.attachments:
+        return ''
+    parts = []
+    folder = Path(thread.folder) / "attachments"
+    for name in thread.attachments:
+        path = folder / name
+        if path.suffix.lower() not in ATTACHMENT_TEXT_SUFFIXES or not path.is_file():
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                parts.append(f.read(MAX_ATTACHMENT_CHARS))
+        except OSError:
+            continue
+    return '\n'.join(parts)
+
+
+def thread_text(thread):
+    return '\n'.join([thread.title or '', thread.content or '', attachment_text(thread)])
+
+
+def tfidf_vectors(texts):
+    """
+    Sublinear TF-IDF vectors, L2-normalized.
+
+    Returns:
+        tuple: (list of {term index: weight} dicts, vocabulary size)
+    """
+    counts = [Counter(tokenize(text)) for text in texts]
+    document_frequency = Counter()
+    for count in counts:
+        document_frequency.update(count.keys())
+
+    n = len(texts)
+    vocabulary = {term: i for i, term in enumerate(sorted(document_frequency))}
+    idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in document_frequency.items()}
+
+    vectors = []
+    for count in counts:
+        weights = {vocabulary[term]: (1 + math.log(tf)) * idf[term] for term, tf in count.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        vectors.append({i: w / norm for i, w in weights.items()})
+    return vectors, len(vocabulary)
+
+
+_backend = None
+
+
+def _load_backend():
+    """Import NumPy and scipy.sparse once; returns (np, sp), or None without SciPy."""
+    global _backend
+    if _backend is None:
+        try:
+            import numpy as np
+            import scipy.sparse as sp
+            _backend = (np, sp)
+        except ImportError:
+            _backend = False
+    return _backend or None
+
+
+def _top_neighbours(scored, k):
+    """Best k (index, score) pairs by score, ties broken by index."""
+    best = heapq.nsmallest(k, scored, key=lambda item: (-item[1], item[0]))
+    return [i for i, score in best if score >= MIN_SIMILARITY]
+
+
+def neighbours_sparse(vectors, dimension, k, backend):
+    """Top-k cosine neighbours with batched sparse products (SciPy)."""
+    np, sp = backend
+    n = len(vectors)
+    indptr = [0]
+    indices, data = [], []
+    for vector in vectors:
+        indices.extend(vector.keys())
+        data.extend(vector.values())
+        indptr.append(len(indices))
+    matrix = sp.csr_matrix((np.asarray(data, dtype=np.float32), indices, indptr), shape=(n, dimension))
+    transposed = matrix.T.tocsr()
+
+    k = min(k, n - 1)
+    neighbours = []
+    for start in range(0, n, BATCH_SIZE):
+        stop = min(start + BATCH_SIZE, n)
+        block = (matrix[start:stop] @ transposed).toarray()
+        block[np.arange(stop - start), np.arange(start, stop)] = -1.0  # Never related to itself
+
+        candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        for row, columns in enumerate(candidates):
+            scores = block[row, columns]
+            neighbours.append(_top_neighbours(zip(columns.tolist(), scores.tolist()), k))
+    return neighbours
+
+
+def neighbours_inverted_index(vectors, k):
+    """Top-k cosine neighbours by accumulating scores over shared terms."""
+    postings = defaultdict(list)
+    for doc, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            postings[term].append((doc, weight))
+
+    neighbours = []
+    for doc, vector in enumerate(vectors):
+        scores = defaultdict(float)
+        for term, weight in vector.items():
+            for other, other_weight in postings[term]:
+                scores[other] += weight * other_weight
+        scores.pop(doc, None)
+        neighbours.append(_top_neighbours(scores.items(), k))
+    return neighbours
+
+
+@profiled("related_threads")
+def related_threads(threads, k=RELATED_COUNT):
+    """
+    For each thread, the indices (into threads) of its most similar threads.
+
+    Returns:
+        list: one list of up to k indices per thread, most similar first
+    """
+    if len(threads) < 2:
+        return [[] for _ in threads]
+
+    vectors, dimension = tfidf_vectors([thread_text(t) for t in threads])
+    backend = _load_backend()
+    if backend:
+        return neighbours_sparse(vectors, dimension, k, backend)
+    return neighbours_inverted_index(vectors, k)
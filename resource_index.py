@@ -0,0 +1,107 @@
+"""
+Join index from homework labels to course resources.
+
+Submissions carry a normalized homework label ("HW8", extract_homework),
+while fetch_all_resources.py stores each homework under a zero-padded
+folder (website/resources/homework/HW08/) holding the question and solution
+thread JSON plus their attachments. This module walks those folders once at
+build time and emits, per normalized label:
+
+    {
+      "solution": "resources/homework/HW08/hw08_solution.pdf",
+      "files":   [{"name", "path", "kind"}],   kind: question|solution|code|old_exam|other
+      "threads": [{"number", "title", "url", "kind"}]
+    }
+
+generate_data_js writes it to data.js as homeworkResources, so the browse
+modal links the official solution with a dictionary lookup.
+"""
+
+import json
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+import json_codec
+
+# Category folders (fetch_all_resources.RESOURCES keys) joined on homework number
+HOMEWORK_CATEGORIES = ('homework', 'old_exam')
+HOMEWORK_FOLDER_PATTERN = re.compile(r'HW0*(\d+)', re.IGNORECASE)
+CODE_SUFFIXES = {'.zip', '.ipynb', '.py'}
+# "sol"/"solution(s)" as its own word; '_' and digits separate words in file
+# names (hw08_solution.pdf), so plain \b would not do
+SOLUTION_NAME_PATTERN = re.compile(r'(?<![a-z])sol(?:ution)?s?(?![a-z])')
+ED_THREAD_URL = "https://edstem.org/us/courses/{course_id}/discussion/{thread_id}"
+
+
+def normalize_homework(folder_name):
+    """'HW08' / 'HW05_Old_Exam' -> 'HW8' / 'HW5' (the extract_homework format)."""
+    match = HOMEWORK_FOLDER_PATTERN.match(folder_name)
+    return f"HW{int(match.group(1))}" if match else None
+
+
+def file_kind(category, name):
+    """Classify a resource file by category and filename."""
+    if category == 'old_exam':
+        return 'old_exam'
+    lower = name.lower()
+    if Path(lower).suffix in CODE_SUFFIXES:
+        return 'code'
+    if SOLUTION_NAME_PATTERN.search(lower):
+        return 'solution'
+    if 'question' in lower or re.match(r'hw\d+\.pdf$', lower):
+        return 'question'
+    return 'other'
+
+
+def resource_thread(path, category):
+    """Summary of a saved resource thread (thread_<number>.json)."""
+    data = json_codec.load(path)
+    title = data.get('title') or ''
+    if category == 'old_exam':
+        kind = 'old_exam'
+    else:
+        kind = 'solution' if re.search(r'\bsolutions?\b', title, re.IGNORECASE) else 'question'
+    return {
+        'number': data.get('number'),
+        'title': title,
+        'url': ED_THREAD_URL.format(course_id=data.get('course_id'), thread_id=data.get('id')),
+        'kind': kind,
+    }
+
+
+def build_homework_index(resources_dir):
+    """
+    Map each normalized homework label to its resource files and threads.
+
+    Paths are relative to the website root (the parent of resources_dir).
+
+    Returns:
+        dict: {"HW8": {"solution", "files", "threads"}}, in homework order
+    """
+    resources_dir = Path(resources_dir)
+    index = {}
+    for category in HOMEWORK_CATEGORIES:
+        category_dir = resources_dir / category
+        if not category_dir.is_dir():
+            continue
+        for folder in sorted(p for p in category_dir.iterdir() if p.is_dir()):
+            homework = normalize_homework(folder.name)
+            if homework is None:
+                continue
+            entry = index.setdefault(homework, {'solution': None, 'files': [], 'threads': []})
+            for path in sorted(p for p in folder.iterdir() if p.is_file()):
+                if path.suffix == '.json' and path.name.startswith('thread_'):
+                    try:
+                        entry['threads'].append(resource_thread(path, category))
+                    except (OSError, json.JSONDecodeError):
+                        continue
+                    continue
+                kind = file_kind(category, path.name)
+                href = quote(path.relative_to(resources_dir.parent).as_posix())
+                entry['files'].append({'name': path.name, 'path': href, 'kind': kind})
+                if kind == 'solution' and path.suffix.lower() == '.pdf' and entry['solution'] is None:
+                    entry['solution'] = href
+            entry['threads'].sort(key=lambda t: (t['kind'] == 'solution', t['number'] or 0))
+
+    return dict(sorted(index.items(), key=lambda item: int(item[0][2:])))
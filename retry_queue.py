@@ -0,0 +1,232 @@
+"""
+Persistent retry queue for failed thread fetches and attachment downloads.
+
+ed_downloader.py, watch.py, multi_course.py and fetch_all_resources.py record every
+failed item here (SQLite, .retry_queue.db) with what is needed to redo it,
+its attempt count, the last error and the time it may next be retried
+(exponential backoff). A later success marks the item done, so a full re-run
+also clears the queue.
+
+After an outage, retry just the failures instead of a full sync:
+    python main.py resume            # items whose backoff has elapsed
+    python main.py resume --now      # everything still pending or failed
+    python main.py resume --list     # show the queue without retrying
+
+Item kinds:
+    thread            a downloaded thread (ed_downloader.download_thread); key: thread id
+    resource_thread   a course resource thread (fetch_all_resources); key: thread number
+    attachment        one attachment file; key: destination path
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from datetime import datetime
+from pathlib import Path
+
+QUEUE_FILE = Path(".retry_queue.db")
+BASE_DELAY = 60  # Seconds before the first retry
+MAX_DELAY = 6 * 60 * 60  # Backoff ceiling
+MAX_ATTEMPTS = 8  # Items that failed this often are only retried with --now
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,           -- failed | done
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    next_attempt_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+)
+"""
+
+
+def backoff_delay(attempts):
+    """Seconds to wait after the given number of failed attempts."""
+    return min(MAX_DELAY, BASE_DELAY * 2 ** max(0, attempts - 1))
+
+
+class RetryQueue:
+    """SQLite-backed queue; safe to use from download worker threads."""
+
+    def __init__(self, path=QUEUE_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self):
+        """One connection per operation: committed (or rolled back), then closed."""
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            with connection:
+                connection.execute(SCHEMA)
+                yield connection
+
+    def record_failure(self, kind, key, payload, error):
+        """Add or update a failed item and schedule its next attempt."""
+        now = time.time()
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT attempts, status FROM items WHERE kind = ? AND key = ?", (kind, str(key))
+            ).fetchone()
+            attempts = (row[0] if row and row[1] != 'done' else 0) + 1
+            connection.execute(
+                "INSERT OR REPLACE INTO items VALUES (?, ?, ?, 'failed', ?, ?, ?, ?)",
+                (kind, str(key), json.dumps(payload, ensure_ascii=False, default=str),
+                 attempts, str(error), now + backoff_delay(attempts), now),
+            )
+        return attempts
+
+    def record_success(self, kind, key):
+        """Mark an item done if it was queued (successes are not stored otherwise)."""
+        if not self.path.exists():
+            return
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "UPDATE items SET status = 'done', last_error = NULL, updated_at = ? "
+                "WHERE kind = ? AND key = ? AND status != 'done'",
+                (time.time(), kind, str(key)),
+            )
+
+    def items(self, status='failed'):
+        """Queued items as dicts, oldest first."""
+        if not self.path.exists():
+            return []
+        with self._lock, self._connect() as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                "SELECT * FROM items WHERE status = ? ORDER BY updated_at", (status,)
+            ).fetchall()
+        return [{**dict(row), 'payload': json.loads(row['payload'])} for row in rows]
+
+    def due(self, now=None, ignore_backoff=False):
+        """Failed items ready for another attempt."""
+        now = time.time() if now is None else now
+        if ignore_backoff:
+            return self.items()
+        return [item for item in self.items()
+                if item['next_attempt_at'] <= now and item['attempts'] < MAX_ATTEMPTS]
+
+    def status(self, kind, key):
+        with self._lock, self._connect() as connection:
+            row = connection.execute(
+                "SELECT status FROM items WHERE kind = ? AND key = ?", (kind, str(key))
+            ).fetchone()
+        return row[0] if row else None
+
+    def counts(self):
+        """Number of items per status."""
+        if not self.path.exists():
+            return {}
+        with self._lock, self._connect() as connection:
+            return dict(connection.execute("SELECT status, COUNT(*) FROM items GROUP BY status"))
+
+    def clear_done(self):
+        with self._lock, self._connect() as connection:
+            return connection.execute("DELETE FROM items WHERE status = 'done'").rowcount
+
+
+# Shared queue used by the downloaders
+retry_queue = RetryQueue()
+
+
+def record_downloads(jobs, downloaded, errors, **context):
+    """
+    Record the outcome of a download_files() call.
+
+    Args:
+        jobs: the (url, file_path) list passed to download_files
+        downloaded, errors: its return values (file names; name -> message)
+        context: extra payload fields (e.g. thread id) kept with failures
+    """
+    by_name = {file_path.name: (url, file_path) for url, file_path in jobs}
+    for name in downloaded:
+        if name in by_name:
+            retry_queue.record_success('attachment', by_name[name][1])
+    for name, error in errors.items():
+        if name in by_name:
+            url, file_path = by_name[name]
+            retry_queue.record_failure('attachment', file_path,
+                                       {'url': url, 'path': str(file_path), **context}, error)
+
+
+# ----------------------------------------------------------------------
+# Resume
+# ----------------------------------------------------------------------
+def retry_item(ed, item):
+    """Redo one queued item; the download functions record the outcome."""
+    payload = item['payload']
+    if item['kind'] == 'thread':
+        import ed_downloader as downloader
+        downloader.download_thread(payload['thread'], payload['course_id'],
+                                   Path(payload['download_dir']), ed)
+    elif item['kind'] == 'resource_thread':
+        import fetch_all_resources
+        fetch_all_resources.retry_resource_thread(ed, payload)
+    elif item['kind'] == 'attachment':
+        from attachments import download_files, get_auth_headers
+        file_path = Path(payload['path'])
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        jobs = [(payload['url'], file_path)]
+        downloaded, errors = download_files(jobs, get_auth_headers(ed),
+                                            session=getattr(ed, 'session', None))
+        context = {k: v for k, v in payload.items() if k not in ('url', 'path')}
+        record_downloads(jobs, downloaded, errors, **context)
+    else:
+        raise ValueError(f"unknown item kind {item['kind']!r}")
+
+
+def print_queue(queue=retry_queue):
+    items = queue.items()
+    counts = queue.counts()
+    print(f"{counts.get('failed', 0)} failed, {counts.get('done', 0)} recovered item(s) in {queue.path}")
+    for item in items:
+        when = datetime.fromtimestamp(item['next_attempt_at']).strftime('%Y-%m-%d %H:%M')
+        print(f"  {item['kind']:<16} {item['key']:<40} attempts={item['attempts']} "
+              f"next={when}  {item['last_error'][:60]}")
+
+
+def resume(ignore_backoff=False, queue=retry_queue):
+    """Retry due items only. Returns the number still failing."""
+    print("=" * 70)
+    print("Resuming Failed Downloads")
+    print("=" * 70)
+
+    due = queue.due(ignore_backoff=ignore_backoff)
+    waiting = len(queue.items()) - len(due)
+    if not due:
+        print(f"✓ Nothing due{f' ({waiting} item(s) waiting for backoff; use --now)' if waiting else ''}")
+        return 0
+
+    from dotenv import load_dotenv
+    from edapi import EdAPI
+    load_dotenv()
+    ed = EdAPI()
+    try:
+        ed.login()
+        print("✓ Successfully authenticated with Ed API")
+    except Exception as e:
+        print(f"✗ Authentication failed: {e}")
+        return len(due)
+
+    still_failing = 0
+    for i, item in enumerate(due, 1):
+        print(f"[{i}/{len(due)}] {item['kind']} {item['key']} (attempt {item['attempts'] + 1})")
+        try:
+            retry_item(ed, item)
+        except Exception as e:
+            queue.record_failure(item['kind'], item['key'], item['payload'], e)
+        if queue.status(item['kind'], item['key']) == 'done':
+            print("  ✓ Recovered")
+        else:
+            still_failing += 1
+            print("  ✗ Still failing; rescheduled")
+
+    print("=" * 70)
+    print(f"Recovered {len(due) - still_failing}/{len(due)}; {waiting} item(s) not yet due")
+    queue.clear_done()
+    return still_failing
@@ -0,0 +1,89 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import attachment_meta as am
+import json_codec
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# One-page PDF with a plain (uncompressed) page tree
+MINIMAL_PDF = b"""%PDF-1.4
+1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj
+2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj
+3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 200 300] >> endobj
+trailer << /Root 1 0 R >>
+%%EOF
+"""
+
+
+@pytest.fixture
+def site(tmp_path):
+    attachments = tmp_path / "website" / "attachments"
+    attachments.mkdir(parents=True)
+    return attachments
+
+
+def collect(site, tmp_path):
+    return am.collect_attachment_meta(site, cache_file=tmp_path / "cache.json", max_workers=1)
+
+
+def test_importing_loads_neither_pymupdf_nor_pillow():
+    code = "import sys, attachment_meta; print(sorted({'pymupdf', 'PIL'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
+
+
+def test_scan_pdf_pages(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(MINIMAL_PDF)
+    assert am.scan_pdf_pages(path) == 1
+    path.write_bytes(b"%PDF-1.4 nothing here")
+    assert am.scan_pdf_pages(path) is None
+
+
+def test_describes_and_caches_attachments(site, tmp_path):
+    (site / "notes.md").write_text("# Notes", encoding='utf-8')
+    (site / "copy.md").write_text("# Notes", encoding='utf-8')
+    (site / "doc.pdf").write_bytes(MINIMAL_PDF)
+    meta = collect(site, tmp_path)
+    assert meta["notes.md"] == meta["copy.md"] == {'size': 7, 'mime': "text/markdown"}
+    assert meta["doc.pdf"]['mime'] == "application/pdf" and meta["doc.pdf"]['pages'] == 1
+
+    cache = json_codec.load(tmp_path / "cache.json")
+    assert len(cache['files']) == 3 and len(cache['by_digest']) == 2
+    assert am.cached_attachment_meta(tmp_path / "cache.json") == meta
+    assert collect(site, tmp_path) == meta
+
+
+@pytest.mark.skipif(not am.PYMUPDF_AVAILABLE, reason="PyMuPDF not installed")
+def test_failures_are_returned_but_not_cached(site, tmp_path, capsys):
+    (site / "broken.pdf").write_bytes(b"%PDF-1.4 truncated")
+    meta = collect(site, tmp_path)
+    assert meta == {"broken.pdf": {'size': 18, 'mime': "application/pdf"}}
+    cache = json_codec.load(tmp_path / "cache.json")
+    assert cache['by_digest'] == {} and "broken.pdf" in cache['files']
+    assert am.cached_attachment_meta(tmp_path / "cache.json") == {}
+
+    collect(site, tmp_path)
+    assert "(1 new, 0 cached)" in capsys.readouterr().out  # Tried again
+
+
+@pytest.mark.skipif(not am.PYMUPDF_AVAILABLE, reason="PyMuPDF not installed")
+def test_pdf_thumbnails_are_rendered_and_pruned(site, tmp_path):
+    (site / "doc.pdf").write_bytes(MINIMAL_PDF)
+    meta = collect(site, tmp_path)
+    thumbnail = meta["doc.pdf"]['thumbnail']
+    assert thumbnail['width'] == am.THUMBNAIL_WIDTH
+    assert (site.parent / thumbnail['src']).is_file()
+
+    stale = site.parent / am.THUMBNAIL_DIR / "0123456789abcdef.webp"
+    stale.write_bytes(b"old")
+    collect(site, tmp_path)
+    assert not stale.exists() and (site.parent / thumbnail['src']).is_file()
+
+    (site / "doc.pdf").unlink()
+    assert collect(site, tmp_path) == {}
+    assert list((site.parent / am.THUMBNAIL_DIR).iterdir()) == []
@@ -0,0 +1,59 @@
+import gzip
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import build_site
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_importing_loads_neither_pillow_nor_brotli():
+    # process_threads.py imports build_site for write_precache_manifest
+    code = "import sys, build_site; print(sorted({'PIL', 'brotli'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
+
+
+def test_precache_manifest_changes_with_the_dataset(tmp_path):
+    (tmp_path / "index.html").write_text("<html></html>", encoding='utf-8')
+    (tmp_path / "data.js").write_text("const participationData = {};", encoding='utf-8')
+    (tmp_path / build_site.SERVICE_WORKER_FILE).write_text("", encoding='utf-8')
+    version = build_site.write_precache_manifest(tmp_path)
+    text = (tmp_path / build_site.PRECACHE_MANIFEST_FILE).read_text(encoding='utf-8')
+    manifest = json.loads(text.split("self.PRECACHE_MANIFEST = ", 1)[1].rstrip().rstrip(';'))
+    assert manifest == {'version': version, 'urls': ["data.js", "index.html"]}
+
+    (tmp_path / "data.js").write_text("const participationData = {threads: []};", encoding='utf-8')
+    assert build_site.write_precache_manifest(tmp_path) != version
+
+
+def test_precompress_skips_small_files(tmp_path):
+    (tmp_path / "big.js").write_text("x" * build_site.MIN_COMPRESS_SIZE, encoding='utf-8')
+    (tmp_path / "small.js").write_text("x", encoding='utf-8')
+    assert build_site.precompress(tmp_path) == 1
+    assert gzip.decompress((tmp_path / "big.js.gz").read_bytes()) == b"x" * build_site.MIN_COMPRESS_SIZE
+    assert not (tmp_path / "small.js.gz").exists()
+    assert (tmp_path / "big.js.br").exists() == build_site.BROTLI_AVAILABLE
+
+
+@pytest.mark.skipif(not build_site.PILLOW_AVAILABLE, reason="Pillow not installed")
+def test_image_variants_are_encoded_once(tmp_path):
+    from PIL import Image
+    cache_dir = tmp_path / "cache"
+    encoded = []
+    for build in ("first", "second"):
+        build_dir = tmp_path / build
+        build_dir.mkdir()
+        Image.new('RGB', (600, 300), 'teal').save(build_dir / "chart_test.png")
+        variants, count = build_site.build_image_variants(build_dir, {"chart_test.png"}, cache_dir, max_workers=1)
+        encoded.append(count)
+
+    formats = build_site.image_formats()
+    assert encoded == [2 * len(formats), 0]  # 480w and the original 600w, then all cached
+    assert variants["chart_test.png"]['width'] == 600 and variants["chart_test.png"]['height'] == 300
+    assert set(variants["chart_test.png"]['srcsets']) == set(formats)
+    assert len(list((build_dir / build_site.IMAGE_DIR).iterdir())) == 2 * len(formats)
@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+import dedup
+from process_threads import ThreadRecord
+
+WORDS = [f"word{i}" for i in range(2000)]
+
+
+def random_text(rng, length=400):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def shingles(text):
+    tokens = text.split()
+    return {' '.join(tokens[i:i + dedup.SHINGLE_SIZE]) for i in range(len(tokens) - dedup.SHINGLE_SIZE + 1)}
+
+
+def jaccard(first, second):
+    a, b = shingles(first), shingles(second)
+    return len(a & b) / len(a | b)
+
+
+def edit(rng, text, changes):
+    tokens = text.split()
+    for i in rng.sample(range(len(tokens)), changes):
+        tokens[i] = rng.choice(WORDS)
+    return ' '.join(tokens)
+
+
+def signature(text):
+    return dedup.minhash_signature(dedup.shingle_hashes(text))
+
+
+def test_estimated_jaccard_tracks_true_similarity():
+    rng = random.Random(1)
+    for changes in (0, 5, 20, 60):
+        original = random_text(rng)
+        edited = edit(rng, original, changes)
+        estimate = dedup.estimated_jaccard(signature(original), signature(edited))
+        assert abs(estimate - jaccard(original, edited)) < 0.12
+
+
+def test_threshold_separates_reposts_from_similar_submissions():
+    rng = random.Random(2)
+    original = random_text(rng)
+    repost = edit(rng, original, 3)  # A few words fixed: true Jaccard ~0.96
+    similar = edit(rng, original, 40)  # Same template, different answers: ~0.4
+    assert jaccard(original, repost) > 0.9 and jaccard(original, similar) < 0.6
+    assert dedup.duplicate_clusters([original, similar, repost, random_text(rng)]) == [[0, 2]]
+
+
+def test_lsh_pairs_only_share_a_band():
+    rng = random.Random(3)
+    texts = [random_text(rng) for _ in range(20)]
+    texts.append(texts[7])
+    pairs = dedup.lsh_candidate_pairs([signature(t) for t in texts])
+    assert (7, 20) in pairs
+    assert len(pairs) < 5
+
+
+def test_short_and_empty_texts_are_not_clustered():
+    assert signature("") is None
+    assert signature("only three words") is None
+    short = ' '.join(WORDS[:dedup.SHINGLE_SIZE + dedup.MIN_SHINGLES - 2])  # One shingle too few
+    long = ' '.join(WORDS[:dedup.SHINGLE_SIZE + dedup.MIN_SHINGLES - 1])
+    assert dedup.duplicate_clusters(["", "", "only three words", "only three words", short, short]) == []
+    assert dedup.duplicate_clusters([long, long]) == [[0, 1]]
+
+
+def test_numpy_and_pure_python_signatures_match(monkeypatch):
+    pytest.importorskip("numpy")
+    hashes = dedup.shingle_hashes(random_text(random.Random(4)))
+    vectorized = dedup.minhash_signature(hashes)
+    monkeypatch.setattr(dedup, 'NUMPY_AVAILABLE', False)
+    assert dedup.minhash_signature(hashes) == vectorized
+
+
+def test_mark_duplicates_keeps_first_thread():
+    text = random_text(random.Random(5))
+    threads = [
+        ThreadRecord(id=3, title="Repost", content=text, author="Ada", author_id=7),
+        ThreadRecord(id=2, title="Other", content=random_text(random.Random(6)), author="Ada", author_id=7),
+        ThreadRecord(id=1, title="Repost", content=text, author="Ada L.", author_id=7, duplicate_of=99),
+    ]
+    assert dedup.mark_duplicates(threads) == [[0, 2]]
+    assert [t.duplicate_of for t in threads] == [None, None, 3]
+
+
+def test_different_authors_with_near_identical_posts_are_kept():
+    short = "HW3 with Claude\nTranscript attached, it did well."
+    text = random_text(random.Random(7))
+    threads = [
+        ThreadRecord(id=4, title="HW3 Claude", content=short, author="Ada", author_id=1),
+        ThreadRecord(id=3, title="HW3 Claude", content=short, author="Bob", author_id=2),
+        ThreadRecord(id=2, title="Same template", content=text, author="Ada", author_id=1),
+        ThreadRecord(id=1, title="Same template", content=text, author="Bob", author_id=2),
+    ]
+    assert dedup.mark_duplicates(threads) == []
+    assert [t.duplicate_of for t in threads] == [None] * 4
+
+
+def test_different_authors_with_the_same_attachments_are_merged(tmp_path):
+    text = random_text(random.Random(8))
+    threads = []
+    for thread_id, author in [(2, "Ada"), (1, "Group partner")]:
+        folder = tmp_path / str(thread_id)
+        (folder / "attachments").mkdir(parents=True)
+        (folder / "attachments" / f"report{thread_id}.pdf").write_bytes(b"%PDF same bytes")
+        threads.append(ThreadRecord(id=thread_id, title="Report", content=text, author=author,
+                                    folder=str(folder), attachments=[f"report{thread_id}.pdf"]))
+    assert dedup.mark_duplicates(threads) == [[0, 1]]
+    assert threads[1].duplicate_of == 2
+
+
+def test_duplicate_attachments_maps_identical_bytes(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"same")
+    (tmp_path / "B.pdf").write_bytes(b"same")
+    (tmp_path / "c.pdf").write_bytes(b"diff")
+    assert dedup.duplicate_attachments(tmp_path) == {'a.pdf': 'B.pdf'}
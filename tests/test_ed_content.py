@@ -0,0 +1,54 @@
+from ed_content import extract_elements, extract_files, extract_link_hrefs
+
+WELL_FORMED = (
+    '<?xml version="1.0"?>'
+    '<document version="2.0"><paragraph>See the attached log.</paragraph>'
+    '<file url="https://static.us.edusercontent.com/files/a" filename="chat.pdf"/>'
+    '<link href="https://claude.ai/share/x?a=1&amp;b=2">log</link>'
+    '<file url="" filename="empty.pdf"/></document>'
+)
+
+
+def test_collects_files_links_and_documents_in_order():
+    result = extract_elements(WELL_FORMED)
+    assert result['documents'] == [{'version': '2.0'}]
+    assert [f['filename'] for f in result['files']] == ['chat.pdf', 'empty.pdf']
+    assert extract_link_hrefs(WELL_FORMED) == ['https://claude.ai/share/x?a=1&b=2']
+
+
+def test_extract_files_skips_files_without_url():
+    assert extract_files(WELL_FORMED) == [
+        {'url': 'https://static.us.edusercontent.com/files/a', 'filename': 'chat.pdf'},
+    ]
+
+
+def test_empty_and_non_string_content():
+    assert extract_files('') == []
+    assert extract_files(None) == []
+    assert extract_link_hrefs(12) == []
+
+
+def test_fragment_without_root_element():
+    content = '<file url="u1" filename="a.pdf"/><file url="u2" filename="b.pdf"/>'
+    assert [f['url'] for f in extract_files(content)] == ['u1', 'u2']
+
+
+def test_stray_less_than_keeps_later_elements():
+    content = '<document><p>x < y</p><file url="u1" filename="a.pdf"/><link href="h"/></document>'
+    assert extract_files(content) == [{'url': 'u1', 'filename': 'a.pdf'}]
+    assert extract_link_hrefs(content) == ['h']
+
+
+def test_stray_ampersand_keeps_later_elements():
+    content = '<document><p>Q&A, AT&T</p><file url="u1"/><file url="u2" filename="b.pdf"/></document>'
+    assert [f['url'] for f in extract_files(content)] == ['u1', 'u2']
+
+
+def test_html_entities_fall_back_and_decode_attributes():
+    content = '<document><p>&nbsp;</p><link href="https://x.org/?a=1&amp;b=2"/></document>'
+    assert extract_link_hrefs(content) == ['https://x.org/?a=1&b=2']
+
+
+def test_unclosed_tags_and_truncated_content():
+    content = '<document><p><b>bold<file url="u1"/><link href="h"'
+    assert [f['url'] for f in extract_files(content)] == ['u1']
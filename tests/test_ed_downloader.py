@@ -0,0 +1,17 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_downloader_users_import_with_stdlib_test_first(tmp_path):
+    # With the repository last on sys.path, `import test` is the standard library's package
+    code = (
+        f"import sys; sys.path.append({str(ROOT)!r}); import test, watch, multi_course; "
+        "print(test.__file__.startswith(sys.prefix) or test.__file__.startswith(sys.base_prefix), "
+        "watch.downloader.COURSE_ID == multi_course.downloader.COURSE_ID)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True)
+    assert output.returncode == 0, output.stderr
+    assert output.stdout.split() == ["True", "True"]
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+import process_threads as pt
+
+# Fragments that exercise the LLM, homework, participation, link and profile
+# patterns, including near misses and case-folding edge cases (İ, ı, ſ, K)
+PIECES = [
+    'Claude', 'claude ', 'Sonnet 4.5', 'Opus', ' 4.5 ', 'Kimi K2', 'KİMİ', 'Kımı', 'Llama 3 Scout', 'ChatGPT',
+    'chatgpt-o1', 'GPT-5.1 Pro', 'gpt-oss-120b', 'GPT 4o', 'GPT-5 (Regular)', 'Gemini 3 Pro',
+    'Gemini (Thinking with Pro)', 'gemma 3 (27b)', 'DeepSeek v3.2', 'Deepſeek', 'Grok 4', 'Mistral AI',
+    'NotebookLM', 'Notebook LM', 'Qwen3-Max', 'Cursor', 'Windsurf', 'Perplexity Pro', 'Copilot',
+    'HW 08', 'hw7', 'Homework 012', 'HWK 3', 'hwindsurf', 'httperplexity', 'grokimi', 'Participation A',
+    'participation c', 'https://claude.ai/share/abc-1', 'https://chatgpt.com/share/x-y/',
+    'https://github.com/user/', 'https://github.com/u', 'http://www.linkedin.com/in/me',
+    'https://linkedin.com/in/you/', 'https://me.github.io/', 'HTTPS://Foo.VERCEL.app/x',
+    'https://a.netlify.app', 'https://drive.google.com/file/d/1"', 'https://grok.com/share/q_1',
+    'https://chat.deepseek.com/share/z', 'https://chat.mistral.ai/chat/m-1', '<link href="https://x.com/y"/>',
+    '<a href="https://claude.ai/share/zz">t</a>', ' ', '\n', '(', ')', '.', '-', '–', '1', '0', 'é', '’',
+    'K', 'ſ', 'İ', 'ı', 'xyz', 'chat', 'GPT', 'gpt', 'http', 'https://',
+]
+
+
+def per_field(title, content, raw_content, author):
+    """The separate extractors extract_features replaced."""
+    return {
+        'llm_used': pt.extract_llm_name(title, content),
+        'homework': pt.extract_homework(title, content),
+        'participation_type': pt.extract_participation_type(title),
+        'links': pt.extract_links(raw_content, content),
+        'profiles': pt.extract_student_profiles(raw_content, content, author),
+    }
+
+
+def single_pass(title, content, raw_content, author):
+    features = pt.extract_features(title, content, raw_content, author)
+    return {name: features[name] for name in ('llm_used', 'homework', 'participation_type', 'links', 'profiles')}
+
+
+# Expected values were produced by the extractors as they were before
+# extract_features (one regex pass per field over the whole text)
+@pytest.mark.parametrize('title, content, raw_content, expected', [
+    ("Special Participation A: HW 08 with Claude Sonnet 4.5", "Used claude for everything", None,
+     {'llm_used': 'Claude Sonnet 4.5', 'homework': 'HW8', 'participation_type': 'A', 'links': [], 'profiles': None}),
+    ("Participation A - hw7 (GPT-5.1 Pro)", None, '<document><link href="https://chatgpt.com/share/a"/></document>',
+     {'llm_used': 'GPT-5.1 Pro', 'homework': 'HW7', 'participation_type': 'A',
+      'links': ['https://chatgpt.com/share/a'], 'profiles': None}),
+    ("Special Participation A", "Gemini 3 Pro on Homework 012, see https://me.github.io/ and https://github.com/me",
+     "https://linkedin.com/in/me/",
+     {'llm_used': 'Gemini Pro 3', 'homework': 'HW12', 'participation_type': 'A',
+      'links': ['https://github.com/me', 'https://linkedin.com/in/me'],
+      'profiles': {'github': 'https://github.com/me', 'linkedin': 'https://linkedin.com/in/me',
+                   'website': 'https://me.github.io'}}),
+    ("Participation c: hwindsurf", "httperplexity grokimi", "",
+     {'llm_used': 'Kimi', 'homework': 'Unknown HW', 'participation_type': 'C', 'links': [], 'profiles': None}),
+    ("KİMİ K2 on HW3", "Deepſeek and Kımı", None,
+     {'llm_used': 'Ki\u0307mi\u0307 K2', 'homework': 'HW3', 'participation_type': 'Unknown', 'links': [],
+      'profiles': None}),
+    ("", "", "",
+     {'llm_used': 'Unknown LLM', 'homework': 'Unknown HW', 'participation_type': 'Unknown', 'links': [],
+      'profiles': None}),
+])
+def test_single_pass_matches_previous_extractors(title, content, raw_content, expected):
+    assert single_pass(title, content, raw_content, 'Ada') == expected
+    assert per_field(title, content, raw_content, 'Ada') == expected
+
+
+def test_single_pass_matches_separate_extractors_on_random_text():
+    rng = random.Random(44)
+
+    def text(pieces):
+        return ''.join(rng.choice(PIECES) for _ in range(rng.randrange(pieces)))
+
+    for _ in range(2000):
+        title, content, raw_content = text(6), text(30), text(30)
+        if rng.random() < 0.1:
+            content = None
+        if rng.random() < 0.1:
+            raw_content = None
+        assert single_pass(title, content, raw_content, 'a') == per_field(title, content, raw_content, 'a'), \
+            (title, content, raw_content)
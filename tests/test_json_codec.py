@@ -0,0 +1,113 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+import json_codec
+
+DATA = {
+    'id': 12,
+    'title': "Żółw — “HW3” with GPT-4o 🐢",
+    'views': [0, -1, 2 ** 63 - 1],
+    'score': 0.25,
+    'flags': {'pinned': False, 'answer': None},
+    'tags': [],
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    """Run a test with orjson (when installed) and with the stdlib fallback."""
+    if request.param == 'orjson':
+        if not json_codec.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(json_codec, 'ORJSON_AVAILABLE', False)
+    return request.param
+
+
+def test_round_trip(backend, tmp_path):
+    assert json_codec.loads(json_codec.dumpb(DATA)) == DATA
+    assert json_codec.loads(json_codec.dumps(DATA)) == DATA
+    json_codec.dump(DATA, tmp_path / "data.json")
+    assert json_codec.load(tmp_path / "data.json") == DATA
+
+
+def test_compact_pretty_and_sorted_output(backend):
+    data = {'b': [1, {'c': "é"}], 'a': None}
+    assert json_codec.dumpb(data, pretty=False) == '{"b":[1,{"c":"é"}],"a":null}'.encode('utf-8')
+    assert json_codec.dumpb(data, pretty=False, sort_keys=True) == '{"a":null,"b":[1,{"c":"é"}]}'.encode('utf-8')
+    assert json_codec.dumps(data, pretty=True) == json.dumps(data, ensure_ascii=False, indent=2)
+
+
+def test_pretty_defaults_to_the_module_setting(backend, monkeypatch):
+    monkeypatch.setattr(json_codec, 'PRETTY', True)
+    assert json_codec.dumps({'a': 1}) == '{\n  "a": 1\n}'
+    assert json_codec.dumps({'a': 1}, pretty=False) == '{"a":1}'
+
+
+def test_non_string_keys_and_unknown_types(backend):
+    data = {1: Path("a/b"), 'when': datetime(2025, 10, 1, 12, 0)}
+    decoded = json_codec.loads(json_codec.dumpb(data))
+    assert decoded['1'] == "a/b"
+    assert decoded['when'] == "2025-10-01T12:00:00"
+
+
+DATES = {
+    'naive': datetime(2025, 10, 1, 12, 0),
+    'micro': datetime(2025, 10, 1, 12, 0, 5, 250),
+    'utc': datetime(2025, 10, 1, 12, 0, tzinfo=timezone.utc),
+    'offset': datetime(2025, 10, 1, 12, 0, tzinfo=timezone(timedelta(hours=11))),
+    'day': date(2025, 10, 1),
+}
+
+
+@pytest.mark.skipif(not json_codec.ORJSON_AVAILABLE, reason="orjson not installed")
+def test_dates_are_encoded_identically_by_both_backends(monkeypatch):
+    for pretty in (False, True):
+        expected = json_codec.dumpb(DATES, pretty=pretty)
+        with monkeypatch.context() as patched:
+            patched.setattr(json_codec, 'ORJSON_AVAILABLE', False)
+            assert json_codec.dumpb(DATES, pretty=pretty) == expected
+    assert json_codec.loads(expected)['offset'] == "2025-10-01T12:00:00+11:00"
+
+
+def test_lone_surrogates_fall_back_to_json(backend, tmp_path):
+    data = {'text': "broken \ud83d emoji", 'ok': "fine"}
+    encoded = json_codec.dumpb(data, pretty=False)
+    assert encoded == b'{"text":"broken \\ud83d emoji","ok":"fine"}'
+    assert json_codec.loads(encoded) == data
+    json_codec.dump(data, tmp_path / "data.json")
+    assert json_codec.load(tmp_path / "data.json") == data
+
+
+def test_integers_beyond_64_bits(backend):
+    data = {'big': 2 ** 64, 'negative': -(2 ** 70)}
+    assert json_codec.dumpb(data, pretty=False) == b'{"big":18446744073709551616,"negative":-1180591620717411303424}'
+    assert json_codec.loads(json_codec.dumps(data)) == data
+
+
+def test_large_files_are_memory_mapped(backend, tmp_path):
+    data = {'threads': [{'id': i, 'content': "x" * 100} for i in range(json_codec.MMAP_THRESHOLD // 100)],
+            'note': "lone \udc00 surrogate"}
+    path = tmp_path / "large.json"
+    json_codec.dump(data, path)
+    assert path.stat().st_size >= json_codec.MMAP_THRESHOLD
+    assert json_codec.load(path) == data
+
+
+def test_invalid_json_raises_value_error(backend):
+    with pytest.raises(ValueError):
+        json_codec.loads(b'{"a": ')
+
+
+def test_setup_from_argv(monkeypatch):
+    monkeypatch.setattr(json_codec, 'PRETTY', False)
+    argv = ["main.py", "process"]
+    assert json_codec.setup_from_argv(argv) is False
+    assert argv == ["main.py", "process"] and json_codec.PRETTY is False
+
+    argv = ["main.py", json_codec.PRETTY_FLAG, "process"]
+    assert json_codec.setup_from_argv(argv) is True
+    assert argv == ["main.py", "process"] and json_codec.PRETTY is True
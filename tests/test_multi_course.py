@@ -0,0 +1,59 @@
+import threading
+import time
+
+import attachments
+import multi_course
+
+WORKERS = 3
+
+
+class FakeEd:
+    """Stands in for EdAPI; attachment GETs go through attachments.download_file."""
+    headers = {}
+
+
+def test_pool_size_bounds_attachment_downloads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The retry queue is written to the working directory
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def counting_download(url, file_path, headers, progress, timeout=30, session=None):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        file_path.write_bytes(b"pdf")
+        return 3
+
+    threads = [
+        {'id': i, 'title': f"Special Participation A {i}",
+         'attachments': [{'url': f"https://example.com/{i}/{j}.pdf", 'name': f"file{j}.pdf"} for j in range(4)]}
+        for i in range(6)
+    ]
+    monkeypatch.setattr(attachments, 'download_file', counting_download)
+    monkeypatch.setattr(multi_course, 'list_course_threads', lambda ed, config: threads)
+    configs = [{'name': "fa25", 'course_id': 1, 'category_filter': None, 'title_filter': None}]
+
+    stats = multi_course.ingest_courses(FakeEd(), configs, output_dir=tmp_path / "out", max_workers=WORKERS)
+    assert [s['files_downloaded'] for s in stats['fa25']] == [4] * 6
+    assert 1 < peak <= WORKERS
+
+
+def test_rate_limited_ed_api_throttles_quota_calls():
+    calls = []
+
+    class Ed:
+        session = object()
+
+        def get_thread(self, thread_id):
+            calls.append(thread_id)
+            return thread_id
+
+    limiter = multi_course.RateLimiter(rate=1000, burst=2)
+    ed = multi_course.RateLimitedEdAPI(Ed(), limiter)
+    assert [ed.get_thread(i) for i in range(3)] == [0, 1, 2]
+    assert ed.session is Ed.session
+    assert limiter.tokens < 1
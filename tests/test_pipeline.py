@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import pytest
+
+import pipeline
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    """Two file-to-file stages in tmp_path; returns (source, runs)."""
+    source = tmp_path / "source.txt"
+    middle = tmp_path / "middle.txt"
+    final = tmp_path / "final.txt"
+    source.write_text("one")
+    runs = []
+
+    def copy(src, dst, name):
+        def run(context):
+            runs.append(name)
+            dst.write_text(src.read_text().upper())
+        return run
+
+    monkeypatch.setattr(pipeline, 'STATE_FILE', tmp_path / "state.json")
+    monkeypatch.setattr(pipeline, 'STAGES', [
+        {'name': 'first', 'inputs': lambda context: [pipeline.hash_paths([source])],
+         'outputs': [middle], 'run': copy(source, middle, 'first')},
+        {'name': 'second', 'inputs': lambda context: [pipeline.hash_paths([middle])],
+         'outputs': [final], 'run': copy(middle, final, 'second')},
+    ])
+    monkeypatch.setattr(pipeline, 'STAGE_NAMES', ['first', 'second'])
+    return source, middle, runs
+
+
+def test_second_run_is_up_to_date(stages):
+    source, middle, runs = stages
+    assert pipeline.run_pipeline() == ['first', 'second']
+    assert pipeline.run_pipeline() == []
+
+
+def test_changed_input_reruns_stage_and_dependents(stages):
+    source, middle, runs = stages
+    pipeline.run_pipeline()
+    source.write_text("two")
+    assert pipeline.run_pipeline() == ['first', 'second']
+
+
+def test_modified_output_reruns_only_that_stage(stages):
+    source, middle, runs = stages
+    pipeline.run_pipeline()
+    middle.write_text("edited by hand")
+    # first restores middle.txt, so second's input is unchanged
+    assert pipeline.run_pipeline() == ['first']
+
+
+def test_until_and_force(stages):
+    assert pipeline.run_pipeline(until='first') == ['first']
+    assert pipeline.run_pipeline() == ['second']
+    assert pipeline.run_pipeline(force=True) == ['first', 'second']
+
+
+def test_code_hash_follows_tables_and_functions():
+    def f():
+        return 1
+
+    assert pipeline.hash_code([{'a': 1}, f]) == pipeline.hash_code([{'a': 1}, f])
+    assert pipeline.hash_code([{'a': 1}]) != pipeline.hash_code([{'a': 2}])
+
+
+def make_thread(download_dir, name, files):
+    folder = download_dir / name
+    (folder / "attachments").mkdir(parents=True)
+    (folder / pipeline.THREAD_DATA_FILE).write_text('{"title": "t"}')
+    for file_name, text in files.items():
+        (folder / "attachments" / file_name).write_text(text)
+    return folder
+
+
+def test_folder_hash_covers_json_and_attachment_names(tmp_path):
+    folder = make_thread(tmp_path, "1_thread", {"chat.pdf": "binary"})
+    before = pipeline.thread_folder_hash(folder)
+    (folder / "attachments" / "chat.pdf").write_text("other bytes")
+    assert pipeline.thread_folder_hash(folder) == before
+    (folder / "attachments" / "log.md").write_text("notes")
+    assert pipeline.thread_folder_hash(folder) != before
+
+
+def test_attachment_text_hash_covers_text_contents_only(tmp_path):
+    folder = make_thread(tmp_path, "1_thread", {"log.md": "claude", "chat.pdf": "binary"})
+    before = pipeline.attachment_text_hash(tmp_path)
+    (folder / "attachments" / "chat.pdf").write_text("other bytes")
+    assert pipeline.attachment_text_hash(tmp_path) == before
+    (folder / "attachments" / "log.md").write_text("gemini")
+    assert pipeline.attachment_text_hash(tmp_path) != before
+    assert pipeline.attachment_text_hash(Path(tmp_path / "missing")) == \
+        pipeline.attachment_text_hash(Path(tmp_path / "also_missing"))
+
+
+def test_dataset_and_site_inputs_include_attachment_text(tmp_path, monkeypatch):
+    folder = make_thread(tmp_path, "1_thread", {"log.txt": "a"})
+    monkeypatch.setattr(pipeline.pt, 'DOWNLOAD_DIR', tmp_path)
+    stages = {stage['name']: stage for stage in pipeline.STAGES}
+    before = {name: stages[name]['inputs']({}) for name in ('dataset', 'site')}
+    (folder / "attachments" / "log.txt").write_text("b")
+    for name in ('dataset', 'site'):
+        assert stages[name]['inputs']({}) != before[name]
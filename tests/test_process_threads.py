@@ -0,0 +1,129 @@
+import json
+
+import json_codec
+import process_threads as pt
+
+
+def write_thread(root, thread_id, title, document):
+    folder = root / f"{thread_id}_thread"
+    folder.mkdir()
+    data = {
+        'id': thread_id,
+        'title': title,
+        'document': document,
+        'content': f"<document><paragraph>{document}</paragraph></document>",
+        'user': {'id': 1, 'name': 'Ada'},
+        'created_at': '2025-10-01T12:00:00+11:00',
+    }
+    (folder / "full_thread_data.json").write_text(json.dumps(data), encoding='utf-8')
+    return folder
+
+
+def count_loads(monkeypatch):
+    calls = []
+    load = json_codec.load
+
+    def counting_load(path):
+        calls.append(path)
+        return load(path)
+
+    monkeypatch.setattr(json_codec, 'load', counting_load)
+    return calls
+
+
+def test_lazy_record_drops_and_rereads_text(tmp_path):
+    folder = write_thread(tmp_path, 1, "Special Participation A: HW1 with GPT-4o", "Solved it")
+    record = pt.process_thread(folder, lazy_text=True)
+    assert record._content is pt._UNLOADED
+    assert record.content == "Solved it"
+    assert record.raw_content.startswith("<document>")
+    assert record.to_dict() == pt.process_thread(folder).to_dict()
+
+
+def test_text_loaded_reads_each_thread_once(tmp_path, monkeypatch):
+    threads = [
+        pt.process_thread(write_thread(tmp_path, i, f"Special Participation A: HW{i} Claude", f"text {i}"),
+                          lazy_text=True)
+        for i in range(1, 4)
+    ]
+    calls = count_loads(monkeypatch)
+    with pt.text_loaded(threads):
+        for thread in threads:
+            for _ in range(3):
+                assert thread.content and thread.raw_content
+            thread.to_dict()
+    assert len(calls) == len(threads)
+    assert all(thread._content is pt._UNLOADED for thread in threads)
+
+
+def test_text_loaded_leaves_eager_records_alone(tmp_path, monkeypatch):
+    record = pt.process_thread(write_thread(tmp_path, 1, "Special Participation A: HW1 Gemini", "kept"))
+    calls = count_loads(monkeypatch)
+    with pt.text_loaded([record]):
+        assert record.content == "kept"
+    assert not calls
+    assert record.content == "kept"
+
+
+def test_collation_key_matches_locale_compare():
+    # Order produced by names.sort((a, b) => a.localeCompare(b)) in Node 20 (ICU 77)
+    expected = [
+        "Æsir", "Anne Marie", "Anne_Marie", "Anne-Marie", "AnneMarie", "Bob", "Bøb", "Bob 10",
+        "Bob 2", "Celik", "Ćelik", "Çelik", "Đorđe", "José", "Jöse", "Luca", "Łucja", "Muller",
+        "Müller", "O'Brien", "OBrien", "Ólafur", "Sören", "Søren", "Strase", "Strasse", "Straße",
+        "Zoe", "zoé", "Zoé", "Zoë", "Иван", "李雷",
+    ]
+    shuffled = expected[::2] + expected[1::2]
+    assert sorted(shuffled, key=pt.collation_key) == expected
+
+
+def test_collation_key_orders_accents_then_case():
+    names = ["Résumé", "resume", "Resume", "resumé", "résume", "rèsume"]
+    assert sorted(names, key=pt.collation_key) == ["resume", "Resume", "resumé", "résume", "Résumé", "rèsume"]
+
+
+def test_data_js_ships_content_html_without_plain_content(tmp_path):
+    folder = write_thread(tmp_path, 1, "Special Participation A: HW1 Claude",
+                          "Transcript: https://claude.ai/share/abc\n\n  a < b & c  ")
+    record = pt.process_thread(folder)
+    output = tmp_path / "website" / "data.js"
+    output.parent.mkdir()
+    pt.generate_data_js([record], output)
+    text = output.read_text(encoding='utf-8')
+    dataset = json_codec.loads(text.split("const participationData = ", 1)[1].split(";\n", 1)[0])
+    thread = dataset['threads'][0]
+    assert 'content' not in thread
+    assert thread['content_html'] == (
+        '<p>Transcript: <a href="https://claude.ai/share/abc" target="_blank" rel="noopener noreferrer">'
+        'https://claude.ai/share/abc</a></p><p>a &lt; b &amp; c</p>'
+    )
+
+
+def test_thread_page_links_only_web_urls(tmp_path):
+    record = pt.process_thread(write_thread(tmp_path, 1, "Special Participation A: HW1 Claude", "See below"))
+    record.links = ["https://claude.ai/share/abc", "javascript:alert(1)", " JavaScript:alert(2)"]
+    page = pt.render_thread_page(record)
+    assert '<a href="https://claude.ai/share/abc"' in page
+    assert '<li>javascript:alert(1)</li>' in page and '<li> JavaScript:alert(2)</li>' in page
+    assert 'href="javascript' not in page.lower() and 'href=" javascript' not in page.lower()
+
+
+def test_sitemap_needs_site_url(tmp_path, monkeypatch):
+    record = pt.process_thread(write_thread(tmp_path, 1, "Special Participation A: HW1 Claude", "Hi"))
+    sitemap = tmp_path / "sitemap.xml"
+    monkeypatch.setattr(pt, 'SITE_URL', "https://example.edu/spa")
+    pt.generate_thread_pages([record], tmp_path / "threads", sitemap)
+    assert "<loc>https://example.edu/spa/threads/1.html</loc>" in sitemap.read_text(encoding='utf-8')
+
+    monkeypatch.setattr(pt, 'SITE_URL', "")
+    pt.generate_thread_pages([record], tmp_path / "threads", sitemap)
+    assert not sitemap.exists() and (tmp_path / "threads" / "1.html").exists()
+
+
+def test_content_html_links_only_web_urls():
+    content = "Run javascript:alert(1) or open https://claude.ai/share/abc"
+    html = pt.format_content_html(content, ["javascript:alert(1)", "https://claude.ai/share/abc"])
+    assert html == (
+        '<p>Run javascript:alert(1) or open <a href="https://claude.ai/share/abc" target="_blank" '
+        'rel="noopener noreferrer">https://claude.ai/share/abc</a></p>'
+    )
@@ -0,0 +1,136 @@
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import json_codec
+import process_threads as pt
+import query_server as qs
+
+BROWSE_QUERY_JS = Path(__file__).resolve().parent.parent / "website" / "browse_query.js"
+
+THREADS = [
+    pt.ThreadRecord(id=1, title="HW3 with GPT-4o", author="Ada", llm_used="GPT-4o", homework="HW3",
+                    created_at="2025-10-01T12:00:00+11:00", view_count=5,
+                    content="Gradient descent converges.\n\n  Step size 0.1 & momentum  "),
+    pt.ThreadRecord(id=2, title="HW3 using Claude", author="Bob", llm_used="Claude Opus", homework="HW3",
+                    created_at="2025-10-02T12:00:00+11:00", view_count=9,
+                    content="The proof of descent\nconverges for any step size"),
+    pt.ThreadRecord(id=3, title="HW5 Gemini", author="Chen", llm_used="Gemini 2.5 Pro", homework="HW5",
+                    created_at="2025-10-03T12:00:00+11:00", view_count=1,
+                    content="Attention heads and positional encoding <b>"),
+    pt.ThreadRecord(id=4, title="HW5 Gemini (repost)", author="Chen", llm_used="Gemini 2.5 Pro", homework="HW5",
+                    created_at="2025-10-02T09:00:00+11:00", view_count=0, duplicate_of=3,
+                    content="Attention heads and positional encoding"),
+]
+
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No .attachment_cache.json here
+    path = tmp_path / "participation_a_data.json"
+    json_codec.dump({'threads': [t.to_dict() for t in THREADS]}, path)
+    return path
+
+
+def ids(result):
+    return [card['id'] for card in result['threads']]
+
+
+def test_routes(data_path, tmp_path):
+    service = qs.QueryService(data_path)
+    status, body, etag = service.respond('/api/threads', {'hw': 'HW3'})
+    assert status == 200 and etag
+    result = json_codec.loads(body)
+    assert result['total'] == 2 and ids(result) == [2, 1]
+    assert result['facets']['llm'] == {'Claude Opus': 1, 'GPT-4o': 1}
+    assert service.respond('/api/threads', {'hw': 'HW3'})[1] is body  # Cached
+
+    status, body, _ = service.respond('/api/facets', {})
+    assert json_codec.loads(body) == {
+        'total': 3,  # The repost is collapsed
+        'facets': {
+            'provider': {'OpenAI': 1, 'Anthropic': 1, 'Google': 1},
+            'llm': {'GPT-4o': 1, 'Claude Opus': 1, 'Gemini 2.5 Pro': 1},
+            'homework': {'HW3': 2, 'HW5': 1},
+        },
+    }
+
+    assert service.respond('/api/threads/99', {})[0] == 404
+    assert service.respond('/api/nothing', {})[0] == 404
+    for path, params in [('/api/threads/abc', {}), ('/api/threads', {'sort': 'random'}),
+                         ('/api/threads', {'per_page': '0'}), ('/api/threads', {'page': 'x'})]:
+        status, body, etag = service.respond(path, params)
+        assert status == 400 and 'error' in json_codec.loads(body) and etag is None
+
+
+def test_thread_detail_has_what_the_modal_links_to(data_path):
+    index = qs.ThreadIndex(data_path, site_dir=data_path.parent / "website")
+    detail = index.thread(3)
+    assert 'content' not in detail and 'raw_content' not in detail
+    assert detail['content_html'] == "<p>Attention heads and positional encoding &lt;b&gt;</p>"
+    assert detail['versions'] == [
+        {'id': 4, 'title': "HW5 Gemini (repost)", 'author': "Chen", 'created_at': "2025-10-02T09:00:00+11:00"}
+    ]
+    assert [other['id'] for other in index.thread(4)['versions']] == [3]
+    assert detail['related'][0] == {'id': 4, 'title': "HW5 Gemini (repost)", 'llm_used': "Gemini 2.5 Pro",
+                                    'homework': "HW5"}
+    assert detail['attachment_meta'] == {} and detail['resources'] is None
+
+
+def test_search_matches_the_whole_phrase(data_path):
+    index = qs.ThreadIndex(data_path)
+    assert ids(index.query({'search': 'DESCENT CONVERGES'})) == [1]  # Not thread 2's separate words
+    assert ids(index.query({'search': 'ent conv'})) == [1]
+    assert ids(index.query({'search': 'size 0.1 & mom'})) == [1]
+    assert ids(index.query({'search': 'descent\nconv'})) == [2]  # Lines are joined as in content_html
+    assert ids(index.query({'search': 'gpt-4o gradient'})) == []  # Fields are not joined
+    assert ids(index.query({'search': 'anthropic'})) == [2]
+    assert ids(index.query({'search': ' & '})) == [1]
+    assert index.query({'search': ''})['total'] == 3
+
+
+def test_word_cache_is_bounded(data_path, monkeypatch):
+    monkeypatch.setattr(qs, 'WORD_CACHE_SIZE', 2)
+    index = qs.ThreadIndex(data_path)
+    for search in ['step', 'proof', 'heads', 'proof']:
+        index.query({'search': search})
+    assert list(index.word_matches) == ['heads', 'proof']
+
+
+def test_reloads_when_the_data_changes(data_path):
+    service = qs.QueryService(data_path)
+    before = service.respond('/api/threads', {})
+    json_codec.dump({'threads': [t.to_dict() for t in THREADS[:1]]}, data_path)
+    after = service.respond('/api/threads', {})
+    assert json_codec.loads(after[1])['total'] == 1 and after[2] != before[2]
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="Node.js not installed")
+def test_search_agrees_with_browse_query_js(data_path):
+    index = qs.ThreadIndex(data_path)
+    # The fields browse_query.js reads from data.js (generate_data_js)
+    website_threads = [{
+        'id': t.id, 'title': t.title, 'author': t.author, 'llm_used': t.llm_used, 'provider': t.provider,
+        'homework': t.homework, 'content_html': pt.format_content_html(t.content, t.links),
+        'created_ts': pt.epoch_millis(t.created_at), 'view_count': t.view_count,
+        **({'duplicate_of': t.duplicate_of} if t.duplicate_of is not None else {}),
+    } for t in THREADS]
+    searches = ['descent', 'DESCENT CONVERGES', 'ent conv', 'descent\nconv', 'size 0.1 & mom', ' & ',
+                '<b>', 'gemini 2', 'hw5', 'google', '.', '', 'encoding <', 'x']
+    script = f"""
+        const self = {{}};
+        eval(require('fs').readFileSync({json.dumps(str(BROWSE_QUERY_JS))}, 'utf8'));
+        const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+        const engine = self.createQueryEngine(input.threads, input.sortOrders);
+        console.log(JSON.stringify(input.searches.map(search => engine.query(
+            {{ search, provider: 'all', llm: 'all', hw: 'all', sort: 'date-desc' }}
+        ).map(i => input.threads[i].id))));
+    """
+    payload = json.dumps({'threads': website_threads, 'sortOrders': pt.build_sort_orders(website_threads),
+                          'searches': searches})
+    output = subprocess.run(['node', '-e', script], input=payload, capture_output=True, text=True, check=True)
+    expected = json.loads(output.stdout)
+    assert [ids(index.query({'search': search})) for search in searches] == expected
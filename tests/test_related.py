@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+import related
+from process_threads import ThreadRecord
+
+
+def thread(title, content, **fields):
+    return ThreadRecord(title=title, content=content, **fields)
+
+
+THREADS = [
+    thread("HW3 with GPT-4o", "gradient descent convergence proof learning rate step size"),
+    thread("HW3 using Claude", "gradient descent convergence proof with momentum and step size"),
+    thread("HW5 Gemini", "transformer attention heads positional encoding softmax"),
+    thread("HW5 with Llama", "attention heads in the transformer and positional encoding"),
+    thread("Unrelated", "zzz qqq"),
+]
+
+
+def test_tokenize_keeps_model_names_and_drops_stop_words():
+    assert related.tokenize("The GPT-5.1 model and hw7 were a hit") == ['gpt-5.1', 'model', 'hw7', 'hit']
+
+
+def test_tfidf_vectors_are_normalized_and_weight_rare_terms():
+    vectors, dimension = related.tfidf_vectors(["alpha beta", "alpha gamma", "alpha delta"])
+    assert dimension == 4
+    for vector in vectors:
+        assert math.isclose(sum(w * w for w in vector.values()), 1.0)
+    alpha, beta = 0, 1  # Vocabulary is sorted
+    assert vectors[0][beta] > vectors[0][alpha]
+
+
+def test_related_threads_pairs_similar_submissions():
+    neighbours = related.related_threads(THREADS)
+    assert neighbours[0][0] == 1
+    assert neighbours[1][0] == 0
+    assert neighbours[2][0] == 3
+    assert neighbours[3][0] == 2
+    assert neighbours[4] == []  # Nothing above MIN_SIMILARITY
+    assert all(i not in row for i, row in enumerate(neighbours))
+
+
+def test_related_threads_limits_neighbours():
+    assert all(len(row) <= 1 for row in related.related_threads(THREADS, k=1))
+    assert related.related_threads(THREADS[:1]) == [[]]
+
+
+def test_sparse_and_inverted_index_agree():
+    backend = related._load_backend()
+    if backend is None:
+        pytest.skip("SciPy not installed")
+    vectors, dimension = related.tfidf_vectors([related.thread_text(t) for t in THREADS])
+    assert (related.neighbours_sparse(vectors, dimension, 3, backend)
+            == related.neighbours_inverted_index(vectors, 3))
+
+
+def test_without_scipy_falls_back_to_inverted_index(monkeypatch):
+    monkeypatch.setattr(related, '_load_backend', lambda: None)
+    assert related.related_threads(THREADS)[0][0] == 1
+
+
+def test_thread_text_includes_text_attachments(tmp_path):
+    attachments = tmp_path / "attachments"
+    attachments.mkdir()
+    (attachments / "chat.md").write_text("exported transcript", encoding='utf-8')
+    (attachments / "report.pdf").write_bytes(b"%PDF-1.4 binary")
+    record = thread("Title", "Body", folder=str(tmp_path), attachments=["chat.md", "report.pdf"])
+    assert related.thread_text(record) == "Title\nBody\nexported transcript"
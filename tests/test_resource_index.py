@@ -0,0 +1,10 @@
+import resource_index as ri
+
+
+def test_file_kind_matches_sol_as_a_word():
+    for name in ("hw08_solution.pdf", "HW3-Solutions.pdf", "midterm sol.pdf", "hw2sol.pdf"):
+        assert ri.file_kind('homework', name) == 'solution', name
+    for name in ("console.md", "isolation.pdf", "resolve.md", "solver_notes.pdf"):
+        assert ri.file_kind('homework', name) == 'other', name
+    assert ri.file_kind('homework', "hw08_question.pdf") == 'question'
+    assert ri.file_kind('homework', "q_vae_sol.zip") == 'code'
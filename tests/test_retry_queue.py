@@ -0,0 +1,93 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import retry_queue
+from retry_queue import RetryQueue, backoff_delay
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return RetryQueue(tmp_path / "queue.db")
+
+
+def test_backoff_doubles_up_to_the_ceiling():
+    assert [backoff_delay(n) for n in range(5)] == [60, 60, 120, 240, 480]
+    assert backoff_delay(20) == retry_queue.MAX_DELAY
+
+
+def test_failures_count_attempts_and_schedule_backoff(queue):
+    assert queue.record_failure('thread', 7, {'thread': {'id': 7}}, "timeout") == 1
+    assert queue.record_failure('thread', 7, {'thread': {'id': 7}}, ValueError("HTTP 502")) == 2
+    [item] = queue.items()
+    assert item['kind'] == 'thread' and item['key'] == '7'
+    assert item['status'] == 'failed' and item['attempts'] == 2
+    assert item['last_error'] == "HTTP 502" and item['payload'] == {'thread': {'id': 7}}
+    assert item['next_attempt_at'] - item['updated_at'] == pytest.approx(backoff_delay(2))
+
+
+def test_success_marks_done_and_a_new_failure_starts_over(queue):
+    queue.record_failure('attachment', Path("a/b.pdf"), {}, "404")
+    queue.record_failure('attachment', Path("a/b.pdf"), {}, "404")
+    queue.record_success('attachment', Path("a/b.pdf"))
+    assert queue.status('attachment', Path("a/b.pdf")) == 'done'
+    assert queue.items() == [] and queue.counts() == {'done': 1}
+    [done] = queue.items('done')
+    assert done['last_error'] is None and done['attempts'] == 2
+
+    assert queue.record_failure('attachment', Path("a/b.pdf"), {}, "404") == 1
+    assert queue.clear_done() == 0
+    queue.record_success('attachment', Path("a/b.pdf"))
+    assert queue.clear_done() == 1 and queue.counts() == {}
+
+
+def test_unqueued_success_does_not_create_the_queue(queue):
+    queue.record_success('thread', 1)
+    assert not queue.path.exists()
+    assert queue.items() == [] and queue.counts() == {} and queue.due() == []
+
+
+def test_due_respects_backoff_and_attempt_limit(queue):
+    queue.record_failure('thread', 1, {}, "once")
+    for _ in range(retry_queue.MAX_ATTEMPTS):
+        queue.record_failure('thread', 2, {}, "always")
+    [first] = [item for item in queue.items() if item['key'] == '1']
+
+    assert queue.due(now=first['next_attempt_at'] - 1) == []
+    assert [item['key'] for item in queue.due(now=first['next_attempt_at'])] == ['1']
+    assert sorted(item['key'] for item in queue.due(now=1e12)) == ['1']  # Too many attempts
+    assert sorted(item['key'] for item in queue.due(ignore_backoff=True)) == ['1', '2']
+
+
+def test_connections_are_closed(queue, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(retry_queue.sqlite3, 'connect', tracking_connect)
+    queue.record_failure('thread', 1, {}, "error")
+    queue.record_success('thread', 1)
+    queue.items()
+    queue.counts()
+    queue.status('thread', 1)
+    queue.clear_done()
+    assert len(opened) == 6
+    for connection in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+
+def test_record_downloads_marks_each_file(monkeypatch, tmp_path):
+    queue = RetryQueue(tmp_path / "queue.db")
+    monkeypatch.setattr(retry_queue, 'retry_queue', queue)
+    jobs = [("https://x/a.pdf", tmp_path / "a.pdf"), ("https://x/b.pdf", tmp_path / "b.pdf")]
+    retry_queue.record_downloads(jobs, [], {'a.pdf': "timeout", 'b.pdf': "timeout"}, thread_id=3)
+    retry_queue.record_downloads(jobs, ['a.pdf'], {'b.pdf': "HTTP 500"}, thread_id=3)
+    [item] = queue.items()
+    assert item['key'] == str(tmp_path / "b.pdf") and item['attempts'] == 2
+    assert item['payload'] == {'url': "https://x/b.pdf", 'path': str(tmp_path / "b.pdf"), 'thread_id': 3}
+    assert queue.status('attachment', tmp_path / "a.pdf") == 'done'
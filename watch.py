@@ -0,0 +1,228 @@
+"""
+Watch mode: poll Ed Stem and rebuild the site incrementally.
+
+Keeps one authenticated EdAPI session (and its HTTP connection pool) open,
+polls the course thread list on an adaptive schedule, downloads only threads
+that are new or changed, re-runs process_thread() for just those folders and
+regenerates participation_a_data.json, website/data.js and the static pages.
+
+Started through the project entry point:
+    python main.py watch
+"""
+
+import json
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import process_threads
+import ed_downloader as downloader
+
+MIN_POLL_INTERVAL = 60  # Seconds; used right after a change is seen
+MAX_POLL_INTERVAL = 15 * 60  # Seconds; ceiling when the course is quiet
+BACKOFF_FACTOR = 1.5  # Interval growth per quiet poll
+FULL_SYNC_INTERVAL = 6 * 60 * 60  # Seconds between full listings (catches edits to old threads)
+PAGE_SIZE = 100
+STATE_FILE_NAME = ".watch_state.json"  # Stored inside the download directory
+
+# Listing fields that change when a thread is edited or answered
+SIGNATURE_FIELDS = ('updated_at', 'reply_count', 'title')
+
+
+def thread_signature(thread):
+    """Summarize the listing fields that indicate a thread changed."""
+    return [str(thread.get(field, '')) for field in SIGNATURE_FIELDS]
+
+
+def next_interval(current, changed, min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL):
+    """Adaptive polling: snap back to the minimum on change, back off when quiet."""
+    if changed:
+        return min_interval
+    return min(max_interval, current * BACKOFF_FACTOR)
+
+
+class SiteWatcher:
+    """Incremental Ed -> downloaded_threads -> website pipeline."""
+
+    def __init__(self, ed, course_id=downloader.COURSE_ID,
+                 category_filter=downloader.CATEGORY_FILTER,
+                 title_filter=downloader.TITLE_FILTER,
+                 download_dir=process_threads.DOWNLOAD_DIR,
+                 build=False):
+        self.ed = ed
+        self.course_id = course_id
+        self.category_filter = category_filter
+        self.title_filter = title_filter
+        self.download_dir = download_dir
+        self.build = build
+        self.state_file = download_dir / STATE_FILE_NAME
+        self.signatures = self._load_state()
+        self.records = {}  # thread id -> ThreadRecord (content left on disk)
+        self.last_full_sync = None  # monotonic time of the last full listing
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def _load_state(self):
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('threads', {})
+        except Exception as e:
+            print(f"⚠ Could not read {self.state_file}: {e}")
+            return {}
+
+    def _save_state(self):
+        self.download_dir.mkdir(exist_ok=True)
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump({'course_id': self.course_id, 'threads': self.signatures}, f, indent=2)
+
+    def load_existing(self):
+        """Process everything already on disk once, so later polls are incremental."""
+        if not self.download_dir.exists():
+            return
+        for folder in sorted(f for f in self.download_dir.iterdir() if f.is_dir()):
+            record = process_threads.process_thread(folder, lazy_text=True)
+            if record:
+                self.records[record.id] = record
+        print(f"✓ Loaded {len(self.records)} processed thread(s) from {self.download_dir}")
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+    def list_changed(self, full=False):
+        """
+        Page through the thread list (newest first) and return new/changed threads.
+
+        Unless full is set, paging stops at the first page with nothing new,
+        so a quiet course costs a single request per poll.
+        """
+        changed = []
+        offset = 0
+        while True:
+            response = self.ed.list_threads(course_id=self.course_id, offset=offset, limit=PAGE_SIZE)
+            if isinstance(response, dict):
+                page = response.get('threads', response.get('data', []))
+            else:
+                page = response if isinstance(response, list) else []
+            if not page:
+                break
+
+            page_changed = [
+                t for t in page
+                if t.get('id') and self.signatures.get(str(t['id'])) != thread_signature(t)
+            ]
+            changed.extend(page_changed)
+
+            if len(page) < PAGE_SIZE or (not full and not page_changed):
+                break
+            offset += len(page)
+        return changed
+
+    def _remove_stale_folders(self, thread_id, keep_folder):
+        """A retitled thread gets a new folder; drop the old one."""
+        for folder in self.download_dir.glob(f"{thread_id}_*"):
+            if folder.is_dir() and folder != keep_folder:
+                shutil.rmtree(folder)
+
+    def sync_threads(self, threads):
+        """Download and re-process the given threads. Returns True if site data changed."""
+        matching = downloader.filter_threads(
+            threads,
+            category_filter=self.category_filter,
+            title_filter=self.title_filter,
+        ) if threads else []
+        matching_ids = {t.get('id') for t in matching}
+
+        site_changed = False
+        for thread in threads:
+            thread_id = thread.get('id')
+            self.signatures[str(thread_id)] = thread_signature(thread)
+            if thread_id not in matching_ids:
+                # Retitled out of the filter: drop it from the site
+                if self.records.pop(thread_id, None) is not None:
+                    self._remove_stale_folders(thread_id, None)
+                    site_changed = True
+                continue
+
+            print(f"  ↻ {thread.get('title', 'N/A')} ({thread_id})")
+            stats = downloader.download_thread(thread, self.course_id, self.download_dir, self.ed)
+            folder = Path(stats['folder'])
+            self._remove_stale_folders(thread_id, folder)
+
+            record = process_threads.process_thread(folder, lazy_text=True)
+            if record:
+                self.records[thread_id] = record
+            else:
+                self.records.pop(thread_id, None)
+            site_changed = True
+
+        self._save_state()
+        return site_changed
+
+    def rebuild_site(self):
+        """Regenerate the dataset and pages from the in-memory records."""
+        threads = process_threads.sort_threads(list(self.records.values()))
+        with process_threads.text_loaded(threads):
+            process_threads.mark_duplicates(threads)
+            process_threads.write_outputs(threads)
+        if self.build:
+            import build_site
+            build_site.build()
+
+    def poll_once(self):
+        """Run one poll. Returns True if anything changed."""
+        now = time.monotonic()
+        full = self.last_full_sync is None or now - self.last_full_sync >= FULL_SYNC_INTERVAL
+        changed = self.list_changed(full=full)
+        if full:
+            self.last_full_sync = now
+
+        stamp = datetime.now().strftime('%H:%M:%S')
+        if not changed:
+            print(f"[{stamp}] No changes{' (full sync)' if full else ''}")
+            return False
+
+        print(f"[{stamp}] {len(changed)} new/changed thread(s)")
+        if self.sync_threads(changed):
+            self.rebuild_site()
+        return True
+
+
+def run_watch(min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL,
+              build=False, once=False):
+    """Authenticate once and poll until interrupted."""
+    from edapi import EdAPI
+
+    print("=" * 70)
+    print("Ed Stem Watch Mode")
+    print("=" * 70)
+
+    ed = EdAPI()
+    try:
+        ed.login()
+        print("✓ Successfully authenticated with Ed API")
+    except Exception as e:
+        print(f"✗ Authentication failed: {e}")
+        return
+
+    watcher = SiteWatcher(ed, build=build)
+    watcher.load_existing()
+
+    interval = min_interval
+    try:
+        while True:
+            try:
+                changed = watcher.poll_once()
+            except Exception as e:
+                print(f"✗ Poll failed: {e}")
+                changed = False
+            if once:
+                break
+            interval = next_interval(interval, changed, min_interval, max_interval)
+            print(f"  Next poll in {interval:.0f}s")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
@@ -16,15 +16,37 @@
     let lastFocusedElement = null;
     let activeModalThreadId = null;
 
+    // Search/filter/sort runs in browse_worker.js; URLs come from the
+    // <script> tag so fingerprinted builds (build_site.py) keep working
+    const browseScript = document.currentScript;
+    let queryWorker = null;
+    let latestQueryId = 0;
+    let localEngine = null;  // Main-thread fallback
+
+    // Large archives query the local API (query_server.py, `python main.py serve`)
+    // named by data-api, one page at a time; only when the site is served locally.
+    // The API is asked first so that those archives never download data.js.
+    const API_THRESHOLD = 5000;  // Threads in the dataset
+    let queryApi = null;
+    let apiFacets = null;  // Whole-dataset counts from the API, in place of data.js
+    const apiLLMCounts = {};  // Provider -> LLM counts from the API
+    let datasetLoading = null;
+    let modalRequest = 0;  // Only the latest requested thread opens
+
+    const ready = findQueryApi().then(found => found || loadDataset());
+
     document.addEventListener('DOMContentLoaded', function() {
-        if (typeof participationData === 'undefined') {
-            console.error('Data not loaded');
-            return;
-        }
-        initBrowsePage();
+        ready.then(() => {
+            if (!queryApi && typeof participationData === 'undefined') {
+                console.error('Data not loaded');
+                return;
+            }
+            initBrowsePage();
+        });
     });
 
     function initBrowsePage() {
+        if (!queryApi) startQueryWorker();
         populateFilters();
         parseUrlParams();
         setupEventListeners();
@@ -39,17 +61,26 @@
         const hwSelect = document.getElementById('hwFilter');
 
         // Get counts for each filter
-        const providerCounts = {};
-        const hwCounts = {};
-        participationData.threads.forEach(t => {
-            const provider = t.provider || 'Other';
-            providerCounts[provider] = (providerCounts[provider] || 0) + 1;
-            hwCounts[t.homework] = (hwCounts[t.homework] || 0) + 1;
-        });
+        let providerCounts = {};
+        let hwCounts = {};
+        let providers = typeof uniqueProviders !== 'undefined' ? uniqueProviders : null;
+        let homeworks = typeof uniqueHWs !== 'undefined' ? uniqueHWs : [];
+        if (queryApi) {
+            providerCounts = apiFacets.provider;
+            hwCounts = apiFacets.homework;
+            providers = Object.keys(providerCounts);
+            homeworks = Object.keys(hwCounts).sort(compareHomework);
+        } else {
+            participationData.threads.forEach(t => {
+                const provider = t.provider || 'Other';
+                providerCounts[provider] = (providerCounts[provider] || 0) + 1;
+                hwCounts[t.homework] = (hwCounts[t.homework] || 0) + 1;
+            });
+        }
 
         // Populate providers with counts, sorted by count
-        if (providerSelect && typeof uniqueProviders !== 'undefined') {
-            const sortedProviders = [...uniqueProviders].sort((a, b) =>
+        if (providerSelect && providers) {
+            const sortedProviders = [...providers].sort((a, b) =>
                 (providerCounts[b] || 0) - (providerCounts[a] || 0)
             );
             sortedProviders.forEach(provider => {
@@ -67,7 +98,7 @@
 
         // Populate homework with counts
         if (hwSelect) {
-            uniqueHWs.forEach(hw => {
+            homeworks.forEach(hw => {
                 const opt = document.createElement('option');
                 opt.value = hw;
                 opt.textContent = `${hw} (${hwCounts[hw] || 0})`;
@@ -76,31 +107,58 @@
         }
     }
 
+    // Homework labels in number order, as uniqueHWs is sorted in data.js
+    function compareHomework(a, b) {
+        return parseInt(a.replace(/\D/g, '')) - parseInt(b.replace(/\D/g, ''));
+    }
+
     function updateLLMOptions() {
         const llmSelect = document.getElementById('llmFilter');
         if (!llmSelect) return;
 
-        const currentValue = llmSelect.value;
-
-        // Clear existing options except "All"
-        llmSelect.innerHTML = '<option value="all">All LLMs</option>';
+        const provider = currentFilters.provider;
+        if (queryApi) {
+            // Counts for the selected provider are the facets of a one-card query
+            if (apiLLMCounts[provider]) {
+                renderLLMOptions(llmSelect, apiLLMCounts[provider]);
+                return;
+            }
+            const params = new URLSearchParams({ per_page: 1 });
+            if (provider !== 'all') params.set('provider', provider);
+            fetch(`${queryApi}/threads?${params}`)
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .then(result => {
+                    apiLLMCounts[provider] = result.facets.llm;
+                    if (currentFilters.provider !== provider) return;
+                    const llm = currentFilters.llm;
+                    renderLLMOptions(llmSelect, result.facets.llm);
+                    if (currentFilters.llm !== llm) applyFiltersAndRender();  // LLM from the URL is not offered
+                })
+                .catch(() => {});  // Options stay as they are; queries fall back on their own
+            return;
+        }
 
         // Get LLM counts based on current provider filter
         const llmCounts = {};
         participationData.threads.forEach(t => {
-            if (currentFilters.provider === 'all' || t.provider === currentFilters.provider) {
+            if (provider === 'all' || t.provider === provider) {
                 llmCounts[t.llm_used] = (llmCounts[t.llm_used] || 0) + 1;
             }
         });
+        renderLLMOptions(llmSelect, llmCounts);
+    }
 
-        // Filter LLMs based on selected provider
-        let llmsToShow = uniqueLLMs;
-        if (currentFilters.provider !== 'all') {
-            llmsToShow = uniqueLLMs.filter(llm => llmCounts[llm] > 0);
-        }
+    function renderLLMOptions(llmSelect, llmCounts) {
+        const currentValue = currentFilters.llm;
+
+        // Clear existing options except "All"
+        llmSelect.innerHTML = '<option value="all">All LLMs</option>';
 
-        // Sort by count
-        llmsToShow = [...llmsToShow].sort((a, b) =>
+        // LLMs of the selected provider, alphabetically (as uniqueLLMs) and then by count
+        const llmsToShow = Object.keys(llmCounts).filter(llm => llmCounts[llm] > 0).sort().sort((a, b) =>
             (llmCounts[b] || 0) - (llmCounts[a] || 0)
         );
 
@@ -228,43 +286,33 @@
     }
 
     function applyFiltersAndRender() {
-        filteredThreads = participationData.threads.filter(thread => {
-            // Search filter
-            if (currentFilters.search) {
-                const search = currentFilters.search.toLowerCase();
-                const matches =
-                    thread.title.toLowerCase().includes(search) ||
-                    thread.author.toLowerCase().includes(search) ||
-                    thread.llm_used.toLowerCase().includes(search) ||
-                    thread.homework.toLowerCase().includes(search) ||
-                    thread.content.toLowerCase().includes(search) ||
-                    (thread.provider && thread.provider.toLowerCase().includes(search));
-                if (!matches) return false;
-            }
-
-            // Provider filter
-            if (currentFilters.provider !== 'all' && thread.provider !== currentFilters.provider) {
-                return false;
-            }
-
-            // LLM filter
-            if (currentFilters.llm !== 'all' && thread.llm_used !== currentFilters.llm) {
-                return false;
-            }
-
-            // Homework filter
-            if (currentFilters.hw !== 'all' && thread.homework !== currentFilters.hw) {
-                return false;
-            }
+        // Update URL
+        updateUrl();
 
-            return true;
-        });
+        const filters = { ...currentFilters };
+        if (queryApi) {
+            queryFromApi(filters, ++latestQueryId);
+            return;
+        }
+        if (queryWorker) {
+            // Rendered in handleWorkerMessage; stale replies are dropped
+            queryWorker.postMessage({ type: 'query', id: ++latestQueryId, filters });
+            return;
+        }
+        if (typeof participationData === 'undefined') return;  // Rendered once loadDataset() finishes
 
-        // Sort
-        sortThreads();
+        if (!localEngine) {
+            localEngine = createQueryEngine(
+                participationData.threads,
+                typeof sortOrders !== 'undefined' ? sortOrders : null
+            );
+        }
+        showResults(localEngine.query(filters));
+    }
 
-        // Update URL
-        updateUrl();
+    function showResults(indices) {
+        const threads = participationData.threads;
+        filteredThreads = Array.from(indices, i => threads[i]);
 
         // Render
         renderSubmissions();
@@ -272,23 +320,104 @@
         updateResultsInfo();
     }
 
-    function sortThreads() {
-        switch (currentFilters.sort) {
-            case 'date-desc':
-                filteredThreads.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-                break;
-            case 'date-asc':
-                filteredThreads.sort((a, b) => new Date(a.created_at) - new Date(b.created_at));
-                break;
-            case 'views-desc':
-                filteredThreads.sort((a, b) => b.view_count - a.view_count);
-                break;
-            case 'author-asc':
-                filteredThreads.sort((a, b) => a.author.localeCompare(b.author));
-                break;
-            case 'llm-asc':
-                filteredThreads.sort((a, b) => a.llm_used.localeCompare(b.llm_used));
-                break;
+    function findQueryApi() {
+        const api = browseScript && browseScript.dataset.api;
+        const local = location.hostname === 'localhost' || location.hostname === '127.0.0.1';
+        if (!api || !local) return Promise.resolve(false);
+
+        const base = api.replace(/\/$/, '');
+        return fetch(`${base}/facets`)
+            .then(response => response.ok ? response.json() : null)
+            .then(result => {
+                if (!result || result.total < API_THRESHOLD) return false;
+                queryApi = base;
+                apiFacets = result.facets;
+                apiLLMCounts.all = result.facets.llm;
+                return true;
+            })
+            .catch(() => false);  // Server not running
+    }
+
+    function loadDataset() {
+        // data.js is only requested when the browser does the filtering
+        if (typeof participationData !== 'undefined') return Promise.resolve(true);
+        if (!datasetLoading) {
+            datasetLoading = new Promise(resolve => {
+                const script = document.createElement('script');
+                script.src = browseScript.dataset.dataset;
+                script.onload = () => resolve(true);
+                script.onerror = () => resolve(false);
+                document.head.appendChild(script);
+            });
+        }
+        return datasetLoading;
+    }
+
+    function queryFromApi(filters, id) {
+        const params = new URLSearchParams({ sort: filters.sort, page: currentPage, per_page: perPage });
+        if (filters.search) params.set('search', filters.search);
+        ['provider', 'llm', 'hw'].forEach(name => {
+            if (filters[name] !== 'all') params.set(name, filters[name]);
+        });
+
+        fetch(`${queryApi}/threads?${params}`)
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.json();
+            })
+            .then(result => {
+                if (id !== latestQueryId) return;
+                // Only the requested page is filled in; the length gives the page count
+                filteredThreads = new Array(result.total);
+                const offset = (result.page - 1) * result.per_page;
+                result.threads.forEach((thread, i) => { filteredThreads[offset + i] = thread; });
+                renderSubmissions();
+                renderPagination();
+                updateResultsInfo();
+            })
+            .catch(() => {
+                // Server stopped: load data.js and filter in the browser instead
+                queryApi = null;
+                loadDataset().then(loaded => {
+                    if (!loaded) return;
+                    if (!queryWorker) startQueryWorker();
+                    applyFiltersAndRender();
+                });
+            });
+    }
+
+    function startQueryWorker() {
+        const workerUrl = browseScript && browseScript.dataset.worker;
+        if (!workerUrl || typeof Worker === 'undefined') return;
+
+        try {
+            queryWorker = new Worker(workerUrl);
+        } catch {
+            queryWorker = null;
+            return;
+        }
+
+        queryWorker.addEventListener('message', handleWorkerMessage);
+        queryWorker.addEventListener('error', function(e) {
+            // e.g. importScripts failed: filter on the main thread instead
+            e.preventDefault();
+            queryWorker.terminate();
+            queryWorker = null;
+            applyFiltersAndRender();
+        });
+
+        // Messages queue until the worker is running, so queries can follow immediately
+        queryWorker.postMessage({
+            type: 'init',
+            engine: new URL(browseScript.dataset.query, document.baseURI).href,
+            dataset: new URL(browseScript.dataset.dataset, document.baseURI).href
+        });
+    }
+
+    function handleWorkerMessage(e) {
+        const message = e.data;
+        if (message.type === 'result' && message.id === latestQueryId) {
+            showResults(message.indices);
         }
     }
 
@@ -416,9 +545,10 @@
     }
 
     function createSubmissionCard(thread) {
-        const truncated = thread.content.length > 150
+        // Escaped at build time (generate_data_js); computed for an older data.js
+        const excerpt = thread.snippet_html ?? escapeHtml(thread.content.length > 150
             ? thread.content.substring(0, 150) + '...'
-            : thread.content;
+            : thread.content);
         const date = formatDate(thread.created_at);
 
         const href = getThreadHref(thread.id);
@@ -432,7 +562,7 @@
                 </div>
                 <h3 class="card-title">${escapeHtml(thread.title)}</h3>
                 <p class="card-author">by ${escapeHtml(thread.author)}</p>
-                <p class="card-excerpt">${escapeHtml(truncated)}</p>
+                <p class="card-excerpt">${excerpt}</p>
                 <div class="card-footer">
                     <span class="card-date">${date}</span>
                     <span class="card-views">${thread.view_count} views</span>
@@ -479,8 +609,12 @@
         container.querySelectorAll('.page-btn').forEach(btn => {
             btn.addEventListener('click', function() {
                 currentPage = parseInt(this.dataset.page);
-                renderSubmissions();
-                renderPagination();
+                if (queryApi) {
+                    applyFiltersAndRender();  // Fetch the page
+                } else {
+                    renderSubmissions();
+                    renderPagination();
+                }
                 const prefersReducedMotion = window.matchMedia &&
                     window.matchMedia('(prefers-reduced-motion: reduce)').matches;
                 window.scrollTo({ top: 0, behavior: prefersReducedMotion ? 'auto' : 'smooth' });
@@ -517,18 +651,59 @@
     }
 
     function openThreadModal(threadId, triggerEl, { updateHistory = true } = {}) {
-        const thread = participationData.threads.find(t => t.id === threadId);
-        if (!thread) return;
+        const modal = document.getElementById('modal');
+        if (activeModalThreadId === threadId && modal.classList.contains('open')) return;
+
+        const request = ++modalRequest;
+        const focused = triggerEl || document.activeElement;
+        threadDetail(threadId).then(thread => {
+            if (thread && request === modalRequest) showThreadModal(thread, focused, updateHistory);
+        });
+    }
+
+    // The thread with everything the modal links to: from the API (query_server.py)
+    // or, with the same shape, from data.js
+    function threadDetail(threadId) {
+        if (queryApi) {
+            return fetch(`${queryApi}/threads/${encodeURIComponent(threadId)}`)
+                .then(response => response.ok ? response.json() : null)
+                .catch(() => loadDataset().then(datasetThreadDetail.bind(null, threadId)));
+        }
+        return Promise.resolve(datasetThreadDetail(threadId));
+    }
 
+    function datasetThreadDetail(threadId) {
+        if (typeof participationData === 'undefined') return null;
+        const threads = participationData.threads;
+        const threadIndex = threads.findIndex(t => t.id === threadId);
+        if (threadIndex === -1) return null;
+        const thread = threads[threadIndex];
+
+        // Precomputed at build time by related.py
+        const related = typeof relatedThreads !== 'undefined' ? (relatedThreads[threadIndex] || []) : [];
+        return {
+            ...thread,
+            attachment_meta: typeof attachmentMeta !== 'undefined' ? attachmentMeta : {},
+            resources: typeof homeworkResources !== 'undefined' ? homeworkResources[thread.homework] : null,
+            related: related.map(index => threads[index]),
+            // Reposts collapsed into this submission (dedup.py), or the version it was collapsed into
+            versions: threads.filter(t =>
+                t.id !== thread.id && (
+                    t.duplicate_of === thread.id ||
+                    (thread.duplicate_of !== undefined && (t.id === thread.duplicate_of || t.duplicate_of === thread.duplicate_of))
+                ))
+        };
+    }
+
+    function showThreadModal(thread, focused, updateHistory) {
+        const threadId = thread.id;
         const modal = document.getElementById('modal');
         const title = document.getElementById('modalTitle');
         const meta = document.getElementById('modalMeta');
         const body = document.getElementById('modalBody');
         const footer = document.getElementById('modalFooter');
 
-        if (activeModalThreadId === threadId && modal.classList.contains('open')) return;
-
-        lastFocusedElement = triggerEl || document.activeElement;
+        lastFocusedElement = focused;
         activeModalThreadId = threadId;
 
         title.textContent = thread.title;
@@ -542,23 +717,35 @@
             <span class="modal-views">${thread.view_count} views</span>
         `;
 
-        // Format content with line breaks
-        const formattedContent = thread.content
+        // Escaped paragraphs with linked URLs, built by generate_data_js
+        body.innerHTML = thread.content_html ?? thread.content
             .split('\n')
             .map(p => p.trim())
             .filter(p => p)
             .map(p => `<p>${escapeHtml(p)}</p>`)
             .join('');
 
-        body.innerHTML = formattedContent;
-
         // Footer with attachments and links
         let footerHtml = '';
 
         if (thread.attachments && thread.attachments.length > 0) {
             footerHtml += '<div class="modal-attachments"><strong>Attachments:</strong><ul>';
             thread.attachments.forEach(att => {
-                footerHtml += `<li><a href="attachments/${encodeURIComponent(att)}" target="_blank" rel="noopener">${escapeHtml(att)}</a></li>`;
+                // Size, pages and first-page preview, described at build time by attachment_meta.py
+                const meta = thread.attachment_meta[att];
+                const href = `attachments/${encodeURIComponent(att)}`;
+                if (!meta) {
+                    footerHtml += `<li><a href="${href}" target="_blank" rel="noopener">${escapeHtml(att)}</a></li>`;
+                    return;
+                }
+                const thumbnail = meta.thumbnail
+                    ? `<img class="attachment-thumb" src="${escapeHtml(meta.thumbnail.src)}" width="${meta.thumbnail.width}" height="${meta.thumbnail.height}" alt="" loading="lazy" decoding="async">`
+                    : '';
+                const details = [fileTypeLabel(att, meta.mime)];
+                if (meta.pages) details.push(`${meta.pages} page${meta.pages === 1 ? '' : 's'}`);
+                details.push(formatFileSize(meta.size));
+                footerHtml += `<li class="attachment-item"><a href="${href}" target="_blank" rel="noopener">${thumbnail}<span>${escapeHtml(att)}
+                    <span class="related-meta">${escapeHtml(details.join(' · '))}</span></span></a></li>`;
             });
             footerHtml += '</ul></div>';
         }
@@ -566,13 +753,61 @@
         if (thread.links && thread.links.length > 0) {
             footerHtml += '<div class="modal-links"><strong>External Links:</strong><ul>';
             thread.links.forEach(link => {
-                footerHtml += `<li><a href="${escapeHtml(link)}" target="_blank" rel="noopener noreferrer">${escapeHtml(link)}</a></li>`;
+                // Same rule as is_web_url in process_threads.py: only http(s) links are clickable
+                footerHtml += isWebUrl(link)
+                    ? `<li><a href="${escapeHtml(link).replace(/"/g, '&quot;')}" target="_blank" rel="noopener noreferrer">${escapeHtml(link)}</a></li>`
+                    : `<li>${escapeHtml(link)}</li>`;
+            });
+            footerHtml += '</ul></div>';
+        }
+
+        // Official homework material, joined at build time by resource_index.py
+        const resources = thread.resources;
+        if (resources) {
+            const labels = { question: 'Questions', solution: 'Solution', code: 'Code', old_exam: 'Old Exam' };
+            const files = resources.files.filter(f => labels[f.kind]);
+            const solutionThread = resources.threads.find(t => t.kind === 'solution');
+            if (files.length > 0 || solutionThread) {
+                footerHtml += `<div class="modal-links"><strong>${escapeHtml(thread.homework)} Resources:</strong><ul>`;
+                files.forEach(file => {
+                    footerHtml += `<li><a href="${escapeHtml(file.path)}" target="_blank" rel="noopener">${labels[file.kind]}: ${escapeHtml(file.name)}</a></li>`;
+                });
+                if (solutionThread) {
+                    footerHtml += `<li><a href="${escapeHtml(solutionThread.url)}" target="_blank" rel="noopener noreferrer">Ed: ${escapeHtml(solutionThread.title)}</a></li>`;
+                }
+                footerHtml += '</ul></div>';
+            }
+        }
+
+        // Precomputed by related.py
+        if (thread.related.length > 0) {
+            footerHtml += '<div class="modal-related"><strong>Related Submissions:</strong><ul>';
+            thread.related.forEach(other => {
+                footerHtml += `<li><a href="${escapeHtml(getThreadHref(other.id))}" data-thread-id="${other.id}">${escapeHtml(other.title)}</a>
+                    <span class="related-meta">${escapeHtml(other.llm_used)} &middot; ${escapeHtml(other.homework)}</span></li>`;
+            });
+            footerHtml += '</ul></div>';
+        }
+
+        if (thread.versions.length > 0) {
+            footerHtml += '<div class="modal-related"><strong>Other Versions:</strong><ul>';
+            thread.versions.forEach(other => {
+                footerHtml += `<li><a href="${escapeHtml(getThreadHref(other.id))}" data-thread-id="${other.id}">${escapeHtml(other.title)}</a>
+                    <span class="related-meta">${escapeHtml(other.author)} &middot; ${escapeHtml(formatDate(other.created_at))}</span></li>`;
             });
             footerHtml += '</ul></div>';
         }
 
         footer.innerHTML = footerHtml;
 
+        footer.querySelectorAll('.modal-related a').forEach(link => {
+            link.addEventListener('click', function(e) {
+                if (e.button !== 0 || e.metaKey || e.ctrlKey || e.shiftKey || e.altKey) return;
+                e.preventDefault();
+                openThreadModal(parseInt(this.dataset.threadId), lastFocusedElement, { updateHistory: true });
+            });
+        });
+
         modal.classList.add('open');
         modal.setAttribute('aria-hidden', 'false');
         document.body.style.overflow = 'hidden';
@@ -591,6 +826,7 @@
     }
 
     function closeModal({ updateHistory = true } = {}) {
+        modalRequest++;  // A thread still loading does not open after this
         const modal = document.getElementById('modal');
         if (!modal || !modal.classList.contains('open')) return;
 
@@ -637,9 +873,8 @@
     }
 
     function getThreadHref(threadId) {
-        const params = new URLSearchParams(window.location.search);
-        params.set('thread', threadId);
-        return `${window.location.pathname}?${params.toString()}`;
+        // Static page pre-rendered by process_threads.py; plain clicks still open the modal.
+        return `threads/${encodeURIComponent(threadId)}.html`;
     }
 
     function trapFocus(e) {
@@ -676,6 +911,18 @@
         });
     }
 
+    function formatFileSize(bytes) {
+        if (bytes < 1024) return `${bytes} B`;
+        if (bytes < 1024 * 1024) return `${Math.round(bytes / 1024)} KB`;
+        return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+    }
+
+    function fileTypeLabel(name, mime) {
+        if (mime === 'application/pdf') return 'PDF';
+        const dot = name.lastIndexOf('.');
+        return dot > 0 ? name.slice(dot + 1).toUpperCase() : mime;
+    }
+
     function formatDate(dateStr) {
         try {
             const date = new Date(dateStr);
@@ -689,6 +936,14 @@
         }
     }
 
+    function isWebUrl(link) {
+        try {
+            return ['http:', 'https:'].includes(new URL(link.trim()).protocol);
+        } catch (e) {
+            return false;
+        }
+    }
+
     function escapeHtml(text) {
         if (!text) return '';
         const div = document.createElement('div');
@@ -0,0 +1,91 @@
+// Browse page query engine
+// Shared by browse_worker.js (normal case) and browse.js (fallback when
+// Web Workers are unavailable, e.g. pages opened from file://).
+(function(root) {
+    'use strict';
+
+    // Separates fields in the search haystack so a match cannot span two fields
+    const FIELD_SEPARATOR = '\u0000';
+
+    // Entities produced by Python's html.escape in generate_data_js
+    const HTML_ENTITIES = { amp: '&', lt: '<', gt: '>', quot: '"', '#x27': "'" };
+
+    // Plain content from content_html: one line per <p>, tags dropped.
+    // data.js ships only the HTML; older files still carry content.
+    function contentText(thread) {
+        if (thread.content !== undefined) return thread.content;
+        return (thread.content_html || '')
+            .replace(/<\/p>(?!$)/g, '\n')
+            .replace(/<[^>]*>/g, '')
+            .replace(/&(amp|lt|gt|quot|#x27);/g, (entity, name) => HTML_ENTITIES[name]);
+    }
+
+    function createQueryEngine(threads, sortOrders) {
+        // Lowercased search text per thread, built once instead of per keystroke
+        const haystacks = threads.map(t => [
+            t.title, t.author, t.llm_used, t.homework, contentText(t), t.provider || ''
+        ].join(FIELD_SEPARATOR).toLowerCase());
+
+        // Thread indices in display order, from data.js (generate_data_js).
+        // Computed once per sort option when an older data.js lacks them.
+        const computedSortOrders = {};
+
+        function getSortOrder(sort) {
+            if (sortOrders && sortOrders[sort]) {
+                return sortOrders[sort];
+            }
+            if (!computedSortOrders[sort]) {
+                computedSortOrders[sort] = computeSortOrder(sort);
+            }
+            return computedSortOrders[sort];
+        }
+
+        function computeSortOrder(sort) {
+            const order = threads.map((_, i) => i);
+            const time = threads.map(t => t.created_ts ?? new Date(t.created_at).getTime());
+            switch (sort) {
+                case 'date-asc':
+                    return order.sort((a, b) => time[a] - time[b]);
+                case 'views-desc':
+                    return order.sort((a, b) => threads[b].view_count - threads[a].view_count);
+                case 'author-asc':
+                    return order.sort((a, b) => threads[a].author.localeCompare(threads[b].author));
+                case 'llm-asc':
+                    return order.sort((a, b) => threads[a].llm_used.localeCompare(threads[b].llm_used));
+                default:
+                    return order.sort((a, b) => time[b] - time[a]);
+            }
+        }
+
+        // Returns matching thread indices, already in display order
+        function query(filters) {
+            const search = (filters.search || '').toLowerCase();
+            const result = [];
+            for (const index of getSortOrder(filters.sort)) {
+                const thread = threads[index];
+
+                // Near-duplicate reposts are collapsed into their newest version
+                if (thread.duplicate_of !== undefined) continue;
+
+                // Search filter
+                if (search && !haystacks[index].includes(search)) continue;
+
+                // Provider filter
+                if (filters.provider !== 'all' && thread.provider !== filters.provider) continue;
+
+                // LLM filter
+                if (filters.llm !== 'all' && thread.llm_used !== filters.llm) continue;
+
+                // Homework filter
+                if (filters.hw !== 'all' && thread.homework !== filters.hw) continue;
+
+                result.push(index);
+            }
+            return result;
+        }
+
+        return { query };
+    }
+
+    root.createQueryEngine = createQueryEngine;
+})(self);
@@ -0,0 +1,32 @@
+// Browse page search worker
+// Loads the dataset and query engine once, then answers filter/sort queries
+// with thread indices so the main thread only renders the current page.
+//
+// Messages in:  { type: 'init', engine: <url>, dataset: <url> }
+//               { type: 'query', id, filters: { search, provider, llm, hw, sort } }
+// Messages out: { type: 'result', id, indices: Int32Array }
+(function() {
+    'use strict';
+
+    let engine = null;
+
+    self.onmessage = function(e) {
+        const message = e.data;
+
+        if (message.type === 'init') {
+            // data.js exports through window.*
+            self.window = self;
+            importScripts(message.engine, message.dataset);
+            engine = self.createQueryEngine(
+                self.participationData.threads,
+                self.sortOrders || null
+            );
+            return;
+        }
+
+        if (message.type === 'query' && engine) {
+            const indices = Int32Array.from(engine.query(message.filters));
+            self.postMessage({ type: 'result', id: message.id, indices }, [indices.buffer]);
+        }
+    };
+})();
@@ -132,17 +132,21 @@
         if (!container) return;
 
         // Get 6 most recent
-        const recent = [...participationData.threads]
-            .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-            .slice(0, 6);
+        const threads = participationData.threads;
+        const recent = typeof sortOrders !== 'undefined'
+            ? sortOrders['date-desc'].slice(0, 6).map(i => threads[i])
+            : [...threads]
+                .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
+                .slice(0, 6);
 
         container.innerHTML = recent.map(thread => createSubmissionCard(thread)).join('');
     }
 
     function createSubmissionCard(thread) {
-        const truncated = thread.content.length > 120
-            ? thread.content.substring(0, 120) + '...'
-            : thread.content;
+        // Escaped at build time (generate_data_js); computed for an older data.js
+        const excerpt = thread.snippet_html ?? escapeHtml(thread.content.length > 150
+            ? thread.content.substring(0, 150) + '...'
+            : thread.content);
         const date = formatDate(thread.created_at);
 
         return `
@@ -154,7 +158,7 @@
                 </div>
                 <h4 class="card-title">${escapeHtml(thread.title)}</h4>
                 <p class="card-author">by ${escapeHtml(thread.author)}</p>
-                <p class="card-excerpt">${escapeHtml(truncated)}</p>
+                <p class="card-excerpt">${excerpt}</p>
                 <div class="card-footer">
                     <span class="card-date">${date}</span>
                     <span class="card-views">${thread.view_count} views</span>
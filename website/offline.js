@@ -0,0 +1,19 @@
+// Registers service_worker.js so repeat visits load from cache and work offline
+(function() {
+    'use strict';
+
+    if (!('serviceWorker' in navigator) || location.protocol === 'file:') return;
+
+    // Local development: never serve stale scripts while editing website/
+    if (location.hostname === 'localhost' || location.hostname === '127.0.0.1') return;
+
+    // Resolve against this script (site root) so /threads/ pages register the same worker
+    const script = document.currentScript;
+    const base = script ? script.src : location.href;
+
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register(new URL('service_worker.js', base)).catch(function(err) {
+            console.warn('Service worker registration failed:', err);
+        });
+    });
+})();
@@ -0,0 +1,112 @@
+// Service worker: offline cache for the site
+//
+// - App shell and dataset (pages, scripts, styles, charts, data.js) are
+//   precached from precache_manifest.js, written by build_site.py. The cache
+//   name carries the manifest's content hash, so new data gets a new cache
+//   and old ones are deleted on activation.
+// - Attachments and their thumbnails, course resources, thread pages and
+//   responsive image variants (images/, see build_site.py) are cached on
+//   first use and served stale-while-revalidate. That cache keeps the
+//   RUNTIME_MAX_ENTRIES most recently used responses and skips anything
+//   larger than RUNTIME_MAX_BYTES (big PDFs), so browsing every submission
+//   does not fill the user's storage. Bump RUNTIME_VERSION when its contents
+//   change shape; activation deletes the old runtime caches.
+'use strict';
+
+try {
+    importScripts('precache_manifest.js');
+} catch (e) {
+    // Not generated yet (process_threads.py / build_site.py write it): nothing is precached
+}
+
+const MANIFEST = self.PRECACHE_MANIFEST || { version: 'dev', urls: [] };
+const PRECACHE = `precache-${MANIFEST.version}`;
+const RUNTIME_VERSION = 2;
+const RUNTIME_CACHE = `runtime-v${RUNTIME_VERSION}`;
+const RUNTIME_MAX_ENTRIES = 150;
+const RUNTIME_MAX_BYTES = 5 * 1024 * 1024;  // Per response
+const RUNTIME_PATHS = ['attachments/', 'resources/', 'threads/', 'images/', 'thumbnails/'];
+
+const scopeUrl = new URL(self.registration.scope);
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(PRECACHE)
+            .then(cache => cache.addAll(MANIFEST.urls))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys
+                    .filter(key => (key.startsWith('precache-') && key !== PRECACHE)
+                        || (key.startsWith('runtime-') && key !== RUNTIME_CACHE))
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET' || request.headers.has('range')) return;
+
+    const url = new URL(request.url);
+    if (url.origin !== scopeUrl.origin || !url.pathname.startsWith(scopeUrl.pathname)) return;
+
+    let path = url.pathname.slice(scopeUrl.pathname.length);
+    if (path === '') path = 'index.html';
+
+    if (MANIFEST.urls.includes(path)) {
+        event.respondWith(precached(request, path));
+    } else if (RUNTIME_PATHS.some(prefix => path.startsWith(prefix))) {
+        event.respondWith(staleWhileRevalidate(event, request));
+    }
+});
+
+// Cache first; query strings (browse.html?thread=...) share one entry
+async function precached(request, path) {
+    const cache = await caches.open(PRECACHE);
+    const cached = await cache.match(new URL(path, scopeUrl), { ignoreSearch: true });
+    return cached || fetch(request);
+}
+
+// Cache.keys() lists entries in insertion order and put() re-appends an
+// existing entry, so re-putting on use keeps the oldest-used entries first
+async function staleWhileRevalidate(event, request) {
+    const cache = await caches.open(RUNTIME_CACHE);
+    const cached = await cache.match(request);
+
+    const network = fetch(request).then(response => {
+        if (response.status === 200 && cacheable(response)) {
+            event.waitUntil(
+                cache.put(request, response.clone()).then(() => trimRuntimeCache(cache))
+            );
+        }
+        return response;
+    });
+
+    if (cached) {
+        // Refresh in the background; offline, just mark the entry as used
+        const touch = cached.clone();
+        event.waitUntil(network.catch(() => cache.put(request, touch)).catch(() => {}));
+        return cached;
+    }
+    return network;
+}
+
+// Responses without a Content-Length (chunked) are cached; the entry cap bounds them
+function cacheable(response) {
+    const length = Number(response.headers.get('content-length'));
+    return !(length > RUNTIME_MAX_BYTES);
+}
+
+async function trimRuntimeCache(cache) {
+    const keys = await cache.keys();
+    await Promise.all(
+        keys.slice(0, Math.max(0, keys.length - RUNTIME_MAX_ENTRIES)).map(key => cache.delete(key))
+    );
+}
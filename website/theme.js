@@ -149,13 +149,17 @@
             const picture = img.parentElement && img.parentElement.tagName === 'PICTURE' ? img.parentElement : null;
             if (picture) {
                 picture.querySelectorAll('source').forEach(source => {
-                    if (!source.dataset.mediaOriginal) {
+                    if (source.dataset.mediaOriginal === undefined) {
                         source.dataset.mediaOriginal = source.getAttribute('media') || '';
                     }
                     if (forced) {
-                        source.setAttribute('media', 'not all');
-                    } else {
+                        // Responsive variants (build_site.py) tag their theme; keep the forced one
+                        const keep = source.dataset.theme === forced;
+                        source.setAttribute('media', keep ? 'all' : 'not all');
+                    } else if (source.dataset.mediaOriginal) {
                         source.setAttribute('media', source.dataset.mediaOriginal);
+                    } else {
+                        source.removeAttribute('media');
                     }
                 });
             }